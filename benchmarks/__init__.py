@@ -0,0 +1,6 @@
+"""
+Pruebas de rendimiento.
+
+Se ejecutan como módulos desde la raíz del proyecto, por ejemplo
+``python -m benchmarks.classifier``.
+"""
@@ -0,0 +1,106 @@
+"""
+Micro-benchmark de la clasificación de nombres de archivo.
+
+Compara ``ExtensionClassifier.classify`` con la clasificación anterior
+(``os.path.splitext`` + ``lower`` + búsqueda en ``EXTENSIONS``) sobre una
+lista sintética de nombres con mayúsculas, sufijos compuestos, extensiones
+no soportadas y archivos sin extensión.
+
+Uso:
+    python -m benchmarks.classifier [--names N] [--repeat R]
+"""
+
+import argparse
+import os
+import random
+import time
+from sorter.classifier import DEFAULT_CLASSIFIER
+from sorter.extensions import EXTENSIONS
+
+DEFAULT_NAMES = 1000000
+DEFAULT_REPEAT = 3
+
+_UNSUPPORTED = ('.part', '.crdownload', '.dat', '.xyz', '.download')
+
+
+def generate_names(count, seed=0):
+    """
+    Genera nombres de archivo representativos de una carpeta de descargas.
+
+    Returns:
+        list: ``count`` nombres de archivo.
+    """
+    rng = random.Random(seed)
+    extensions = sorted(EXTENSIONS)
+    names = []
+    for i in range(count):
+        roll = rng.random()
+        if roll < 0.70:
+            suffix = rng.choice(extensions)
+        elif roll < 0.80:
+            suffix = rng.choice(extensions).upper()
+        elif roll < 0.85:
+            suffix = rng.choice(extensions).title()
+        elif roll < 0.95:
+            suffix = rng.choice(_UNSUPPORTED)
+        else:
+            suffix = ""
+        names.append(f"archivo {i}.v{i % 7}{suffix}")
+    return names
+
+
+def classify_with_splitext(names):
+    """Clasificación anterior, como referencia."""
+    found = 0
+    for name in names:
+        ext = os.path.splitext(name)[1].lower()
+        if ext in EXTENSIONS:
+            EXTENSIONS[ext]
+            found += 1
+    return found
+
+
+def classify_with_classifier(names):
+    """Clasificación con el clasificador compilado."""
+    classify = DEFAULT_CLASSIFIER.classify
+    found = 0
+    for name in names:
+        if classify(name) is not None:
+            found += 1
+    return found
+
+
+def measure(function, names, repeat):
+    """
+    Mide el mejor tiempo de ``repeat`` ejecuciones.
+
+    Returns:
+        float: Nanosegundos por nombre.
+    """
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        function(names)
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best * 1e9 / len(names)
+
+
+def main(argv=None):
+    """Ejecuta el benchmark y muestra el coste por nombre."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--names", type=int, default=DEFAULT_NAMES)
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    args = parser.parse_args(argv)
+
+    names = generate_names(args.names)
+    for label, function in (
+        ("splitext + lower + dict", classify_with_splitext),
+        ("ExtensionClassifier", classify_with_classifier),
+    ):
+        cost = measure(function, names, args.repeat)
+        print(f"{label:<26} {cost:8.1f} ns/nombre ({function(names)} clasificados)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,312 @@
+"""
+Benchmark del escaneo, la planificación y la organización.
+
+Genera un árbol sintético (ver ``benchmarks.tree``) en la carpeta indicada
+(por ejemplo ``/dev/shm`` para medir sin disco) y mide por separado
+``scan_directory``, ``plan_directory`` y ``sort_files`` con el plan ya
+obtenido. Cada repetición usa un árbol nuevo y se toma el mejor tiempo.
+Una pasada adicional, sin cronometrar, cuenta las llamadas al sistema de
+archivos que se hacen a través del módulo ``os`` (incluidas las consultas
+``DirEntry.stat`` de los listados) en cada fase.
+
+El resultado puede escribirse en JSON y compararse con uno anterior: el
+programa termina con código 1 si alguna fase empeora más de la tolerancia
+o supera un límite absoluto, de modo que puede usarse como control en CI.
+
+Uso:
+    python -m benchmarks.sort [--files N] [--depth D] [--collisions R]
+                              [--dir CARPETA] [--repeat R] [--workers W]
+                              [--json] [--output ARCHIVO]
+                              [--baseline ARCHIVO] [--tolerance T]
+                              [--max FASE=MICROSEGUNDOS]
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import threading
+import time
+from benchmarks.tree import DEFAULT_COLLISIONS, DEFAULT_DEPTH, DEFAULT_FILES, generate_tree
+from sorter.core import DEFAULT_WORKERS, plan_directory, scan_directory, sort_files
+from sorter.extensions import EXTENSIONS
+
+DEFAULT_REPEAT = 3
+DEFAULT_TOLERANCE = 0.25
+
+PHASES = ("scan", "plan", "sort")
+
+# Funciones de ``os`` que se cuentan como operaciones del sistema de archivos
+_COUNTED_FUNCTIONS = (
+    "stat", "lstat", "open", "link", "unlink", "rename", "replace",
+    "mkdir", "rmdir", "copy_file_range", "sendfile",
+)
+
+
+def run_phases(root, depth, workers, counter=None):
+    """
+    Ejecuta las tres fases sobre un árbol.
+
+    Args:
+        root (str): Raíz del árbol.
+        depth (int): Profundidad del escaneo (None, todo el árbol).
+        workers (int): Hilos de ``sort_files``.
+        counter (OperationCounter, optional): Contador de operaciones; si se
+                                             indica, se reinicia en cada fase.
+
+    Returns:
+        dict: Segundos de cada fase, y operaciones si hay contador.
+    """
+    results = {}
+
+    def timed(phase, function):
+        if counter is not None:
+            counter.reset()
+        started = time.perf_counter()
+        value = function()
+        results[phase] = {"seconds": time.perf_counter() - started}
+        if counter is not None:
+            results[phase]["ops"] = counter.total
+        return value
+
+    timed("scan", lambda: scan_directory(root, depth))
+    plan = timed("plan", lambda: plan_directory(root, depth))
+    timed("sort", lambda: sort_files(root, EXTENSIONS, plan=plan, workers=workers))
+    return results
+
+
+class OperationCounter:
+    """
+    Cuenta las llamadas a las funciones de ``os`` de ``_COUNTED_FUNCTIONS``.
+
+    Cada ``os.scandir`` cuenta como una operación y sus entradas cuentan las
+    llamadas a ``stat``. Mientras está activo sustituye esas funciones por
+    envoltorios, por lo que solo debe usarse en pasadas que no se cronometran.
+    """
+
+    def __init__(self):
+        self.total = 0
+        self._lock = threading.Lock()
+        self._originals = {}
+
+    def __enter__(self):
+        for name in _COUNTED_FUNCTIONS:
+            original = getattr(os, name, None)
+            if original is not None:
+                self._originals[name] = original
+                setattr(os, name, self._wrap(original))
+
+        scandir = self._originals["scandir"] = os.scandir
+        counter = self
+
+        def counted_scandir(*args, **kwargs):
+            counter.add()
+            return _CountedListing(scandir(*args, **kwargs), counter)
+
+        os.scandir = counted_scandir
+        return self
+
+    def __exit__(self, *exc_info):
+        for name, original in self._originals.items():
+            setattr(os, name, original)
+        self._originals = {}
+
+    def add(self):
+        """Cuenta una operación."""
+        with self._lock:
+            self.total += 1
+
+    def reset(self):
+        """Pone el contador a cero."""
+        with self._lock:
+            self.total = 0
+
+    def _wrap(self, function):
+        def counted(*args, **kwargs):
+            self.add()
+            return function(*args, **kwargs)
+        return counted
+
+
+class _CountedListing:
+    """Listado de ``os.scandir`` cuyas entradas cuentan las llamadas a ``stat``."""
+
+    def __init__(self, listing, counter):
+        self._listing = listing
+        self._counter = counter
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self._listing.close()
+
+    def __iter__(self):
+        for entry in self._listing:
+            yield _CountedEntry(entry, self._counter)
+
+    def close(self):
+        self._listing.close()
+
+
+class _CountedEntry:
+    """Entrada de un listado que cuenta las llamadas a ``stat``."""
+
+    def __init__(self, entry, counter):
+        self._entry = entry
+        self._counter = counter
+
+    def __getattr__(self, name):
+        return getattr(self._entry, name)
+
+    def __fspath__(self):
+        return self._entry.path
+
+    def stat(self, *args, **kwargs):
+        self._counter.add()
+        return self._entry.stat(*args, **kwargs)
+
+
+def benchmark(files=DEFAULT_FILES, depth=DEFAULT_DEPTH, collisions=DEFAULT_COLLISIONS,
+              directory=None, repeat=DEFAULT_REPEAT, workers=DEFAULT_WORKERS):
+    """
+    Ejecuta el benchmark completo.
+
+    Returns:
+        dict: Con ``params`` y ``phases``; cada fase tiene ``seconds`` (el mejor
+              tiempo), ``us_per_file`` y ``ops_per_file``. El escaneo y el plan
+              se dividen entre todos los archivos del árbol y la organización
+              entre los archivos soportados, que son los que se mueven.
+    """
+    scan_depth = None if depth else 0
+    best = {}
+    counted = {}
+    tree = None
+
+    for iteration in range(repeat + 1):
+        root = tempfile.mkdtemp(prefix="sorter-bench-", dir=directory)
+        try:
+            tree = generate_tree(root, files, depth, collisions)
+            if iteration < repeat:
+                for phase, result in run_phases(root, scan_depth, workers).items():
+                    best[phase] = min(best.get(phase, result["seconds"]), result["seconds"])
+            else:
+                with OperationCounter() as counter:
+                    counted = run_phases(root, scan_depth, workers, counter)
+        finally:
+            shutil.rmtree(root, ignore_errors=True)
+
+    phases = {}
+    for phase in PHASES:
+        per = max(1, tree["supported"] if phase == "sort" else tree["files"])
+        phases[phase] = {
+            "seconds": best.get(phase, 0.0),
+            "us_per_file": best.get(phase, 0.0) * 1e6 / per,
+            "ops_per_file": counted[phase]["ops"] / per,
+        }
+
+    return {
+        "params": {
+            "files": files,
+            "supported": tree["supported"],
+            "depth": depth,
+            "collisions": collisions,
+            "directory": directory or tempfile.gettempdir(),
+            "repeat": repeat,
+            "workers": workers,
+        },
+        "phases": phases,
+    }
+
+
+def check_regressions(result, baseline=None, tolerance=DEFAULT_TOLERANCE, limits=None):
+    """
+    Compara un resultado con uno anterior y con límites absolutos.
+
+    Args:
+        result (dict): Resultado de ``benchmark``.
+        baseline (dict, optional): Resultado anterior de referencia.
+        tolerance (float, optional): Empeoramiento relativo admitido (0.25 = 25 %).
+        limits (dict, optional): Fase → microsegundos por archivo como máximo.
+
+    Returns:
+        list: Descripciones de las fases que empeoran o superan su límite.
+    """
+    regressions = []
+    for phase, measured in result["phases"].items():
+        cost = measured["us_per_file"]
+        reference = (baseline or {}).get("phases", {}).get(phase)
+        if reference and cost > reference["us_per_file"] * (1 + tolerance):
+            regressions.append(
+                f"{phase}: {cost:.2f} us/archivo frente a {reference['us_per_file']:.2f} "
+                f"(+{(cost / reference['us_per_file'] - 1) * 100:.0f} %)"
+            )
+        limit = (limits or {}).get(phase)
+        if limit is not None and cost > limit:
+            regressions.append(f"{phase}: {cost:.2f} us/archivo supera el límite de {limit:.2f}")
+    return regressions
+
+
+def _parse_limits(values):
+    """Convierte los argumentos ``FASE=MICROSEGUNDOS`` en un diccionario."""
+    limits = {}
+    for value in values:
+        phase, separator, limit = value.partition("=")
+        if not separator or phase not in PHASES:
+            raise ValueError(f"Límite no válido: {value!r} (fases: {', '.join(PHASES)})")
+        limits[phase] = float(limit)
+    return limits
+
+
+def main(argv=None):
+    """Ejecuta el benchmark, muestra o guarda el resultado y comprueba las regresiones."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES)
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--collisions", type=float, default=DEFAULT_COLLISIONS)
+    parser.add_argument("--dir", dest="directory")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--json", action="store_true")
+    parser.add_argument("--output")
+    parser.add_argument("--baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument("--max", action="append", default=[], metavar="FASE=US")
+    args = parser.parse_args(argv)
+
+    try:
+        limits = _parse_limits(args.max)
+    except ValueError as e:
+        parser.error(str(e))
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as file:
+            baseline = json.load(file)
+
+    result = benchmark(args.files, args.depth, args.collisions, args.directory,
+                       max(1, args.repeat), args.workers)
+    result["regressions"] = check_regressions(result, baseline, args.tolerance, limits)
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as file:
+            json.dump(result, file, indent=2)
+            file.write("\n")
+
+    if args.json:
+        json.dump(result, sys.stdout, indent=2)
+        sys.stdout.write("\n")
+    else:
+        for phase, measured in result["phases"].items():
+            print(f"{phase:<5} {measured['seconds']:8.3f} s {measured['us_per_file']:9.2f} us/archivo "
+                  f"{measured['ops_per_file']:6.2f} ops/archivo")
+        for regression in result["regressions"]:
+            print(f"Regresión: {regression}", file=sys.stderr)
+
+    return 1 if result["regressions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,157 @@
+"""
+Generador de árboles de directorios sintéticos.
+
+Crea un directorio con archivos vacíos (o de un tamaño fijo) cuyas
+extensiones siguen una mezcla realista tomada de ``EXTENSIONS``, repartidos
+en subdirectorios hasta la profundidad indicada y con una proporción
+configurable de nombres que ya existen en su carpeta de categoría.
+
+Uso:
+    python -m benchmarks.tree DIRECTORIO [--files N] [--depth D]
+                                         [--collisions R] [--size BYTES]
+"""
+
+import argparse
+import os
+import random
+from sorter.extensions import EXTENSIONS
+
+DEFAULT_FILES = 10000
+DEFAULT_DEPTH = 0
+DEFAULT_COLLISIONS = 0.0
+DEFAULT_FANOUT = 8
+
+# Peso de cada categoría en una carpeta de descargas típica; el resto se
+# reparte a partes iguales entre las categorías no listadas
+_CATEGORY_WEIGHTS = {
+    'Imágenes': 30,
+    'Documentos': 25,
+    'Comprimidos': 10,
+    'Audio': 8,
+    'Video': 7,
+    'Código': 7,
+    'Ejecutables': 5,
+}
+_OTHER_WEIGHT = 2
+
+# Proporción de archivos sin extensión soportada
+_UNSUPPORTED_RATIO = 0.1
+_UNSUPPORTED = ('.part', '.crdownload', '.dat', '.download', '')
+
+
+def generate_tree(root, files=DEFAULT_FILES, depth=DEFAULT_DEPTH, collisions=DEFAULT_COLLISIONS,
+                  size=0, fanout=DEFAULT_FANOUT, seed=0):
+    """
+    Crea un árbol sintético.
+
+    Args:
+        root (str): Directorio donde se crea el árbol. Se crea si no existe.
+        files (int, optional): Archivos a crear.
+        depth (int, optional): Niveles de subdirectorios. Con 0 todos los
+                               archivos quedan en ``root``.
+        collisions (float, optional): Proporción (0 a 1) de archivos soportados
+                                      cuyo nombre ya existe en su carpeta de
+                                      categoría, de modo que al organizarlos
+                                      reciben un sufijo numérico.
+        size (int, optional): Bytes de cada archivo.
+        fanout (int, optional): Subdirectorios por directorio.
+        seed (int, optional): Semilla, para generar siempre el mismo árbol.
+
+    Returns:
+        dict: Con ``files`` (archivos creados), ``supported`` (con extensión
+              soportada), ``collisions`` (archivos previos creados en las
+              carpetas de categoría) y ``directories``.
+    """
+    rng = random.Random(seed)
+    choose_extension = _extension_chooser(rng)
+    directories = _create_directories(root, depth, fanout)
+    payload = b"\0" * size
+    created_folders = set()
+    supported = 0
+    existing = 0
+
+    for i in range(files):
+        ext = choose_extension()
+        name = f"archivo_{i:07d}{ext}"
+        _write(os.path.join(directories[i % len(directories)], name), payload)
+
+        category = EXTENSIONS.get(ext)
+        if category is None:
+            continue
+        supported += 1
+        if collisions and rng.random() < collisions:
+            folder = os.path.join(root, category)
+            if folder not in created_folders:
+                os.makedirs(folder, exist_ok=True)
+                created_folders.add(folder)
+            _write(os.path.join(folder, name), b"")
+            existing += 1
+
+    return {
+        "files": files,
+        "supported": supported,
+        "collisions": existing,
+        "directories": len(directories),
+    }
+
+
+def _extension_chooser(rng):
+    """Devuelve una función que elige extensiones con la mezcla de categorías."""
+    by_category = {}
+    for ext, category in sorted(EXTENSIONS.items()):
+        by_category.setdefault(category, []).append(ext)
+
+    categories = sorted(by_category)
+    weights = [_CATEGORY_WEIGHTS.get(category, _OTHER_WEIGHT) for category in categories]
+
+    def choose():
+        if rng.random() < _UNSUPPORTED_RATIO:
+            return rng.choice(_UNSUPPORTED)
+        category = rng.choices(categories, weights)[0]
+        return rng.choice(by_category[category])
+
+    return choose
+
+
+def _create_directories(root, depth, fanout):
+    """Crea los subdirectorios y devuelve todos los directorios del árbol."""
+    os.makedirs(root, exist_ok=True)
+    directories = [root]
+    level = [root]
+    for current in range(depth):
+        next_level = []
+        for parent in level:
+            for i in range(fanout):
+                child = os.path.join(parent, f"dir_{current}_{i}")
+                os.makedirs(child, exist_ok=True)
+                next_level.append(child)
+        directories.extend(next_level)
+        level = next_level
+    return directories
+
+
+def _write(path, payload):
+    """Crea un archivo con el contenido indicado."""
+    with open(path, "wb") as file:
+        file.write(payload)
+
+
+def main(argv=None):
+    """Genera un árbol y muestra lo creado."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("root")
+    parser.add_argument("--files", type=int, default=DEFAULT_FILES)
+    parser.add_argument("--depth", type=int, default=DEFAULT_DEPTH)
+    parser.add_argument("--collisions", type=float, default=DEFAULT_COLLISIONS)
+    parser.add_argument("--size", type=int, default=0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+
+    created = generate_tree(args.root, args.files, args.depth, args.collisions, args.size,
+                            seed=args.seed)
+    print(f"{created['files']} archivos ({created['supported']} soportados) en "
+          f"{created['directories']} directorios, {created['collisions']} colisiones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,11 @@
+"""
+Punto de entrada de ``python -m sorter``.
+
+Ejecuta la línea de comandos sin cargar la interfaz gráfica.
+"""
+
+import sys
+from sorter.cli import main
+
+if __name__ == "__main__":
+    sys.exit(main())
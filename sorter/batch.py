@@ -0,0 +1,285 @@
+"""
+Módulo de organización por lotes.
+
+Permite organizar muchos directorios a la vez (por ejemplo, las carpetas
+de entrada de cada usuario) con un límite global de movimientos en curso
+y otro por dispositivo, para que dos raíces del mismo disco no compitan
+por él. Los resultados y errores se devuelven por raíz.
+"""
+
+import contextlib
+import os
+import threading
+from sorter.control import OperationCancelled, check_token
+from sorter.core import (DEFAULT_WORKERS, SortError, estimate_sort, plan_directory, sort_files,
+                         sort_stream)
+from sorter.dedup import DEDUP_DELETE, Deduplicator
+from sorter.journal import MoveJournal
+
+DEFAULT_CONCURRENT_ROOTS = 4
+
+
+class IOLimiter:
+    """
+    Límite compartido de movimientos simultáneos.
+
+    Cada movimiento ocupa una plaza global y una plaza de cada dispositivo
+    que toca (el de origen y, si es distinto, el de destino). Las plazas de
+    dispositivo se toman antes que la global y en orden, de modo que un hilo
+    que espera a un disco ocupado no bloquea los movimientos de otros discos.
+    """
+
+    def __init__(self, max_moves=None, per_device=None):
+        """
+        Inicializa el límite.
+
+        Args:
+            max_moves (int, optional): Movimientos simultáneos en total (None, sin límite).
+            per_device (int, optional): Movimientos simultáneos por dispositivo
+                                        (None, sin límite).
+        """
+        self.max_moves = max_moves
+        self.per_device = per_device
+        self._global = threading.BoundedSemaphore(max_moves) if max_moves else None
+        self._devices = {}
+        self._lock = threading.Lock()
+
+    @contextlib.contextmanager
+    def slot(self, *devices):
+        """
+        Ocupa una plaza mientras dura el bloque ``with``.
+
+        Args:
+            *devices (int): Dispositivos que toca el movimiento. Se ignoran los None.
+        """
+        semaphores = []
+        if self.per_device:
+            semaphores = [self._device_semaphore(device)
+                          for device in sorted(set(d for d in devices if d is not None))]
+        if self._global is not None:
+            semaphores.append(self._global)
+
+        acquired = []
+        try:
+            for semaphore in semaphores:
+                semaphore.acquire()
+                acquired.append(semaphore)
+            yield
+        finally:
+            for semaphore in reversed(acquired):
+                semaphore.release()
+
+    def _device_semaphore(self, device):
+        """Devuelve el semáforo de un dispositivo, creándolo la primera vez."""
+        with self._lock:
+            semaphore = self._devices.get(device)
+            if semaphore is None:
+                semaphore = self._devices[device] = threading.BoundedSemaphore(self.per_device)
+            return semaphore
+
+
+class RootResult:
+    """
+    Resultado de la organización de una raíz de un lote.
+
+    Attributes:
+        root (str): Directorio organizado.
+        stats (SortStats): Estadísticas de la ejecución, o None si no llegó a mover nada.
+        errors (list): Tuplas (filename, error_message). Si el directorio no pudo
+                       leerse, una sola tupla con filename None.
+        journal (str): Ruta del diario de la organización, o None.
+        cancelled (bool): True si se canceló antes de terminar.
+        moved (list): ``PlannedFile`` movidos. Sin plan (``stream``) queda vacía
+                      y su número está en ``stats``.
+        duplicates (list): ``Duplicate`` tratados o, en una simulación, encontrados.
+        estimate (SortEstimate): Estimación de una simulación, o None.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.stats = None
+        self.errors = []
+        self.journal = None
+        self.cancelled = False
+        self.moved = []
+        self.duplicates = []
+        self.estimate = None
+
+    def __repr__(self):
+        return (f"RootResult(root={self.root!r}, moved={self.stats.moved if self.stats else 0}, "
+                f"errors={len(self.errors)}, cancelled={self.cancelled})")
+
+
+def map_roots(function, roots, concurrency=DEFAULT_CONCURRENT_ROOTS, token=None):
+    """
+    Aplica una función a varias raíces en paralelo.
+
+    Args:
+        function (callable): Recibe la raíz y devuelve su resultado. Debe
+                             capturar sus propios errores.
+        roots (iterable): Directorios a procesar.
+        concurrency (int, optional): Raíces que se procesan a la vez.
+        token (ControlToken, optional): Testigo para no empezar más raíces tras cancelar.
+
+    Returns:
+        list: Los resultados, en el orden de ``roots``. Las raíces que no
+              llegaron a empezar por una cancelación tienen None.
+    """
+    roots = list(roots)
+    results = [None] * len(roots)
+
+    def process(i):
+        try:
+            check_token(token)
+        except OperationCancelled:
+            return
+        results[i] = function(roots[i])
+
+    if max(1, int(concurrency)) == 1 or len(roots) <= 1:
+        for i in range(len(roots)):
+            process(i)
+        return results
+
+    # concurrent.futures arrastra logging: se importa solo si hay varias raíces
+    from concurrent.futures import ThreadPoolExecutor
+
+    with ThreadPoolExecutor(max_workers=min(int(concurrency), len(roots))) as executor:
+        for future in [executor.submit(process, i) for i in range(len(roots))]:
+            future.result()
+    return results
+
+
+def sort_batch(roots, selected_extensions, depth=0, workers=DEFAULT_WORKERS,
+               concurrency=DEFAULT_CONCURRENT_ROOTS, max_moves=None, per_device=None,
+               token=None, journal=False, throughput=None, layout=None, dry_run=False,
+               dedup=None, hash_cache=None, classifier=None, sniffer=None, slowest=0,
+               stream=False, save_throughput=False):
+    """
+    Organiza varios directorios a la vez.
+
+    Cada raíz se escanea y se organiza con ``sort_files`` (o ``sort_stream``)
+    en su propio hilo. Todas comparten un ``IOLimiter``, por lo que el número
+    de movimientos en curso no supera ``max_moves`` en total ni ``per_device``
+    en un mismo disco, independientemente de cuántas raíces haya.
+
+    Args:
+        roots (iterable): Directorios a organizar.
+        selected_extensions (list): Lista de extensiones a organizar.
+        depth (int, optional): Niveles de subdirectorios a recorrer (ver ``scan_directory``).
+        workers (int, optional): Archivos que se mueven a la vez en cada raíz.
+        concurrency (int, optional): Raíces que se organizan a la vez.
+        max_moves (int, optional): Movimientos simultáneos en total (None, sin límite).
+        per_device (int, optional): Movimientos simultáneos por dispositivo
+                                    (None, sin límite).
+        token (ControlToken, optional): Testigo para pausar o cancelar todo el lote.
+        journal (bool, optional): Registrar cada raíz en un diario propio, que
+                                  puede deshacerse con ``undo_journal``.
+        throughput (ThroughputStore, optional): Almacén donde se anota la velocidad
+                                                medida de cada dispositivo.
+        layout (FolderLayout, optional): Disposición de las carpetas de destino
+                                         (ver ``sort_files``).
+        dry_run (bool, optional): Solo simular con ``estimate_sort``, sin mover nada.
+        dedup (str, optional): Acción para los archivos idénticos a otro de su
+                               carpeta (``DEDUP_ACTIONS``); cada raíz usa su
+                               propio ``Deduplicator``.
+        hash_cache (HashCache, optional): Caché de hashes compartida por las raíces.
+        classifier (ExtensionClassifier, optional): Clasificador de extensiones.
+        sniffer (ContentSniffer, optional): Detector por contenido compartido.
+        slowest (int, optional): Movimientos más lentos que se guardan en las
+                                 estadísticas de cada raíz.
+        stream (bool, optional): Mover mientras se lista, con ``sort_stream``. No
+                                 admite ``dry_run`` ni ``dedup``.
+        save_throughput (bool, optional): Guardar ``throughput`` al terminar el lote.
+
+    Returns:
+        list: Un ``RootResult`` por raíz, en el orden de ``roots``. Los errores de
+              una raíz no interrumpen las demás.
+
+    Raises:
+        ValueError: Si ``stream`` se combina con ``dry_run`` o ``dedup``, o si se
+                    borran duplicados sin ``journal``.
+    """
+    if stream and (dry_run or dedup):
+        raise ValueError("La organización sobre la marcha no admite simulación ni duplicados")
+    if dedup == DEDUP_DELETE and not journal and not dry_run:
+        raise ValueError("Borrar los duplicados necesita un diario para poder deshacerse")
+
+    roots = list(roots)
+    limiter = IOLimiter(max_moves, per_device)
+
+    def sort_root(root):
+        result = RootResult(os.path.abspath(root))
+        deduplicator = Deduplicator(dedup, cache=hash_cache) if dedup else None
+        move_journal = None
+        plan = None
+        files_to_move = []
+        try:
+            if not stream:
+                plan = plan_directory(root, depth, token, classifier=classifier,
+                                      sniffer=sniffer)
+            if dry_run:
+                result.estimate = estimate_sort(root, selected_extensions, plan=plan,
+                                                workers=workers, token=token,
+                                                dedup=deduplicator, throughput=throughput,
+                                                layout=layout)
+                result.duplicates = result.estimate.duplicates
+                return result
+
+            if plan is not None:
+                files_to_move = plan.select(selected_extensions)
+            if journal:
+                move_journal = MoveJournal(root=root)
+                result.journal = move_journal.path
+            if stream:
+                result.stats = sort_stream(root, selected_extensions, depth, workers=workers,
+                                           token=token, journal=move_journal,
+                                           throughput=throughput, slowest=slowest,
+                                           limiter=limiter, layout=layout,
+                                           classifier=classifier, sniffer=sniffer)
+            else:
+                result.stats = sort_files(root, selected_extensions, plan=plan, workers=workers,
+                                          token=token, dedup=deduplicator, journal=move_journal,
+                                          throughput=throughput, slowest=slowest,
+                                          limiter=limiter, layout=layout)
+        except OperationCancelled:
+            result.cancelled = True
+        except SortError as e:
+            result.errors = e.errors
+            result.stats = e.stats
+        except OSError as e:
+            result.errors = [(None, str(e))]
+        finally:
+            if plan is not None and not dry_run:
+                _collect_moved(result, plan, files_to_move, deduplicator)
+            if move_journal is not None:
+                move_journal.close()
+                if move_journal.empty:
+                    result.journal = None
+        return result
+
+    try:
+        results = map_roots(sort_root, roots, concurrency, token)
+    finally:
+        if save_throughput and throughput is not None:
+            try:
+                throughput.save()
+            except OSError:
+                pass
+    for i, root in enumerate(roots):
+        if results[i] is None:
+            results[i] = RootResult(os.path.abspath(root))
+            results[i].cancelled = True
+    return results
+
+
+# Funciones privadas auxiliares
+
+def _collect_moved(result, plan, files_to_move, deduplicator):
+    """Anota los archivos movidos y los duplicados tratados de una raíz."""
+    result.duplicates = deduplicator.handled if deduplicator is not None else []
+    # Los duplicados borrados tampoco quedan en el plan, pero no se movieron
+    removed = set()
+    if deduplicator is not None and deduplicator.removes_sources:
+        removed = set(id(duplicate.planned) for duplicate in result.duplicates)
+    remaining = set(map(id, plan.files))
+    result.moved = [f for f in files_to_move if id(f) not in remaining and id(f) not in removed]
@@ -0,0 +1,156 @@
+"""
+Módulo de clasificación de archivos por extensión.
+
+Contiene el clasificador que se construye una sola vez a partir de la tabla
+de extensiones (y de las asignaciones del usuario) y que obtiene la
+extensión y la categoría de un nombre de archivo, incluidos los sufijos
+compuestos como ``.tar.gz``, sin distinguir mayúsculas de minúsculas.
+"""
+
+import warnings
+from sorter.extensions import EXTENSION_GROUPS
+
+
+class MappingConflictWarning(UserWarning):
+    """Se emite al construir un clasificador con una extensión en dos categorías."""
+
+
+class ExtensionClassifier:
+    """
+    Clasificador de nombres de archivo por su sufijo más largo conocido.
+
+    Los sufijos se guardan en un índice por sufijo completo. Clasificar un
+    nombre consiste en buscar su última parte y, solo si es la terminación
+    de algún sufijo compuesto, probar antes los sufijos más largos
+    (``.tar.gz`` y luego ``.gz``). El índice incluye las variantes en
+    minúsculas, mayúsculas y capitalizadas de cada sufijo, así que en los
+    casos habituales la búsqueda no crea más cadenas que el propio sufijo;
+    solo las combinaciones mixtas (``.JpG``) se convierten a minúsculas.
+
+    Attributes:
+        mapping (dict): Extensión (en minúsculas) → categoría.
+        conflicts (list): Tuplas (extension, categoría descartada, categoría usada)
+                          de las extensiones asignadas a dos categorías en la
+                          tabla. Prevalece la última asignación, y cada conflicto
+                          que no resuelve ``overrides`` se avisa con un
+                          ``MappingConflictWarning``.
+    """
+
+    def __init__(self, groups=EXTENSION_GROUPS, overrides=None):
+        """
+        Construye el clasificador.
+
+        Args:
+            groups (iterable, optional): Pares (categoría, extensiones). Por defecto,
+                                         la tabla de ``sorter.extensions``.
+            overrides (dict, optional): Extensión → categoría definidas por el usuario.
+                                        Sustituyen a las de la tabla sin considerarse
+                                        un conflicto.
+
+        Raises:
+            ValueError: Si alguna extensión no empieza por un punto.
+        """
+        self.mapping = {}
+        self.conflicts = []
+
+        for category, extensions in groups:
+            for ext in extensions:
+                ext = _normalize_suffix(ext)
+                previous = self.mapping.get(ext)
+                if previous is not None and previous != category:
+                    self.conflicts.append((ext, previous, category))
+                self.mapping[ext] = category
+
+        overridden = set()
+        for ext, category in (overrides or {}).items():
+            ext = _normalize_suffix(ext)
+            self.mapping[ext] = category
+            overridden.add(ext)
+
+        for ext, discarded, used in self.conflicts:
+            if ext not in overridden:
+                warnings.warn(f"La extensión {ext} está en las categorías {discarded} y {used}; "
+                              f"se usa {used}", MappingConflictWarning, stacklevel=2)
+
+        self._table = {}
+        for ext, category in self.mapping.items():
+            match = (ext, category)
+            for variant in (ext, ext.upper(), ext.title()):
+                self._table[variant] = match
+
+        self._max_parts = max((ext.count('.') for ext in self.mapping), default=1)
+        self._compound_tails = set()
+        for ext in self.mapping:
+            if ext.count('.') > 1:
+                tail = ext[ext.rfind('.'):]
+                self._compound_tails.update((tail, tail.upper(), tail.title()))
+
+    def __contains__(self, extension):
+        return extension in self.mapping
+
+    def category(self, extension):
+        """
+        Obtiene la categoría de una extensión ya normalizada.
+
+        Returns:
+            str: Categoría, o None si la extensión no está soportada.
+        """
+        return self.mapping.get(extension)
+
+    def classify(self, filename):
+        """
+        Obtiene la extensión y la categoría de un nombre de archivo.
+
+        Como ``os.path.splitext``, los puntos iniciales forman parte del nombre
+        (``.bashrc`` no tiene extensión).
+
+        Args:
+            filename (str): Nombre del archivo, sin directorio.
+
+        Returns:
+            tuple: (extension, category) con la extensión en minúsculas, o None si
+                   el archivo no tiene una extensión soportada.
+        """
+        dot = filename.rfind('.')
+        if dot <= 0:
+            return None
+        if filename[0] == '.' and not filename[:dot].strip('.'):
+            return None
+
+        suffix = filename[dot:]
+        table = self._table
+        match = table.get(suffix)
+        if match is None and not suffix.islower():
+            suffix = suffix.lower()
+            match = table.get(suffix)
+
+        if suffix in self._compound_tails:
+            return self._classify_compound(filename, dot) or match
+        return match
+
+    def _classify_compound(self, filename, dot):
+        """Prueba los sufijos de varias partes, del más largo al más corto."""
+        start = len(filename) - len(filename.lstrip('.'))
+        positions = []
+        position = filename.rfind('.', 0, dot)
+        while position > start and len(positions) < self._max_parts - 1:
+            positions.append(position)
+            position = filename.rfind('.', 0, position)
+
+        for position in reversed(positions):
+            suffix = filename[position:]
+            match = self._table.get(suffix) or self._table.get(suffix.lower())
+            if match is not None:
+                return match
+        return None
+
+
+def _normalize_suffix(extension):
+    """Valida una extensión y la pasa a minúsculas."""
+    if not extension.startswith('.') or len(extension) < 2:
+        raise ValueError(f"Extensión no válida: {extension!r}")
+    return extension.lower()
+
+
+# Clasificador de la tabla por defecto
+DEFAULT_CLASSIFIER = ExtensionClassifier()
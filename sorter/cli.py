@@ -0,0 +1,617 @@
+"""
+Módulo de la línea de comandos.
+
+Permite organizar uno o varios directorios sin interfaz gráfica, por
+ejemplo desde tareas de cron o systemd en servidores sin pantalla. Solo depende de la
+lógica de negocio: nunca importa tkinter ni ``sorter.gui``.
+"""
+
+import argparse
+import json
+import os
+import signal
+import sqlite3
+import sys
+from sorter import strings
+from sorter.batch import DEFAULT_CONCURRENT_ROOTS, sort_batch
+from sorter.classifier import DEFAULT_CLASSIFIER, ExtensionClassifier
+from sorter.control import ControlToken, OperationCancelled
+from sorter.core import DEFAULT_WORKERS, SortError, get_extensions_by_category
+from sorter.extensions import EXTENSIONS
+from sorter.dedup import DEDUP_ACTIONS, DEDUP_DELETE, HashCache
+from sorter.estimate import ThroughputStore
+from sorter.journal import DONE, MoveJournal, recover_all, undo_journal
+from sorter.layout import BUCKETS, FolderLayout
+from sorter.progress import format_bytes, format_duration
+from sorter.sniff import ContentSniffer, SniffCache
+
+EXIT_OK = 0
+EXIT_ERRORS = 1
+EXIT_CANCELLED = 130
+
+
+def main(argv=None):
+    """
+    Ejecuta la línea de comandos.
+
+    Args:
+        argv (list, optional): Argumentos sin el nombre del programa.
+                               Por defecto, los de ``sys.argv``.
+
+    Returns:
+        int: Código de salida: 0 si todo se movió, 1 si hubo errores,
+             2 si los argumentos no son válidos y 130 si se canceló.
+
+    Note:
+        Antes de nada se recuperan las organizaciones que quedaron a medias
+        en una ejecución anterior interrumpida.
+    """
+    parser = _build_parser()
+    args = parser.parse_args(argv)
+
+    if args.undo is not None:
+        if not os.path.isfile(args.undo):
+            parser.error(strings.CLI_ERROR_NO_JOURNAL.format(args.undo))
+    elif not args.path:
+        parser.error(strings.CLI_ERROR_NO_PATH)
+    for path in args.path:
+        if not os.path.isdir(path):
+            parser.error(strings.CLI_ERROR_NO_DIRECTORY.format(path))
+    if args.workers < 1:
+        parser.error(strings.CLI_ERROR_WORKERS)
+    for option, value in (("--parallel", args.parallel), ("--max-moves", args.max_moves),
+                          ("--per-device", args.per_device)):
+        if value is not None and value < 1:
+            parser.error(strings.CLI_ERROR_LIMIT.format(option))
+    if args.dedup == DEDUP_DELETE and args.no_journal:
+        parser.error(strings.CLI_ERROR_DEDUP_JOURNAL)
+    if args.stream:
+        for option, value in (("--dry-run", args.dry_run), ("--dedup", args.dedup)):
+            if value:
+                parser.error(strings.CLI_ERROR_STREAM.format(option))
+    if args.watch:
+        if len(args.path) != 1:
+            parser.error(strings.CLI_ERROR_WATCH_PATHS)
+        for option, value in (("--dry-run", args.dry_run), ("--dedup", args.dedup),
+                              ("--stream", args.stream), ("--undo", args.undo)):
+            if value:
+                parser.error(strings.CLI_ERROR_WATCH.format(option))
+    try:
+        classifier = _build_classifier(args.map)
+        selected = _selected_extensions(args.extension, args.category, classifier)
+    except ValueError as e:
+        parser.error(str(e))
+
+    # Solo las órdenes que mueven archivos recuperan los diarios; --undo
+    # recupera únicamente el suyo
+    if not args.dry_run and args.undo is None:
+        _recover_interrupted()
+
+    depth = None if args.recursive else args.depth
+    token = ControlToken()
+    previous_handler = _cancel_on_interrupt(token)
+    try:
+        if args.watch:
+            return watch(args.path[0], selected, args.workers, token, not args.no_journal,
+                         args.bucket, args.json, classifier)
+        if args.undo is not None:
+            result = undo(args.undo, args.workers, token)
+        elif len(args.path) == 1 and args.max_moves is None and args.per_device is None:
+            result = run(args.path[0], selected, depth, args.dry_run, args.workers, token,
+                         args.sniff, args.dedup, not args.no_journal, args.slowest,
+                         bucket=args.bucket, stream=args.stream, classifier=classifier)
+        else:
+            result = run_batch(args.path, selected, depth, args.dry_run, args.workers, token,
+                               args.sniff, args.dedup, not args.no_journal, args.slowest,
+                               args.parallel, args.max_moves, args.per_device, args.bucket,
+                               args.stream, classifier)
+    finally:
+        signal.signal(signal.SIGINT, previous_handler)
+
+    if args.json:
+        json.dump(result, sys.stdout, ensure_ascii=False, indent=2)
+        sys.stdout.write("\n")
+    else:
+        _print_result(result, args.stats)
+
+    if result["cancelled"]:
+        return EXIT_CANCELLED
+    return EXIT_ERRORS if result["errors"] else EXIT_OK
+
+
+def run(path, selected_extensions, depth=0, dry_run=False, workers=DEFAULT_WORKERS, token=None,
+        sniff=False, dedup=None, journal=True, slowest=0, bucket=None, stream=False,
+        classifier=None):
+    """
+    Organiza un directorio y resume el resultado en un diccionario serializable.
+
+    Es ``run_batch`` con un solo directorio.
+
+    Args:
+        path (str): Directorio a organizar.
+        selected_extensions (iterable): Extensiones a organizar.
+        depth (int, optional): Niveles de subdirectorios a recorrer (None, todos).
+        dry_run (bool, optional): Solo planificar, sin mover ningún archivo.
+        workers (int, optional): Archivos que se mueven a la vez.
+        token (ControlToken, optional): Testigo para cancelar la organización.
+        sniff (bool, optional): Clasificar por su contenido los archivos sin
+                                extensión soportada.
+        dedup (str, optional): Acción para los archivos idénticos a otro de su
+                               carpeta de categoría (``DEDUP_ACTIONS``).
+        journal (bool, optional): Registrar los movimientos en un diario nuevo
+                                  para poder deshacerlos con ``undo``.
+        slowest (int, optional): Movimientos más lentos que se incluyen en las
+                                 estadísticas.
+        bucket (str, optional): Subcarpetas dentro de cada categoría (``BUCKETS``):
+                                por año, por mes o por tamaño.
+        stream (bool, optional): Mover los archivos mientras se lista el directorio
+                                 con ``sort_stream``. No admite ``dry_run`` ni
+                                 ``dedup`` y el resultado no enumera los archivos
+                                 movidos: su número está en ``stats``.
+        classifier (ExtensionClassifier, optional): Clasificador con las asignaciones
+                                                    de extensiones del usuario.
+
+    Returns:
+        dict: Con ``path``, ``dry_run``, ``cancelled``, ``journal`` (ruta del
+              diario o None), ``files`` (los archivos movidos, o los que se
+              moverían en una simulación, con su ruta relativa, categoría y
+              tamaño), ``duplicates`` (archivo y original) y ``errors``
+              (archivo y mensaje). En una simulación, cada archivo indica
+              también su destino (``target``) y ``estimate`` resume el plan:
+              totales por categoría, renombrados, reparto entre renombrados y
+              copias a otro dispositivo y duración estimada en segundos. Si
+              se han movido archivos, ``stats`` contiene las estadísticas de
+              ``SortStats``.
+    """
+    return run_batch([path], selected_extensions, depth, dry_run, workers, token, sniff, dedup,
+                     journal, slowest, 1, bucket=bucket, stream=stream,
+                     classifier=classifier)["roots"][0]
+
+
+def run_batch(paths, selected_extensions, depth=0, dry_run=False, workers=DEFAULT_WORKERS,
+              token=None, sniff=False, dedup=None, journal=True, slowest=0,
+              concurrency=None, max_moves=None, per_device=None, bucket=None, stream=False,
+              classifier=None):
+    """
+    Organiza varios directorios a la vez con límites de movimientos compartidos.
+
+    Prepara los recursos compartidos (almacén de velocidades, caché de hashes y
+    detector por contenido), organiza los directorios con ``sort_batch`` y
+    resume el resultado de cada uno como ``run``.
+
+    Args:
+        paths (list): Directorios a organizar.
+        concurrency (int, optional): Directorios que se organizan a la vez
+                                     (por defecto, ``DEFAULT_CONCURRENT_ROOTS``).
+        max_moves (int, optional): Movimientos simultáneos en total (None, sin límite).
+        per_device (int, optional): Movimientos simultáneos por dispositivo
+                                    (None, sin límite).
+
+        El resto de argumentos son los de ``run`` y se aplican a cada directorio.
+
+    Returns:
+        dict: Con ``roots`` (el resultado de ``run`` de cada directorio, en
+              orden), ``cancelled`` (True si se canceló alguno) y ``errors``
+              (los de todos los directorios, cada uno con su ``path``).
+    """
+    hash_cache = _open_hash_cache() if dedup else None
+    sniff_cache = _open_sniff_cache() if sniff else None
+    try:
+        results = sort_batch(
+            paths, selected_extensions, depth, workers, concurrency or DEFAULT_CONCURRENT_ROOTS,
+            max_moves, per_device, token, journal, ThroughputStore(), FolderLayout(bucket),
+            dry_run=dry_run, dedup=dedup, hash_cache=hash_cache, classifier=classifier,
+            sniffer=ContentSniffer(classifier=classifier, cache=sniff_cache) if sniff else None,
+            slowest=slowest, stream=stream, save_throughput=not dry_run
+        )
+    finally:
+        for cache in (hash_cache, sniff_cache):
+            if cache is not None:
+                cache.close()
+
+    roots = [_describe_root(result, dry_run, stream) for result in results]
+    return {
+        "roots": roots,
+        "cancelled": any(root["cancelled"] for root in roots),
+        "errors": [dict(error, path=root["path"]) for root in roots for error in root["errors"]],
+    }
+
+
+def watch(path, selected_extensions, workers=DEFAULT_WORKERS, token=None, journal=True,
+          bucket=None, as_json=False, classifier=None):
+    """
+    Vigila un directorio y organiza los archivos que llegan hasta que se cancele.
+
+    Cada lote organizado se muestra al terminar: en formato legible o, con
+    ``as_json``, como un objeto JSON por línea con ``path``, ``files``,
+    ``stats`` y ``errors``. Los archivos que fallan se reintentan más tarde.
+
+    Args:
+        path (str): Directorio a vigilar.
+        selected_extensions (iterable): Extensiones a organizar.
+        workers (int, optional): Archivos que se mueven a la vez en cada lote.
+        token (ControlToken, optional): Testigo para detener la vigilancia.
+        journal (bool, optional): Registrar todos los lotes en un diario para
+                                  poder deshacerlos con ``undo``.
+        bucket (str, optional): Subcarpetas dentro de cada categoría (``BUCKETS``).
+        as_json (bool, optional): Mostrar cada lote en JSON.
+        classifier (ExtensionClassifier, optional): Clasificador con las asignaciones
+                                                    de extensiones del usuario.
+
+    Returns:
+        int: ``EXIT_OK`` al detenerse mediante ``token`` y ``EXIT_ERRORS`` si el
+             directorio deja de existir o no puede vigilarse.
+    """
+    # watch carga ctypes para inotify: se importa solo al vigilar
+    from sorter.watch import watch_directory
+
+    def on_batch(batch, stats, error):
+        if isinstance(error, SortError):
+            errors = [{"file": f, "error": msg} for f, msg in error.errors]
+        elif error is not None:
+            errors = [{"file": None, "error": str(error)}]
+        else:
+            errors = []
+        if as_json:
+            json.dump({"path": os.path.abspath(path),
+                       "files": [_describe_file(planned) for planned in batch],
+                       "stats": stats.as_dict() if stats else None,
+                       "errors": errors}, sys.stdout, ensure_ascii=False)
+            sys.stdout.write("\n")
+        else:
+            _print_errors(errors)
+            print(strings.CLI_WATCH_BATCH.format(stats.moved if stats else 0, len(errors)))
+        sys.stdout.flush()
+
+    move_journal = MoveJournal(root=path) if journal else None
+    if not as_json:
+        print(strings.CLI_WATCHING.format(os.path.abspath(path)), flush=True)
+    try:
+        watch_directory(path, selected_extensions, token=token, workers=workers,
+                        on_batch=on_batch, journal=move_journal, layout=FolderLayout(bucket),
+                        classifier=classifier)
+    except OperationCancelled:
+        return EXIT_OK
+    except OSError as e:
+        _print_errors([{"file": None, "error": str(e)}])
+        return EXIT_ERRORS
+    finally:
+        if move_journal is not None:
+            move_journal.close()
+            if not move_journal.empty and not as_json:
+                print(strings.CLI_JOURNAL.format(move_journal.path))
+    return EXIT_OK
+
+
+def undo(journal_path, workers=DEFAULT_WORKERS, token=None):
+    """
+    Deshace la organización registrada en un diario.
+
+    Args:
+        journal_path (str): Diario de la organización.
+        workers (int, optional): Archivos que se devuelven a la vez.
+        token (ControlToken, optional): Testigo para cancelar la operación.
+
+    Returns:
+        dict: Con ``journal``, ``cancelled``, ``files`` (las rutas originales
+              restauradas) y ``errors`` (archivo y mensaje).
+    """
+    result = {
+        "journal": os.path.abspath(journal_path),
+        "cancelled": False,
+        "files": [],
+        "errors": [],
+    }
+
+    try:
+        undone, errors = undo_journal(journal_path, workers, token)
+        # Un duplicado enlazado aparece dos veces: se separa del original y se devuelve
+        result["files"] = list(dict.fromkeys(move["src"] for move in undone))
+        result["errors"] = [{"file": f, "error": msg} for f, msg in errors]
+    except OperationCancelled:
+        result["cancelled"] = True
+    except OSError as e:
+        result["errors"] = [{"file": None, "error": str(e)}]
+
+    return result
+
+
+# Funciones privadas auxiliares
+
+def _build_parser():
+    """Define los argumentos de la línea de comandos."""
+    parser = argparse.ArgumentParser(prog="sorter", description=strings.CLI_DESCRIPTION)
+    parser.add_argument("path", nargs="*", help=strings.CLI_HELP_PATH)
+    parser.add_argument("-e", "--extension", action="append", default=[],
+                        help=strings.CLI_HELP_EXTENSION)
+    parser.add_argument("-c", "--category", action="append", default=[],
+                        help=strings.CLI_HELP_CATEGORY)
+    parser.add_argument("-d", "--depth", type=int, default=0, help=strings.CLI_HELP_DEPTH)
+    parser.add_argument("-r", "--recursive", action="store_true", help=strings.CLI_HELP_RECURSIVE)
+    parser.add_argument("-n", "--dry-run", action="store_true", help=strings.CLI_HELP_DRY_RUN)
+    parser.add_argument("-w", "--workers", type=int, default=DEFAULT_WORKERS,
+                        help=strings.CLI_HELP_WORKERS.format(DEFAULT_WORKERS))
+    parser.add_argument("-s", "--sniff", action="store_true", help=strings.CLI_HELP_SNIFF)
+    parser.add_argument("--dedup", choices=DEDUP_ACTIONS, help=strings.CLI_HELP_DEDUP)
+    parser.add_argument("--bucket", choices=BUCKETS, help=strings.CLI_HELP_BUCKET)
+    parser.add_argument("--map", action="append", default=[], metavar="EXT=CATEGORÍA",
+                        help=strings.CLI_HELP_MAP)
+    parser.add_argument("--no-journal", action="store_true", help=strings.CLI_HELP_NO_JOURNAL)
+    parser.add_argument("--undo", metavar="DIARIO", help=strings.CLI_HELP_UNDO)
+    parser.add_argument("--parallel", type=int, metavar="N",
+                        help=strings.CLI_HELP_PARALLEL.format(DEFAULT_CONCURRENT_ROOTS))
+    parser.add_argument("--max-moves", type=int, metavar="N", help=strings.CLI_HELP_MAX_MOVES)
+    parser.add_argument("--per-device", type=int, metavar="N", help=strings.CLI_HELP_PER_DEVICE)
+    parser.add_argument("--stream", action="store_true", help=strings.CLI_HELP_STREAM)
+    parser.add_argument("--watch", action="store_true", help=strings.CLI_HELP_WATCH)
+    parser.add_argument("--stats", action="store_true", help=strings.CLI_HELP_STATS)
+    parser.add_argument("--slowest", type=int, default=0, metavar="N", help=strings.CLI_HELP_SLOWEST)
+    parser.add_argument("--json", action="store_true", help=strings.CLI_HELP_JSON)
+    return parser
+
+
+def _build_classifier(mappings):
+    """
+    Construye el clasificador con las asignaciones ``EXTENSIÓN=CATEGORÍA`` de ``--map``.
+
+    Returns:
+        ExtensionClassifier: El clasificador por defecto si no hay asignaciones.
+
+    Raises:
+        ValueError: Si una asignación no es válida o su categoría no existe.
+    """
+    if not mappings:
+        return DEFAULT_CLASSIFIER
+
+    categories = {name.casefold(): name for name in set(EXTENSIONS.values())}
+    overrides = {}
+    for mapping in mappings:
+        ext, separator, category = mapping.partition("=")
+        ext = ext.strip().lower()
+        if not separator or not ext.strip(".") or not category.strip():
+            raise ValueError(strings.CLI_ERROR_MAP.format(mapping))
+        name = categories.get(category.strip().casefold())
+        if name is None:
+            available = ", ".join(sorted(categories.values()))
+            raise ValueError(strings.CLI_ERROR_UNKNOWN_CATEGORY.format(category, available))
+        overrides[ext if ext.startswith(".") else "." + ext] = name
+    return ExtensionClassifier(overrides=overrides)
+
+
+def _selected_extensions(extensions, categories, classifier=DEFAULT_CLASSIFIER):
+    """
+    Combina las extensiones y categorías indicadas; sin ninguna, selecciona todas.
+
+    Raises:
+        ValueError: Si alguna extensión o categoría no existe.
+    """
+    mapping = classifier.mapping
+    if not extensions and not categories:
+        return set(mapping)
+
+    selected = set()
+    for ext in extensions:
+        ext = ext.lower() if ext.startswith(".") else "." + ext.lower()
+        if ext not in mapping:
+            raise ValueError(strings.CLI_ERROR_UNKNOWN_EXTENSION.format(ext))
+        selected.add(ext)
+
+    by_category = {name.casefold(): exts
+                   for name, exts in get_extensions_by_category(classifier).items()}
+    for category in categories:
+        exts = by_category.get(category.casefold())
+        if exts is None:
+            available = ", ".join(sorted(set(mapping.values())))
+            raise ValueError(strings.CLI_ERROR_UNKNOWN_CATEGORY.format(category, available))
+        selected.update(exts)
+
+    return selected
+
+
+def _cancel_on_interrupt(token):
+    """
+    Convierte el primer Ctrl+C en una cancelación ordenada mediante ``token``.
+
+    Un segundo Ctrl+C interrumpe el programa de inmediato.
+
+    Returns:
+        Manejador de SIGINT anterior, para restaurarlo al terminar.
+    """
+    def handle_interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        token.cancel()
+
+    return signal.signal(signal.SIGINT, handle_interrupt)
+
+
+def _recover_interrupted():
+    """Recupera los diarios de ejecuciones interrumpidas e informa por la salida de errores."""
+    try:
+        recovered = recover_all()
+    except OSError:
+        return
+
+    for journal_path, outcomes in recovered.items():
+        completed = sum(1 for _, outcome in outcomes if outcome == DONE)
+        print(strings.CLI_RECOVERED.format(journal_path, completed, len(outcomes) - completed),
+              file=sys.stderr)
+
+
+def _open_hash_cache():
+    """Abre la caché de hashes; sin ella los duplicados se comparan igualmente."""
+    try:
+        return HashCache()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _describe_root(result, dry_run, stream=False):
+    """Resume el ``RootResult`` de un directorio en el diccionario de ``run``."""
+    described = _new_result(result.root, dry_run)
+    described.update(
+        stream=stream,
+        cancelled=result.cancelled,
+        journal=result.journal,
+        duplicates=[_describe_duplicate(d) for d in result.duplicates],
+        errors=[{"file": f, "error": msg} for f, msg in result.errors],
+        stats=result.stats.as_dict() if result.stats is not None else None,
+    )
+    if result.estimate is not None:
+        described["files"] = [
+            dict(_describe_file(planned), target=os.path.relpath(target_path, result.root))
+            for planned, target_path, _ in result.estimate.moves
+        ]
+        described["estimate"] = _describe_estimate(result.estimate)
+    else:
+        described["files"] = [_describe_file(planned) for planned in result.moved]
+    return described
+
+
+def _open_sniff_cache():
+    """Abre la caché de formatos; sin ella los archivos se leen en cada ejecución."""
+    try:
+        return SniffCache()
+    except (OSError, sqlite3.Error):
+        return None
+
+
+def _new_result(path, dry_run):
+    """Crea el resultado vacío de la organización de un directorio."""
+    return {
+        "path": os.path.abspath(path),
+        "dry_run": dry_run,
+        "cancelled": False,
+        "journal": None,
+        "files": [],
+        "duplicates": [],
+        "errors": [],
+        "stats": None,
+    }
+
+
+def _describe_estimate(estimate):
+    """Resume la estimación de una simulación para la salida."""
+    return {
+        "categories": estimate.categories,
+        "renamed": [{"file": f, "name": name} for f, name in estimate.renamed],
+        "same_device": estimate.same_device,
+        "cross_device": estimate.cross_device,
+        "seconds": estimate.seconds,
+        "measured": estimate.measured,
+    }
+
+
+def _describe_duplicate(duplicate):
+    """Resume un duplicado para la salida."""
+    original = duplicate.original
+    return {
+        "file": duplicate.planned.relative_path,
+        "original": original if isinstance(original, str) else original.relative_path,
+    }
+
+
+def _describe_file(planned):
+    """Resume un archivo del plan para la salida."""
+    return {
+        "file": planned.relative_path,
+        "category": planned.category,
+        "size": planned.size,
+    }
+
+
+def _print_result(result, stats=False):
+    """Muestra el resultado en formato legible y, si se pide, sus estadísticas."""
+    if "roots" in result:
+        _print_batch_result(result, stats)
+        return
+    if "dry_run" not in result:
+        _print_undo_result(result)
+        return
+
+    if result["dry_run"]:
+        for item in result["files"]:
+            print(strings.CLI_PLANNED_FILE.format(item["file"], item["target"]))
+    for item in result["duplicates"]:
+        print(strings.CLI_DUPLICATE.format(item["file"], item["original"]))
+
+    _print_errors(result["errors"])
+
+    if result["cancelled"]:
+        print(strings.CLI_CANCELLED, file=sys.stderr)
+    if result["dry_run"]:
+        print(strings.CLI_SUMMARY_DRY_RUN.format(len(result["files"])))
+        if "estimate" in result:
+            _print_estimate(result["estimate"])
+    else:
+        print(strings.CLI_SUMMARY.format(_moved_count(result), len(result["errors"])))
+    if result["journal"] and (result["files"] or result["duplicates"] or result.get("stream")):
+        print(strings.CLI_JOURNAL.format(result["journal"]))
+    if stats and result["stats"]:
+        _print_stats(result["stats"])
+
+
+def _print_batch_result(result, stats=False):
+    """Muestra el resultado de cada directorio de un lote y el total."""
+    for root in result["roots"]:
+        print(strings.CLI_BATCH_ROOT.format(root["path"]))
+        _print_result(root, stats)
+
+    roots = result["roots"]
+    print(strings.CLI_BATCH_SUMMARY.format(
+        len(roots),
+        sum(_moved_count(root) for root in roots if not root["dry_run"]),
+        len(result["errors"]),
+        sum(1 for root in roots if root["cancelled"]),
+    ))
+
+
+def _moved_count(result):
+    """Archivos movidos de un resultado; sin lista de archivos, los de sus estadísticas."""
+    if result.get("stream"):
+        return result["stats"]["moved"] if result["stats"] else 0
+    return len(result["files"])
+
+
+def _print_estimate(estimate):
+    """Muestra los totales y la duración estimada de una simulación."""
+    for category, totals in estimate["categories"].items():
+        print(strings.CLI_ESTIMATE_CATEGORY.format(category, totals["count"],
+                                                   format_bytes(totals["bytes"])))
+    print(strings.CLI_ESTIMATE_MOVES.format(
+        estimate["same_device"]["count"],
+        estimate["cross_device"]["count"],
+        format_bytes(estimate["cross_device"]["bytes"]),
+        len(estimate["renamed"]),
+    ))
+    note = "" if estimate["measured"] else strings.CLI_ESTIMATE_GUESSED
+    print(strings.CLI_ESTIMATE_DURATION.format(format_duration(estimate["seconds"])) + note)
+
+
+def _print_stats(stats):
+    """Muestra el tiempo de cada fase y los recuentos de una organización."""
+    for phase, seconds in stats["timings"].items():
+        print(strings.CLI_STATS_PHASE.format(phase, seconds))
+    print(strings.CLI_STATS_COUNTS.format(stats["moved"], stats["renamed"], stats["skipped"],
+                                          stats["failed"], format_bytes(stats["bytes_moved"])))
+    for label, split in ((strings.CLI_STATS_SAME_DEVICE, stats["same_device"]),
+                         (strings.CLI_STATS_CROSS_DEVICE, stats["cross_device"])):
+        print(strings.CLI_STATS_SPLIT.format(label, split["count"], format_bytes(split["bytes"]),
+                                             split["seconds"]))
+    for move in stats["slowest"]:
+        print(strings.CLI_STATS_SLOW_MOVE.format(move["seconds"] * 1000, move["file"],
+                                                 format_bytes(move["size"])))
+
+
+def _print_errors(errors):
+    """Muestra los errores por la salida de errores."""
+    for item in errors:
+        prefix = f"- {item['file']}: " if item["file"] else ""
+        print(prefix + item["error"], file=sys.stderr)
+
+
+def _print_undo_result(result):
+    """Muestra el resultado de deshacer un diario en formato legible."""
+    _print_errors(result["errors"])
+    if result["cancelled"]:
+        print(strings.CLI_CANCELLED, file=sys.stderr)
+    print(strings.CLI_UNDONE.format(len(result["files"]), len(result["errors"])))
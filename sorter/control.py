@@ -0,0 +1,71 @@
+"""
+Módulo de control de operaciones en curso.
+
+Contiene el testigo que permite cancelar o pausar desde otro hilo un
+escaneo o una organización en marcha.
+"""
+
+import threading
+
+
+class OperationCancelled(Exception):
+    """Se lanza cuando una operación se interrumpe a petición del usuario."""
+
+
+class ControlToken:
+    """
+    Testigo compartido entre quien lanza una operación y el hilo que la ejecuta.
+
+    La operación llama a ``check`` en puntos seguros (entre archivos, entre
+    entradas del directorio o entre bloques de una copia): mientras el testigo
+    está en pausa, ``check`` bloquea el hilo, y en cuanto se ha pedido la
+    cancelación se interrumpe con ``OperationCancelled``.
+    """
+
+    def __init__(self):
+        """Inicializa el testigo sin cancelar ni pausar."""
+        self._cancelled = threading.Event()
+        self._running = threading.Event()
+        self._running.set()
+
+    @property
+    def cancelled(self):
+        """bool: True si se ha pedido la cancelación."""
+        return self._cancelled.is_set()
+
+    @property
+    def paused(self):
+        """bool: True si la operación está en pausa."""
+        return not self._running.is_set()
+
+    def cancel(self):
+        """Pide la cancelación de la operación, también si está en pausa."""
+        self._cancelled.set()
+        self._running.set()
+
+    def pause(self):
+        """Pausa la operación en el siguiente punto seguro."""
+        if not self._cancelled.is_set():
+            self._running.clear()
+
+    def resume(self):
+        """Reanuda una operación en pausa."""
+        self._running.set()
+
+    def check(self):
+        """
+        Comprueba si debe interrumpirse la operación, esperando si está en pausa.
+
+        Raises:
+            OperationCancelled: Si se ha pedido la cancelación.
+        """
+        if not self._running.is_set():
+            self._running.wait()
+        if self._cancelled.is_set():
+            raise OperationCancelled()
+
+
+def check_token(token):
+    """Comprueba el testigo si se ha indicado uno."""
+    if token is not None:
+        token.check()
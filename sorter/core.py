@@ -6,39 +6,90 @@ y gestionar las extensiones soportadas.
 """
 
 import os
-import shutil
-from sorter.strings import EXTENSIONS
+import queue
+import threading
+import time
+from sorter.classifier import DEFAULT_CLASSIFIER
+from sorter.control import ControlToken, check_token
+from sorter.engine import DEFAULT_WORKERS, MoveEngine
+from sorter.estimate import estimate_moves
+from sorter.plan import PlannedFile, ScanSummary, SortPlan
+from sorter.progress import ProgressReporter
+from sorter.stats import SortStats
+from sorter.extensions import EXTENSIONS
 
+CATEGORY_FOLDERS = frozenset(EXTENSIONS.values())
 
-def scan_directory(path):
+# Archivos listados que esperan a moverse como máximo en ``sort_stream``
+DEFAULT_STREAM_QUEUE = 1024
+
+# Segundos entre comprobaciones del testigo mientras la cola está llena
+_STREAM_POLL = 0.1
+
+
+class SortError(OSError):
+    """
+    Se lanza cuando algunos archivos no pudieron moverse.
+
+    Attributes:
+        errors (list): Tuplas (filename, error_message) de cada archivo fallido.
+        stats (SortStats): Estadísticas de la ejecución, si se conocen.
+    """
+
+    def __init__(self, errors, stats=None):
+        self.errors = list(errors)
+        self.stats = stats
+        error_msg = "\n".join([f"- {f}: {msg}" for f, msg in self.errors])
+        super().__init__(f"Algunos archivos no pudieron moverse:\n{error_msg}")
+
+
+def scan_directory(path, depth=0, token=None, index=None, classifier=None, sniffer=None):
     """
     Escanea un directorio y cuenta los archivos por extensión.
     
     Args:
         path (str): Ruta del directorio a escanear.
+        depth (int, optional): Niveles de subdirectorios a recorrer. 0 (por defecto)
+                               analiza solo el nivel superior, N desciende hasta N
+                               niveles y None recorre el árbol completo.
+        token (ControlToken, optional): Testigo para cancelar el escaneo desde otro hilo.
+        index (ScanIndex, optional): Índice persistente; los directorios sin cambios
+                                     desde el último escaneo no vuelven a listarse.
+        classifier (ExtensionClassifier, optional): Clasificador de extensiones. Por
+                                                    defecto, el de la tabla de
+                                                    ``sorter.extensions``. Con ``index``
+                                                    se usa el del índice.
+        sniffer (ContentSniffer, optional): Detector por contenido para los archivos
+                                            sin extensión soportada (ver ``plan_directory``).
     
     Returns:
         dict: Diccionario con extensiones como claves y información sobre
-              los archivos encontrados (count, files, category).
+              los archivos encontrados (count, files, category). Los archivos
+              de subdirectorios se indican con su ruta relativa a ``path``.
+    
+    Note:
+        Guarda el nombre de cada archivo. Si solo se necesitan los totales,
+        ``summarize_directory`` cuenta en memoria constante.
     
     Raises:
         PermissionError: Si no hay permisos para acceder al directorio.
         OSError: Si ocurre un error al acceder al sistema de archivos.
+        OperationCancelled: Si se cancela mediante ``token``.
     """
     if not os.path.exists(path):
         return {}
     
+    if index is not None or sniffer is not None:
+        return plan_directory(path, depth, token, index, classifier, sniffer).summary()
+    
+    classify = (classifier or DEFAULT_CLASSIFIER).classify
     results = {}
     
     try:
-        for root, _, files in os.walk(path):
-            if root != path:
-                continue
-                
-            for file in files:
-                ext = _get_file_extension(file)
-                if ext in EXTENSIONS:
-                    _add_file_to_results(results, ext, file)
+        for relative_name, entry in iter_files(path, depth, token):
+            match = classify(entry.name)
+            if match is not None:
+                _add_file_to_results(results, match, relative_name)
                     
     except PermissionError:
         raise PermissionError(f"No hay permisos para acceder a: {path}")
@@ -48,7 +99,183 @@ def scan_directory(path):
     return results
 
 
-def sort_files(path, selected_extensions, progress_callback=None):
+def plan_directory(path, depth=0, token=None, index=None, classifier=None, sniffer=None):
+    """
+    Escanea un directorio y genera un plan reutilizable por ``sort_files``.
+    
+    A diferencia de ``scan_directory``, conserva los metadatos de cada archivo
+    (extensión, categoría, tamaño y dispositivo) obtenidos del propio listado,
+    de modo que la organización posterior no vuelve a listar el directorio
+    ni a consultar cada archivo.
+    
+    Args:
+        path (str): Ruta del directorio a escanear.
+        depth (int, optional): Niveles de subdirectorios a recorrer (ver ``scan_directory``).
+        token (ControlToken, optional): Testigo para cancelar el escaneo desde otro hilo.
+        index (ScanIndex, optional): Índice persistente; los directorios cuyo mtime,
+                                     inodo y dispositivo no han cambiado se leen del
+                                     índice sin listarlos. Los tamaños y fechas
+                                     guardados no reflejan cambios de contenido
+                                     posteriores, así que con una disposición
+                                     por fecha o tamaño ``sort_files`` vuelve
+                                     a consultar los archivos que organiza.
+        classifier (ExtensionClassifier, optional): Clasificador de extensiones
+                                                    (ver ``scan_directory``).
+        sniffer (ContentSniffer, optional): Detector por contenido. Los archivos sin
+                                            extensión o con una extensión no soportada
+                                            se clasifican leyendo su cabecera y se
+                                            incluyen con la extensión detectada. Como
+                                            requiere el listado real, no usa ``index``.
+    
+    Returns:
+        SortPlan: Plan con los archivos de extensiones soportadas.
+    
+    Raises:
+        PermissionError: Si no hay permisos para acceder al directorio.
+        OSError: Si ocurre un error al acceder al sistema de archivos.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    plan = SortPlan(path, depth)
+    
+    if not os.path.exists(path):
+        return plan
+    
+    started = time.perf_counter()
+    classifying = 0.0
+    try:
+        if index is not None and sniffer is None:
+            plan.indexed = True
+            with index.batch():
+                for planned in _iter_indexed_files(path, depth, token, index,
+                                                   classifier or DEFAULT_CLASSIFIER):
+                    plan.add(planned)
+        else:
+            classifying = _classify_files(plan.add, path, depth, token,
+                                          classifier or DEFAULT_CLASSIFIER, sniffer)
+    
+    except PermissionError:
+        raise PermissionError(f"No hay permisos para acceder a: {path}")
+    except OSError as e:
+        raise OSError(f"Error al acceder al directorio: {str(e)}")
+    
+    plan.timings = {
+        'listing': time.perf_counter() - started - classifying,
+        'classification': classifying,
+    }
+    return plan
+
+
+def summarize_directory(path, depth=0, token=None, index=None, sizes=True,
+                        max_files=None, until_seen=None, classifier=None):
+    """
+    Cuenta los archivos y bytes de un directorio por extensión sin guardar sus nombres.
+    
+    La memoria usada depende del número de extensiones distintas, no del de
+    archivos, por lo que sirve para directorios de millones de entradas.
+    Puede detenerse antes de terminar para dar una respuesta inmediata.
+    
+    Args:
+        path (str): Ruta del directorio a escanear.
+        depth (int, optional): Niveles de subdirectorios a recorrer (ver ``scan_directory``).
+        token (ControlToken, optional): Testigo para cancelar el escaneo desde otro hilo.
+        index (ScanIndex, optional): Índice persistente (ver ``plan_directory``).
+        sizes (bool, optional): Sumar los tamaños. Sin índice, requiere consultar
+                                cada archivo soportado; con False solo se cuentan.
+        max_files (int, optional): Detenerse tras examinar este número de archivos.
+        until_seen (iterable, optional): Detenerse en cuanto se hayan encontrado
+                                         todas estas extensiones.
+        classifier (ExtensionClassifier, optional): Clasificador de extensiones
+                                                    (ver ``scan_directory``).
+    
+    Returns:
+        ScanSummary: Totales por extensión y categoría. ``complete`` es False si
+                     el recuento se detuvo antes de recorrer todo el directorio.
+    
+    Raises:
+        PermissionError: Si no hay permisos para acceder al directorio.
+        OSError: Si ocurre un error al acceder al sistema de archivos.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    summary = ScanSummary()
+    
+    if not os.path.exists(path):
+        return summary
+    
+    missing = {ext.lower() for ext in until_seen} if until_seen is not None else None
+    
+    try:
+        if index is not None:
+            with index.batch():
+                files = (((p.extension, p.category), p.size)
+                         for p in _iter_indexed_files(path, depth, token, index,
+                                                      classifier or DEFAULT_CLASSIFIER))
+                _summarize(summary, files, max_files, missing)
+        else:
+            classify = (classifier or DEFAULT_CLASSIFIER).classify
+            files = _iter_matches_and_sizes(path, depth, token, sizes, classify)
+            _summarize(summary, files, max_files, missing)
+    
+    except PermissionError:
+        raise PermissionError(f"No hay permisos para acceder a: {path}")
+    except OSError as e:
+        raise OSError(f"Error al acceder al directorio: {str(e)}")
+    
+    return summary
+
+
+def iter_files(path, depth=0, token=None):
+    """
+    Recorre un directorio con ``os.scandir`` y genera sus archivos sin materializarlos.
+    
+    Usa el tipo que devuelve el propio listado (``d_type``) para distinguir
+    archivos de carpetas, por lo que no realiza un ``stat`` adicional por entrada.
+    Las carpetas de categoría del nivel superior (las que crea ``sort_files``)
+    se omiten para no volver a recorrer archivos ya organizados.
+    
+    Args:
+        path (str): Ruta del directorio a recorrer.
+        depth (int, optional): Niveles de subdirectorios a recorrer. 0 (por defecto)
+                               solo el nivel superior, None sin límite.
+        token (ControlToken, optional): Testigo que se comprueba en cada entrada.
+    
+    Yields:
+        tuple: (ruta_relativa, os.DirEntry) por cada archivo encontrado.
+    
+    Raises:
+        PermissionError: Si no hay permisos para acceder a ``path``.
+        OSError: Si ocurre un error al listar ``path``. Los subdirectorios
+                 que no se pueden leer se omiten.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    pending = [(path, "", 0)]
+    
+    while pending:
+        current, prefix, level = pending.pop()
+        descend = depth is None or level < depth
+        
+        try:
+            entries = os.scandir(current)
+        except OSError:
+            if level == 0:
+                raise
+            continue
+        
+        subdirs = []
+        with entries:
+            for entry in entries:
+                check_token(token)
+                relative_name = prefix + entry.name
+                if entry.is_file():
+                    yield relative_name, entry
+                elif descend and _should_descend(entry, level):
+                    subdirs.append((entry.path, relative_name + os.sep, level + 1))
+        
+        pending.extend(reversed(subdirs))
+
+
+def sort_files(path, selected_extensions, progress_callback=None, plan=None,
+               workers=DEFAULT_WORKERS, reporter=None, token=None, dedup=None, journal=None,
+               throughput=None, slowest=0, limiter=None, layout=None):
     """
     Organiza los archivos en carpetas según sus extensiones.
     
@@ -56,33 +283,281 @@ def sort_files(path, selected_extensions, progress_callback=None):
         path (str): Ruta del directorio donde organizar los archivos.
         selected_extensions (list): Lista de extensiones a organizar.
         progress_callback (callable, optional): Función a llamar para actualizar el progreso.
-                                              Debe aceptar (current, total).
+                                              Debe aceptar (current, total). Se llama
+                                              como mucho ``DEFAULT_PROGRESS_RATE`` veces
+                                              por segundo.
+        plan (SortPlan, optional): Plan obtenido con ``plan_directory``. Si se indica
+                                   y corresponde a ``path``, se usa en lugar de volver
+                                   a escanear el directorio.
+        workers (int, optional): Número máximo de archivos que se mueven a la vez.
+                                 Con 1 los archivos se mueven de uno en uno.
+        reporter (ProgressReporter, optional): Informador que recibe el progreso completo
+                                             (archivos, bytes, velocidad y tiempo
+                                             restante). Si se indica, sustituye a
+                                             ``progress_callback``.
+        token (ControlToken, optional): Testigo para pausar o cancelar la organización
+                                       desde otro hilo. Se comprueba entre archivos y
+                                       entre bloques de las copias a otro dispositivo.
+        dedup (Deduplicator, optional): Si se indica, a los archivos idénticos a otro
+                                        de su carpeta de categoría (o de la misma
+                                        ejecución) se les aplica la acción del
+                                        deduplicador. Los que se dejan o se borran
+                                        no se mueven; los sustituidos por un enlace
+                                        duro se organizan como los demás.
+        journal (MoveJournal, optional): Diario donde se registra cada movimiento (y
+                                         cada duplicado borrado o enlazado) antes
+                                         de hacerlo, para poder deshacer la
+                                         organización con ``undo_journal`` o
+                                         recuperarla tras una interrupción. No se
+                                         cierra al terminar.
+        throughput (ThroughputStore, optional): Almacén donde se anota la velocidad
+                                                medida de cada dispositivo, para
+                                                las estimaciones de ``estimate_sort``.
+                                                No se guarda en disco.
+        slowest (int, optional): Movimientos más lentos que se guardan en
+                                 ``SortStats.slowest`` (por defecto, ninguno).
+        limiter (IOLimiter, optional): Límite de movimientos simultáneos, global y
+                                       por dispositivo, compartido con otras
+                                       organizaciones (ver ``sorter.batch``).
+        layout (FolderLayout, optional): Disposición de las carpetas de destino, por
+                                         ejemplo con subcarpetas por año o mes
+                                         (``Imágenes/2025/03``) calculadas con
+                                         los metadatos del escaneo. Por defecto,
+                                         una carpeta por categoría.
+    
+    Returns:
+        SortStats: Tiempo de cada fase, archivos movidos, renombrados, omitidos
+                   y fallidos, bytes movidos y reparto entre renombrados y
+                   copias a otro dispositivo.
     
     Note:
         Si un archivo ya existe en el destino, se le añade un sufijo numérico.
+        Los archivos movidos correctamente se eliminan de ``plan``, que queda
+        reflejando el contenido pendiente del directorio.
     
     Raises:
+        ValueError: Si ``dedup`` borra los duplicados y no se indica ``journal``:
+                    sin diario, el borrado no podría deshacerse.
         PermissionError: Si no hay permisos para mover archivos.
         OSError: Si ocurre un error al mover archivos (disco lleno, archivo en uso, etc.).
+        SortError: Si algunos archivos no pudieron moverse; ``errors`` los detalla y
+                   ``stats`` contiene las estadísticas de la ejecución.
+        OperationCancelled: Si se cancela mediante ``token``. Los archivos ya movidos
+                            se quedan en su destino y las copias a medias se deshacen.
     """
+    if dedup is not None and dedup.removes_sources and journal is None:
+        raise ValueError("Borrar los duplicados necesita un diario para poder deshacerse")
+
+    stats = SortStats()
     if not os.path.exists(path):
-        return
+        return stats
 
-    files_to_move = _get_files_to_process(path, selected_extensions)
-    total_files = len(files_to_move)
-    errors = []
+    if plan is None or not plan.matches(path):
+        plan = plan_directory(path, token=token)
+    stats.timings.update(plan.timings)
     
-    for i, file in enumerate(files_to_move):
-        _update_progress(progress_callback, i, total_files)
-        
-        error = _move_file_to_category(file, path)
-        if error:
-            errors.append(error)
+    files_to_move = plan.select(selected_extensions)
+    if plan.indexed and layout is not None and layout.bucket is not None:
+        _refresh_metadata(path, files_to_move, token)
+    started = time.perf_counter()
+    duplicates = dedup.find(path, files_to_move, token, layout) if dedup is not None else []
+    dedup_errors = []
+    if duplicates and dedup.moves_duplicates:
+        # Los enlaces se crean antes de mover: original y duplicado siguen en el origen
+        _, dedup_errors = dedup.apply(path, duplicates, journal=journal)
+    elif duplicates:
+        skipped = set(id(duplicate.planned) for duplicate in duplicates)
+        files_to_move = [f for f in files_to_move if id(f) not in skipped]
+    stats.timings['dedup'] = time.perf_counter() - started
+    
+    if reporter is None:
+        reporter = ProgressReporter(_file_progress_adapter(progress_callback))
+    
+    engine = MoveEngine(path, workers=workers, reporter=reporter, token=token, journal=journal,
+                        slowest=slowest, limiter=limiter, layout=layout)
+    
+    try:
+        engine.run(files_to_move)
+    finally:
+        plan.discard(engine.moved)
+        if throughput is not None:
+            throughput.record_timings(engine.timings)
     
-    _update_progress(progress_callback, total_files, total_files)
+    if duplicates and not dedup.moves_duplicates:
+        started = time.perf_counter()
+        handled, dedup_errors = dedup.apply(path, duplicates, engine.destinations, journal)
+        stats.timings['dedup'] += time.perf_counter() - started
+        if dedup.removes_sources:
+            plan.discard(duplicate.planned for duplicate in handled)
+    errors = engine.errors + dedup_errors
     
+    skipped = 0 if dedup is not None and dedup.moves_duplicates else len(duplicates)
+    _collect_stats(stats, engine, skipped, len(errors))
     if errors:
-        _raise_move_errors(errors)
+        _raise_move_errors(errors, stats)
+    return stats
+
+
+def sort_stream(path, selected_extensions, depth=0, progress_callback=None,
+                workers=DEFAULT_WORKERS, reporter=None, token=None, journal=None,
+                throughput=None, slowest=0, limiter=None, layout=None, index=None,
+                classifier=None, sniffer=None, queue_size=DEFAULT_STREAM_QUEUE):
+    """
+    Organiza los archivos a medida que se listan, sin construir antes un plan.
+    
+    Un hilo recorre el directorio con ``os.scandir``, clasifica cada archivo
+    y deja los de las extensiones seleccionadas en una cola acotada, de la
+    que el motor los va moviendo. El primer movimiento no espera a que
+    termine el listado y la memoria no depende del número de archivos.
+    
+    Args:
+        path (str): Ruta del directorio donde organizar los archivos.
+        selected_extensions (list): Lista de extensiones a organizar.
+        depth (int, optional): Niveles de subdirectorios a recorrer (ver ``scan_directory``).
+        progress_callback (callable, optional): Función a llamar para actualizar el
+                                              progreso. Recibe (current, total); el
+                                              total es None o una estimación hasta
+                                              que termina el listado.
+        workers (int, optional): Número máximo de archivos que se mueven a la vez.
+        reporter (ProgressReporter, optional): Informador que recibe el progreso
+                                             completo. Mientras se lista, sus
+                                             totales se marcan como estimados.
+        token (ControlToken, optional): Testigo para pausar o cancelar el listado
+                                       y los movimientos.
+        journal (MoveJournal, optional): Diario donde se registran los movimientos
+                                         (ver ``sort_files``).
+        throughput (ThroughputStore, optional): Almacén donde se anota la velocidad
+                                                medida de cada dispositivo.
+        slowest (int, optional): Movimientos más lentos que se guardan en
+                                 ``SortStats.slowest``.
+        limiter (IOLimiter, optional): Límite de movimientos simultáneos compartido.
+        layout (FolderLayout, optional): Disposición de las carpetas de destino.
+        index (ScanIndex, optional): Índice persistente. No se usa para listar,
+                                     sino para estimar el total de archivos con
+                                     el último escaneo guardado (una cota
+                                     superior: cuenta también los archivos
+                                     de extensiones no soportadas).
+        classifier (ExtensionClassifier, optional): Clasificador de extensiones.
+        sniffer (ContentSniffer, optional): Detector por contenido para los archivos
+                                            sin extensión soportada.
+        queue_size (int, optional): Archivos listados que pueden esperar a moverse.
+    
+    Returns:
+        SortStats: Estadísticas de la ejecución. El listado y la clasificación
+                   transcurren a la vez que los movimientos, por lo que sus
+                   tiempos se solapan.
+    
+    Note:
+        No admite deduplicación, que necesita conocer todos los archivos antes
+        de mover el primero. Los archivos seleccionados que aparezcan en el
+        directorio durante la organización también se mueven.
+    
+    Raises:
+        PermissionError: Si no hay permisos para acceder al directorio.
+        OSError: Si ocurre un error al listar el directorio o al mover archivos.
+        SortError: Si algunos archivos no pudieron moverse.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    stats = SortStats()
+    if not os.path.exists(path):
+        return stats
+    
+    if reporter is None:
+        reporter = ProgressReporter(_file_progress_adapter(progress_callback))
+    
+    classifier = classifier or DEFAULT_CLASSIFIER
+    selected = frozenset(selected_extensions)
+    estimate = index.count_files(path, recursive=depth != 0) if index is not None else None
+    listed = {'files': 0, 'bytes': 0}
+    
+    def produce(add, listing_token):
+        def add_selected(planned):
+            listed['files'] += 1
+            listed['bytes'] += planned.size
+            add(planned)
+        
+        started = time.perf_counter()
+        try:
+            classifying = _classify_files(add_selected, path, depth, listing_token,
+                                          classifier, sniffer, selected)
+        except PermissionError:
+            raise PermissionError(f"No hay permisos para acceder a: {path}")
+        except OSError as e:
+            raise OSError(f"Error al acceder al directorio: {str(e)}")
+        stats.timings['listing'] = time.perf_counter() - started - classifying
+        stats.timings['classification'] = classifying
+    
+    files = _iter_in_background(produce, queue_size, token)
+    
+    def stream():
+        yield from files
+        reporter.set_totals(listed['files'], listed['bytes'])
+    
+    engine = MoveEngine(path, workers=workers, reporter=reporter, token=token, journal=journal,
+                        slowest=slowest, limiter=limiter, layout=layout)
+    
+    try:
+        engine.run_stream(stream(), estimate)
+    finally:
+        files.close()
+        if throughput is not None:
+            throughput.record_timings(engine.timings)
+    
+    _collect_stats(stats, engine, 0, len(engine.errors))
+    if engine.errors:
+        _raise_move_errors(engine.errors, stats)
+    return stats
+
+
+def estimate_sort(path, selected_extensions, plan=None, workers=DEFAULT_WORKERS, token=None,
+                  dedup=None, throughput=None, probe=False, layout=None):
+    """
+    Describe lo que haría ``sort_files`` sin mover nada y estima su duración.
+    
+    Args:
+        path (str): Ruta del directorio a organizar.
+        selected_extensions (list): Lista de extensiones a organizar.
+        plan (SortPlan, optional): Plan obtenido con ``plan_directory``. Si se indica
+                                   y corresponde a ``path``, no se vuelve a escanear.
+        workers (int, optional): Archivos que se moverían a la vez.
+        token (ControlToken, optional): Testigo para cancelar el escaneo.
+        dedup (Deduplicator, optional): Si se indica, los archivos idénticos a otro
+                                        de su carpeta de categoría se listan en
+                                        ``duplicates`` y, salvo que se vayan a
+                                        sustituir por un enlace duro, quedan fuera
+                                        de los movimientos, como haría ``sort_files``.
+        throughput (ThroughputStore, optional): Velocidades medidas de cada dispositivo.
+        probe (bool, optional): Medir en el momento los dispositivos sin histórico
+                                creando archivos temporales en las carpetas de
+                                destino (ver ``estimate_moves``). Por defecto la
+                                simulación no escribe nada en disco.
+        layout (FolderLayout, optional): Disposición de las carpetas de destino
+                                         (ver ``sort_files``).
+    
+    Returns:
+        SortEstimate: Archivos y bytes por categoría, archivos que se renombrarían,
+                      reparto entre renombrados y copias a otro dispositivo y
+                      duración estimada.
+    
+    Raises:
+        OSError: Si no puede leerse el directorio.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    if plan is None or not plan.matches(path):
+        plan = plan_directory(path, token=token)
+    
+    files_to_move = plan.select(selected_extensions)
+    if plan.indexed and layout is not None and layout.bucket is not None:
+        _refresh_metadata(path, files_to_move, token)
+    duplicates = dedup.find(path, files_to_move, token, layout) if dedup is not None else []
+    if duplicates and not dedup.moves_duplicates:
+        skipped = set(id(duplicate.planned) for duplicate in duplicates)
+        files_to_move = [f for f in files_to_move if id(f) not in skipped]
+    
+    moves = MoveEngine(path, workers=workers, token=token, layout=layout).preview(files_to_move)
+    estimate = estimate_moves(path, moves, workers, throughput, probe)
+    estimate.duplicates = duplicates
+    return estimate
 
 
 def get_all_extensions():
@@ -95,16 +570,23 @@ def get_all_extensions():
     return sorted(list(EXTENSIONS.keys()))
 
 
-def get_extensions_by_category():
+def get_extensions_by_category(classifier=None):
     """
     Agrupa las extensiones por su categoría.
     
+    Args:
+        classifier (ExtensionClassifier, optional): Clasificador cuyas extensiones se
+                                                    agrupan, con las asignaciones del
+                                                    usuario. Por defecto, la tabla de
+                                                    ``sorter.extensions``.
+    
     Returns:
         dict: Diccionario con categorías como claves y listas de extensiones como valores.
     """
     categories = {}
+    mapping = classifier.mapping if classifier is not None else EXTENSIONS
     
-    for ext, category in EXTENSIONS.items():
+    for ext, category in mapping.items():
         if category not in categories:
             categories[category] = []
         categories[category].append(ext)
@@ -117,116 +599,289 @@ def get_extensions_by_category():
 
 # Funciones privadas auxiliares
 
-def _get_file_extension(filename):
-    """Extrae y normaliza la extensión de un archivo."""
-    _, ext = os.path.splitext(filename)
-    return ext.lower()
+def _should_descend(entry, level):
+    """Determina si el recorrido debe entrar en un subdirectorio."""
+    if not entry.is_dir(follow_symlinks=False):
+        return False
+    return not (level == 0 and entry.name in CATEGORY_FOLDERS)
 
 
-def _add_file_to_results(results, ext, filename):
+def _add_file_to_results(results, match, filename):
     """Añade un archivo a los resultados del escaneo."""
+    ext, category = match
     if ext not in results:
         results[ext] = {
             'count': 0,
             'files': [],
-            'category': EXTENSIONS[ext]
+            'category': category
         }
     results[ext]['count'] += 1
     results[ext]['files'].append(filename)
 
 
-def _get_files_to_process(path, selected_extensions):
-    """Identifica los archivos que deben ser movidos."""
-    files_to_move = []
+def _create_planned_file(entry, relative_name, match):
+    """Crea la entrada del plan a partir de un ``os.DirEntry`` y su (extensión, categoría)."""
+    try:
+        stat = entry.stat()
+    except FileNotFoundError:
+        return None
+    return PlannedFile(
+        entry.name,
+        relative_name,
+        match[0],
+        match[1],
+        stat.st_size,
+        stat.st_dev,
+        stat.st_mtime
+    )
+
+
+def _classify_files(add, path, depth, token, classifier, sniffer=None, selected=None):
+    """
+    Lista y clasifica los archivos del árbol, pasando cada ``PlannedFile`` a ``add``.
     
-    for file in os.listdir(path):
-        if _should_process_file(path, file, selected_extensions):
-            files_to_move.append(file)
+    Con ``sniffer``, los archivos sin extensión soportada se clasifican por su
+    contenido. Con ``selected``, los de otras extensiones se descartan antes
+    de consultar su estado.
     
-    return files_to_move
+    Returns:
+        float: Segundos dedicados a clasificar por el nombre (la lectura de
+               las cabeceras cuenta como parte del listado).
+    """
+    classifying = 0.0
+    clock = time.perf_counter
+    
+    def unclassified():
+        nonlocal classifying
+        for relative_name, entry in iter_files(path, depth, token):
+            before = clock()
+            match = classifier.classify(entry.name)
+            classifying += clock() - before
+            if match is None:
+                if sniffer is not None:
+                    yield relative_name, entry
+            elif selected is None or match[0] in selected:
+                planned = _create_planned_file(entry, relative_name, match)
+                if planned:
+                    add(planned)
+    
+    if sniffer is None:
+        # Sin detector no queda nada por clasificar: basta con recorrer el listado
+        for _ in unclassified():
+            pass
+        return classifying
+    
+    for relative_name, entry, match in sniffer.sniff_entries(unclassified(), token):
+        if selected is None or match[0] in selected:
+            planned = _create_planned_file(entry, relative_name, match)
+            if planned:
+                add(planned)
+    
+    return classifying
 
 
-def _should_process_file(path, file, selected_extensions):
-    """Determina si un archivo debe ser procesado."""
-    file_path = os.path.join(path, file)
+def _iter_in_background(produce, queue_size, token=None):
+    """
+    Ejecuta ``produce(add, token)`` en otro hilo y genera lo que pasa a ``add``.
     
-    if not os.path.isfile(file_path):
-        return False
+    Los elementos pasan por una cola de ``queue_size`` como máximo: si se
+    llena, el hilo espera a que se consuman. Un error del hilo se lanza al
+    consumir el generador. Al cerrarlo antes de terminar, el hilo se detiene
+    en su siguiente comprobación de ``token`` y se espera a que acabe.
+    """
+    items = queue.Queue(maxsize=max(1, int(queue_size)))
+    listing_token = _StreamToken(token)
+    
+    def add(item):
+        while True:
+            listing_token.check()
+            try:
+                items.put(item, timeout=_STREAM_POLL)
+                return
+            except queue.Full:
+                continue
+    
+    def run():
+        end = _EndOfStream()
+        try:
+            produce(add, listing_token)
+        except BaseException as e:
+            end.error = e
+        while not listing_token.cancelled:
+            try:
+                items.put(end, timeout=_STREAM_POLL)
+                return
+            except queue.Full:
+                continue
+    
+    thread = threading.Thread(target=run, name="sorter-stream", daemon=True)
+    thread.start()
+    try:
+        while True:
+            item = items.get()
+            if isinstance(item, _EndOfStream):
+                if item.error is not None:
+                    raise item.error
+                return
+            yield item
+    finally:
+        listing_token.cancel()
+        thread.join()
+
+
+class _EndOfStream:
+    """Marca el final de ``_iter_in_background`` y el error del hilo, si lo hubo."""
     
-    ext = _get_file_extension(file)
-    return ext in EXTENSIONS and ext in selected_extensions
+    __slots__ = ('error',)
+    
+    def __init__(self):
+        self.error = None
 
 
-def _update_progress(callback, current, total):
-    """Actualiza el progreso si hay callback disponible."""
-    if callback:
-        callback(current, total)
+class _StreamToken(ControlToken):
+    """Testigo del hilo de ``_iter_in_background``: se detiene con el del usuario o al cerrarse."""
+    
+    def __init__(self, parent):
+        super().__init__()
+        self.parent = parent
+    
+    def check(self):
+        check_token(self.parent)
+        super().check()
 
 
-def _move_file_to_category(file, source_path):
+def _iter_indexed_files(path, depth, token, index, classifier):
     """
-    Mueve un archivo a su carpeta de categoría.
+    Genera los archivos del árbol reutilizando los listados guardados de los directorios sin cambios.
     
-    Returns:
-        tuple: (filename, error_message) si hay error, None si es exitoso.
+    El índice guarda los listados sin clasificar; cada archivo se clasifica
+    aquí con ``classifier`` y se descarta si su extensión no está soportada.
     """
-    try:
-        ext = _get_file_extension(file)
-        folder_name = EXTENSIONS[ext]
-        target_folder = os.path.join(source_path, folder_name)
+    pending = [(path, "", 0)]
+    
+    while pending:
+        current, prefix, level = pending.pop()
         
-        _ensure_folder_exists(target_folder)
-        _move_file_safely(file, source_path, target_folder)
+        try:
+            stat = os.stat(current)
+            listing = index.lookup(current, stat)
+            if listing is None:
+                listing = _read_listing(current, token)
+                index.store(current, stat, *listing)
+        except OSError:
+            if level == 0:
+                raise
+            continue
         
-        return None
+        files, subdirs = listing
+        for name, size, device, mtime in files:
+            match = classifier.classify(name)
+            if match is not None:
+                yield PlannedFile(name, prefix + name, match[0], match[1], size, device, mtime)
         
-    except PermissionError:
-        return (file, "Sin permisos para mover el archivo")
-    except OSError as e:
-        return _handle_move_error(file, e)
-
+        if depth is None or level < depth:
+            pending.extend(reversed([
+                (os.path.join(current, name), prefix + name + os.sep, level + 1)
+                for name in subdirs
+                if not (level == 0 and name in CATEGORY_FOLDERS)
+            ]))
+
+
+def _iter_matches_and_sizes(path, depth, token, sizes, classify):
+    """Genera ((extensión, categoría), tamaño) de cada archivo; None si no está soportado."""
+    for _, entry in iter_files(path, depth, token):
+        match = classify(entry.name)
+        if match is None or not sizes:
+            yield match, 0
+        else:
+            try:
+                yield match, entry.stat().st_size
+            except FileNotFoundError:
+                continue
 
-def _ensure_folder_exists(folder_path):
-    """Crea la carpeta si no existe."""
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
 
+def _summarize(summary, files, max_files, missing):
+    """Acumula los archivos en ``summary`` hasta agotarlos o alcanzar un límite."""
+    for match, size in files:
+        if max_files is not None and summary.files_seen >= max_files:
+            summary.complete = False
+            return
+        if missing is not None and not missing:
+            summary.complete = False
+            return
+        
+        summary.files_seen += 1
+        if match is not None:
+            summary.add(match[0], match[1], size)
+            if missing:
+                missing.discard(match[0])
 
-def _move_file_safely(file, source_path, target_folder):
-    """Mueve un archivo manejando colisiones de nombres."""
-    file_path = os.path.join(source_path, file)
-    target_path = os.path.join(target_folder, file)
 
-    if os.path.exists(target_path):
-        target_path = _resolve_collision(target_folder, file)
+def _read_listing(directory, token):
+    """
+    Lista un directorio para guardarlo en el índice.
     
-    shutil.move(file_path, target_path)
-
-
-def _resolve_collision(target_folder, filename):
-    """Genera un nombre único para evitar sobreescribir archivos."""
-    base, extension = os.path.splitext(filename)
-    counter = 1
+    Returns:
+        tuple: (files, subdirs) con las tuplas (name, size, device, mtime) de
+               todos los archivos, sin clasificar, y los nombres de los
+               subdirectorios.
+    """
+    files = []
+    subdirs = []
     
-    while True:
-        new_name = f"{base}_{counter}{extension}"
-        target_path = os.path.join(target_folder, new_name)
-        if not os.path.exists(target_path):
-            return target_path
-        counter += 1
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            check_token(token)
+            if entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((entry.name, stat.st_size, stat.st_dev, stat.st_mtime))
+            elif entry.is_dir(follow_symlinks=False):
+                subdirs.append(entry.name)
+    
+    return files, subdirs
 
 
-def _handle_move_error(file, error):
-    """Maneja errores específicos al mover archivos."""
-    if error.errno == 32:
-        return (file, "Archivo en uso por otra aplicación")
-    elif error.errno == 28:
-        raise OSError("No hay suficiente espacio en disco")
-    else:
-        return (file, str(error))
+def _file_progress_adapter(callback):
+    """Adapta un callback (current, total) para recibir ``ProgressSnapshot``."""
+    if not callback:
+        return None
+    return lambda snapshot: callback(snapshot.files_done, snapshot.files_total)
 
 
-def _raise_move_errors(errors):
+def _refresh_metadata(path, planned_files, token=None):
+    """
+    Actualiza el tamaño y la fecha de los archivos de un plan leído del índice.
+
+    El índice solo se revalida con el mtime de cada directorio, que no cambia
+    al editar un archivo en su sitio; las subcarpetas por fecha o tamaño
+    necesitan los valores actuales. Los archivos que ya no existen se dejan
+    como están y el movimiento informará del error.
+    """
+    for planned in planned_files:
+        check_token(token)
+        try:
+            stat = os.stat(os.path.join(path, planned.relative_path), follow_symlinks=False)
+        except OSError:
+            continue
+        planned.size = stat.st_size
+        planned.mtime = stat.st_mtime
+
+
+def _collect_stats(stats, engine, skipped, failed):
+    """Completa las estadísticas con los resultados del motor."""
+    stats.timings.update(engine.phases)
+    stats.add_timings(engine.timings)
+    stats.moved = engine.moved_count
+    stats.bytes_moved = engine.bytes_moved
+    stats.renamed = engine.renamed
+    stats.skipped = skipped
+    stats.failed = failed
+    stats.slowest = engine.slowest
+
+
+def _raise_move_errors(errors, stats=None):
     """Lanza una excepción con todos los errores de movimiento."""
-    error_msg = "\n".join([f"- {f}: {msg}" for f, msg in errors])
-    raise OSError(f"Algunos archivos no pudieron moverse:\n{error_msg}")
\ No newline at end of file
+    raise SortError(errors, stats)
\ No newline at end of file
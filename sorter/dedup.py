@@ -0,0 +1,556 @@
+"""
+Módulo de detección de duplicados.
+
+Contiene el deduplicador que, antes de organizar, busca los archivos que
+son idénticos byte a byte a otro ya presente en su carpeta de categoría
+(o a otro archivo de la misma ejecución) y decide qué hacer con ellos en
+lugar de crear ``foto_1.jpg``, ``foto_2.jpg``, etc. La comparación se hace
+por etapas: tamaño, hash del primer y último bloque y, solo para los que
+siguen coincidiendo, hash completo en un grupo acotado de hilos.
+"""
+
+import contextlib
+import hashlib
+import os
+import sqlite3
+import stat as stat_module
+import threading
+import time
+from sorter.control import check_token
+from sorter.scan_index import RACY_WINDOW_NS, default_index_path
+
+DEDUP_SKIP = "skip"
+DEDUP_DELETE = "delete"
+DEDUP_HARDLINK = "hardlink"
+DEDUP_ACTIONS = (DEDUP_SKIP, DEDUP_DELETE, DEDUP_HARDLINK)
+
+DEFAULT_HASH_WORKERS = 4
+DEFAULT_MAX_HASHES = 200000
+PARTIAL_CHUNK_SIZE = 64 * 1024
+HASH_BLOCK_SIZE = 1024 * 1024
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS hashes (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    partial BLOB,
+    full BLOB,
+    last_used REAL NOT NULL DEFAULT 0,
+    PRIMARY KEY (device, inode)
+);
+"""
+
+_INDEX = "CREATE INDEX IF NOT EXISTS hashes_last_used ON hashes (last_used);"
+
+
+class Duplicate:
+    """
+    Archivo del plan idéntico a otro.
+
+    Attributes:
+        planned (PlannedFile): Archivo duplicado.
+        original: Ruta del archivo idéntico que ya está en la carpeta de
+                  categoría, o ``PlannedFile`` de la misma ejecución que se
+                  organiza normalmente.
+        stat (os.stat_result): Estado del duplicado al compararlo.
+    """
+
+    __slots__ = ('planned', 'original', 'stat')
+
+    def __init__(self, planned, original, stat):
+        self.planned = planned
+        self.original = original
+        self.stat = stat
+
+    def __repr__(self):
+        return f"Duplicate({self.planned.relative_path!r})"
+
+
+class Deduplicator:
+    """
+    Busca duplicados entre los archivos a organizar y aplica una acción.
+
+    Acciones:
+        ``DEDUP_SKIP``: el duplicado se deja donde está.
+        ``DEDUP_DELETE``: el duplicado se elimina. Si se registra en un
+        diario, deshacerlo vuelve a crearlo copiando el original.
+        ``DEDUP_HARDLINK``: el duplicado se sustituye por un enlace duro al
+        original (solo si están en el mismo dispositivo) y se organiza como
+        los demás archivos.
+    """
+
+    def __init__(self, action=DEDUP_SKIP, workers=DEFAULT_HASH_WORKERS, cache=None,
+                 chunk_size=PARTIAL_CHUNK_SIZE):
+        """
+        Inicializa el deduplicador.
+
+        Args:
+            action (str, optional): Acción a aplicar a los duplicados.
+            workers (int, optional): Archivos que se leen a la vez al calcular hashes.
+            cache (HashCache, optional): Caché de hashes entre ejecuciones.
+            chunk_size (int, optional): Bytes del inicio y del final que se comparan
+                                        en la etapa parcial.
+
+        Raises:
+            ValueError: Si la acción no es válida.
+        """
+        if action not in DEDUP_ACTIONS:
+            raise ValueError(f"Acción de duplicados no válida: {action!r}")
+        self.action = action
+        self.workers = max(1, int(workers))
+        self.cache = cache
+        self.chunk_size = chunk_size
+        self.handled = []
+
+    @property
+    def removes_sources(self):
+        """bool: True si los duplicados tratados desaparecen del directorio."""
+        return self.action == DEDUP_DELETE
+
+    @property
+    def moves_duplicates(self):
+        """bool: True si los duplicados tratados se organizan después, como los demás."""
+        return self.action == DEDUP_HARDLINK
+
+    def find(self, root, planned_files, token=None, layout=None):
+        """
+        Busca los archivos del plan idénticos a otro.
+
+        Args:
+            root (str): Directorio que se organiza.
+            planned_files (list): ``PlannedFile`` que se van a organizar.
+            token (ControlToken, optional): Testigo para cancelar la búsqueda.
+            layout (FolderLayout, optional): Disposición de las carpetas de destino;
+                                             cada archivo se compara con los de
+                                             su carpeta. Por defecto, la de su
+                                             categoría.
+
+        Returns:
+            list: ``Duplicate`` encontrados. Los originales de la misma ejecución
+                  no se incluyen y se organizan normalmente.
+
+        Raises:
+            OperationCancelled: Si se cancela mediante ``token``.
+        """
+        folder_of = layout.folder if layout is not None else _category_folder
+        groups = _group_by_size(root, planned_files, folder_of)
+        if not groups:
+            return []
+
+        # concurrent.futures arrastra logging: se importa solo si hay candidatos
+        from concurrent.futures import ThreadPoolExecutor
+
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            groups = self._split(executor, groups, self._partial_hash, token)
+            full = [g for g in groups if g[0].size > 2 * self.chunk_size]
+            groups = [g for g in groups if g[0].size <= 2 * self.chunk_size]
+            groups += self._split(executor, full, self._full_hash, token)
+
+        if self.cache is not None:
+            self.cache.flush()
+
+        duplicates = []
+        for group in groups:
+            duplicates.extend(_resolve_group(group))
+        return duplicates
+
+    def apply(self, root, duplicates, destinations=None, journal=None):
+        """
+        Aplica la acción configurada a los duplicados.
+
+        Args:
+            root (str): Directorio que se organiza.
+            duplicates (list): ``Duplicate`` devueltos por ``find``.
+            destinations (dict, optional): Rutas finales de los originales movidos,
+                                           indexadas por ``id`` del ``PlannedFile``
+                                           (``MoveEngine.destinations``).
+            journal (MoveJournal, optional): Diario donde se registran los borrados
+                                             y enlaces, todos con una sola
+                                             sincronización, antes de hacerlos,
+                                             para que ``undo_journal`` pueda
+                                             deshacerlos.
+
+        Returns:
+            tuple: (handled, errors) con los ``Duplicate`` tratados y las tuplas
+                   (filename, error_message) de los que no pudieron tratarse.
+        """
+        if self.action == DEDUP_SKIP:
+            self.handled = list(duplicates)
+            return self.handled, []
+
+        handled = []
+        errors = []
+        checked = []
+        for duplicate in duplicates:
+            source = os.path.join(root, duplicate.planned.relative_path)
+            original = _original_path(root, duplicate.original, destinations or {})
+            try:
+                original_stat = _check_still_identical(source, duplicate.stat, original)
+            except OSError as e:
+                errors.append((duplicate.planned.relative_path, str(e)))
+                continue
+            temporary = _link_path(source) if self.action == DEDUP_HARDLINK else None
+            checked.append((duplicate, source, original, original_stat, temporary))
+
+        entries = [None] * len(checked)
+        if journal is not None and checked:
+            try:
+                entries = journal.record_dedups([
+                    (self.action, source, original, duplicate.stat.st_size,
+                     duplicate.stat.st_mtime_ns, original_stat.st_mtime_ns, temporary)
+                    for duplicate, source, original, original_stat, temporary in checked
+                ])
+            except OSError as e:
+                errors.extend((item[0].planned.relative_path, str(e)) for item in checked)
+                checked = []
+
+        for (duplicate, source, original, _, temporary), entry in zip(checked, entries):
+            try:
+                if self.action == DEDUP_DELETE:
+                    os.unlink(source)
+                else:
+                    _replace_with_link(original, source, temporary)
+            except OSError as e:
+                errors.append((duplicate.planned.relative_path, str(e)))
+                if entry is not None:
+                    journal.mark_aborted(entry)
+                continue
+            handled.append(duplicate)
+            if entry is not None:
+                journal.mark_done(entry)
+
+        self.handled = handled
+        return handled, errors
+
+    def _split(self, executor, groups, hash_function, token):
+        """Calcula un hash de cada candidato y divide los grupos según el resultado."""
+        candidates = [candidate for group in groups for candidate in group]
+        digests = executor.map(lambda c: hash_function(c, token), candidates)
+
+        split = {}
+        for candidate, digest in zip(candidates, digests):
+            if digest is not None:
+                split.setdefault((candidate.group, digest), []).append(candidate)
+        return _keep_relevant(split.values())
+
+    def _partial_hash(self, candidate, token):
+        """Hash del tamaño y del primer y último bloque del archivo."""
+        check_token(token)
+        cached = self._cached(candidate)
+        if cached is not None and cached[0] is not None:
+            return cached[0]
+
+        digest = hashlib.blake2b(str(candidate.size).encode())
+        try:
+            with open(candidate.path, "rb") as file:
+                digest.update(file.read(self.chunk_size))
+                if candidate.size > self.chunk_size:
+                    file.seek(max(self.chunk_size, candidate.size - self.chunk_size))
+                    digest.update(file.read(self.chunk_size))
+        except OSError:
+            return None
+
+        value = digest.digest()
+        if self.cache is not None:
+            self.cache.store(candidate.stat, partial=value)
+        return value
+
+    def _full_hash(self, candidate, token):
+        """Hash del contenido completo del archivo."""
+        cached = self._cached(candidate)
+        if cached is not None and cached[1] is not None:
+            return cached[1]
+
+        digest = hashlib.blake2b()
+        try:
+            with open(candidate.path, "rb") as file:
+                while True:
+                    check_token(token)
+                    block = file.read(HASH_BLOCK_SIZE)
+                    if not block:
+                        break
+                    digest.update(block)
+        except OSError:
+            return None
+
+        value = digest.digest()
+        if self.cache is not None:
+            self.cache.store(candidate.stat, full=value)
+        return value
+
+    def _cached(self, candidate):
+        """Obtiene los hashes guardados del candidato, si los hay."""
+        if self.cache is None:
+            return None
+        return self.cache.lookup(candidate.stat)
+
+
+class HashCache:
+    """
+    Caché persistente de hashes de archivos.
+
+    Los hashes se guardan por dispositivo e inodo y se validan con el tamaño
+    y el ``st_mtime_ns``, de modo que las ejecuciones repetidas sobre las
+    mismas carpetas no vuelven a leer los archivos sin cambios. Puede
+    compartirse entre hilos. Cuando se superan ``max_entries`` archivos
+    guardados, se eliminan los usados hace más tiempo.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_HASHES):
+        """
+        Abre (o crea) la caché.
+
+        Args:
+            path (str, optional): Archivo SQLite. Por defecto, junto al índice de
+                                  escaneos en la carpeta de caché del usuario.
+            max_entries (int, optional): Archivos guardados como máximo.
+
+        Raises:
+            OSError: Si no puede crearse la carpeta de la caché.
+            sqlite3.Error: Si no puede abrirse la base de datos.
+        """
+        self.path = path or os.path.join(os.path.dirname(default_index_path()), "hashes.sqlite3")
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._prepare_schema()
+
+    def close(self):
+        """Confirma los cambios y cierra la base de datos."""
+        with self._lock:
+            self._evict()
+            self._connection.commit()
+            self._connection.close()
+
+    def lookup(self, stat):
+        """
+        Obtiene los hashes guardados de un archivo si sigue sin cambios.
+
+        Returns:
+            tuple: (partial, full), con None en los que no se conocen, o None
+                   si el archivo no está en la caché o ha cambiado.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, partial, full FROM hashes WHERE device = ? AND inode = ?",
+                (stat.st_dev, stat.st_ino)
+            ).fetchone()
+            if row is None or (row[0], row[1]) != (stat.st_size, stat.st_mtime_ns):
+                return None
+            self._connection.execute(
+                "UPDATE hashes SET last_used = ? WHERE device = ? AND inode = ?",
+                (time.time(), stat.st_dev, stat.st_ino)
+            )
+        return row[2], row[3]
+
+    def store(self, stat, partial=None, full=None):
+        """
+        Guarda los hashes calculados de un archivo.
+
+        Los archivos modificados hace menos de ``RACY_WINDOW_NS`` no se guardan,
+        porque otro cambio inmediato podría no alterar su mtime.
+        """
+        if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+            return
+
+        with self._lock:
+            key = (stat.st_dev, stat.st_ino)
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, partial, full FROM hashes WHERE device = ? AND inode = ?",
+                key
+            ).fetchone()
+            if row is not None and (row[0], row[1]) == (stat.st_size, stat.st_mtime_ns):
+                partial = partial if partial is not None else row[2]
+                full = full if full is not None else row[3]
+
+            self._connection.execute(
+                "INSERT OR REPLACE INTO hashes "
+                "(device, inode, size, mtime_ns, partial, full, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                key + (stat.st_size, stat.st_mtime_ns, partial, full, time.time())
+            )
+
+    def flush(self):
+        """Confirma los hashes guardados, eliminando antes los que superan el límite."""
+        with self._lock:
+            self._evict()
+            self._connection.commit()
+
+    def clear(self):
+        """Elimina todos los hashes guardados."""
+        with self._lock:
+            self._connection.execute("DELETE FROM hashes")
+            self._connection.commit()
+
+    def _prepare_schema(self):
+        """Crea la tabla y añade ``last_used`` a las cachés de versiones anteriores."""
+        with self._lock:
+            self._connection.executescript(_SCHEMA)
+            columns = {row[1] for row in self._connection.execute("PRAGMA table_info(hashes)")}
+            if "last_used" not in columns:
+                self._connection.execute(
+                    "ALTER TABLE hashes ADD COLUMN last_used REAL NOT NULL DEFAULT 0"
+                )
+            self._connection.executescript(_INDEX)
+            self._connection.commit()
+
+    def _evict(self):
+        """Elimina los hashes menos usados hasta cumplir el límite."""
+        count = self._connection.execute("SELECT COUNT(*) FROM hashes").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._connection.execute(
+            "DELETE FROM hashes WHERE rowid IN "
+            "(SELECT rowid FROM hashes ORDER BY last_used LIMIT ?)",
+            (count - self.max_entries,)
+        )
+
+
+class _Candidate:
+    """Archivo que participa en la comparación."""
+
+    __slots__ = ('path', 'stat', 'size', 'group', 'planned')
+
+    def __init__(self, path, stat, group, planned=None):
+        self.path = path
+        self.stat = stat
+        self.size = stat.st_size
+        self.group = group
+        self.planned = planned
+
+
+def _group_by_size(root, planned_files, folder_of):
+    """
+    Agrupa por carpeta de destino y tamaño los archivos del plan y los de esas carpetas.
+
+    Solo se conservan los grupos con al menos dos archivos y alguno del plan.
+    Los archivos vacíos no se consideran duplicados.
+    """
+    by_folder = {}
+    for planned in planned_files:
+        if planned.size > 0:
+            by_folder.setdefault(folder_of(planned), []).append(planned)
+
+    groups = {}
+    for folder, files in by_folder.items():
+        sizes = {planned.size for planned in files}
+        for path, stat in _list_regular_files(os.path.join(root, folder)):
+            if stat.st_size in sizes:
+                groups.setdefault((folder, stat.st_size), []).append(
+                    _Candidate(path, stat, (folder, stat.st_size))
+                )
+
+        for planned in files:
+            path = os.path.join(root, planned.relative_path)
+            stat = _stat_regular_file(path)
+            if stat is not None:
+                group = (folder, stat.st_size)
+                groups.setdefault(group, []).append(_Candidate(path, stat, group, planned))
+
+    return _keep_relevant(groups.values())
+
+
+def _category_folder(planned):
+    """Carpeta de destino sin disposición: la de la categoría."""
+    return planned.category
+
+
+def _keep_relevant(groups):
+    """Descarta los grupos que no pueden contener duplicados del plan."""
+    return [
+        group for group in groups
+        if len(group) > 1 and any(candidate.planned is not None for candidate in group)
+    ]
+
+
+def _resolve_group(group):
+    """
+    Elige el original de un grupo de archivos idénticos.
+
+    Se prefiere un archivo que ya esté en la carpeta de destino; si no hay
+    ninguno, el primero del plan se organiza normalmente.
+    """
+    existing = [candidate for candidate in group if candidate.planned is None]
+    if existing:
+        original = existing[0].path
+        duplicates = [candidate for candidate in group if candidate.planned is not None]
+    else:
+        original = group[0].planned
+        duplicates = group[1:]
+
+    return [Duplicate(candidate.planned, original, candidate.stat) for candidate in duplicates]
+
+
+def _list_regular_files(folder):
+    """Lista los archivos regulares de una carpeta con su estado."""
+    result = []
+    try:
+        with os.scandir(folder) as entries:
+            for entry in entries:
+                if entry.is_file(follow_symlinks=False):
+                    try:
+                        result.append((entry.path, entry.stat(follow_symlinks=False)))
+                    except FileNotFoundError:
+                        continue
+    except (FileNotFoundError, NotADirectoryError):
+        pass
+    return result
+
+
+def _stat_regular_file(path):
+    """Obtiene el estado de un archivo regular, o None si no lo es o ya no existe."""
+    try:
+        stat = os.stat(path, follow_symlinks=False)
+    except OSError:
+        return None
+    return stat if stat_module.S_ISREG(stat.st_mode) else None
+
+
+def _original_path(root, original, destinations):
+    """Ruta actual del original: en su carpeta de destino o, si no se movió, en el origen."""
+    if isinstance(original, str):
+        return original
+    return destinations.get(id(original), os.path.join(root, original.relative_path))
+
+
+def _check_still_identical(source, compared_stat, original):
+    """
+    Comprueba que el duplicado no ha cambiado y que el original sigue existiendo.
+
+    Returns:
+        os.stat_result: Estado del original.
+
+    Raises:
+        OSError: Si alguno de los dos ha cambiado desde la comparación.
+    """
+    current = os.stat(source, follow_symlinks=False)
+    if (current.st_size, current.st_mtime_ns) != (compared_stat.st_size, compared_stat.st_mtime_ns):
+        raise OSError(f"El archivo ha cambiado desde la comparación: {source}")
+    original_stat = os.stat(original)
+    if original_stat.st_size != compared_stat.st_size:
+        raise OSError(f"El original ha cambiado desde la comparación: {original}")
+    return original_stat
+
+
+def _link_path(source):
+    """Ruta temporal del enlace que sustituirá a ``source``."""
+    return f"{source}.{os.getpid()}.{threading.get_ident()}.link"
+
+
+def _replace_with_link(original, source, temporary):
+    """Sustituye ``source`` por un enlace duro a ``original`` de forma atómica."""
+    os.link(original, temporary)
+    try:
+        os.replace(temporary, source)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            os.unlink(temporary)
+        raise
@@ -0,0 +1,968 @@
+"""
+Módulo del motor de movimiento de archivos.
+
+Contiene el motor que ejecuta un plan de organización moviendo los archivos
+a sus carpetas de categoría con un grupo acotado de hilos.
+"""
+
+import contextlib
+import errno
+import heapq
+import itertools
+import os
+import threading
+import time
+from sorter.control import check_token
+from sorter.layout import FolderLayout
+from sorter.progress import ProgressReporter
+from sorter.transfer import move_across_devices
+
+DEFAULT_WORKERS = 4
+
+# Movimientos encolados por hilo para no materializar un Future por archivo
+_PENDING_PER_WORKER = 4
+
+# Movimientos que se registran en el diario con una sola sincronización
+_JOURNAL_BATCH = 256
+
+# En POSIX el movimiento sin sobrescritura se hace con link + unlink, que
+# solo es equivalente a rename si el enlace no sigue los enlaces simbólicos
+_LINK_WITHOUT_FOLLOW = os.name != 'nt' and os.link in os.supports_follow_symlinks
+
+# Donde existen las llamadas *at (Linux y la mayoría de POSIX), los movimientos
+# se hacen con nombres relativos a descriptores de las carpetas de origen y de
+# destino abiertos una vez, en lugar de resolver la ruta completa cada vez
+_DIR_FD_MOVES = (
+    _LINK_WITHOUT_FOLLOW
+    and hasattr(os, 'O_DIRECTORY')
+    and {os.open, os.link, os.unlink, os.stat, os.rename} <= os.supports_dir_fd
+    and os.scandir in os.supports_fd
+)
+_DIRECTORY_FLAGS = os.O_RDONLY | getattr(os, 'O_DIRECTORY', 0)
+
+
+class MoveEngine:
+    """
+    Motor que mueve los archivos de un plan a sus carpetas de categoría.
+
+    Los archivos se agrupan por carpeta de destino (la de su categoría o la
+    subcarpeta que indique la disposición), y todas las carpetas se crean
+    antes de mover el primer archivo. Cada carpeta de destino se lista una
+    sola vez por ejecución en un índice de nombres en memoria, salvo las que
+    se acaban de crear, que se saben vacías;
+    la elección del nombre final se serializa con un cerrojo por categoría,
+    de modo que dos hilos nunca reservan el mismo nombre, mientras que los
+    movimientos se ejecutan en paralelo y sin sobrescribir nunca un archivo.
+
+    El dispositivo de cada carpeta de destino se consulta una vez: si coincide
+    con el del archivo se renombra; si no, se copia con las llamadas de copia
+    del kernel y el origen se borra solo tras verificar la copia.
+
+    Donde el sistema lo permite, las carpetas de origen y de destino se abren
+    una vez y los renombrados y consultas se hacen con nombres relativos a
+    ellas (``dir_fd``), de modo que el kernel no vuelve a resolver la ruta
+    completa en cada archivo; en otro caso se usan rutas completas.
+
+    Con un diario, cada movimiento se registra en disco antes de hacerse y se
+    confirma al terminar. Los nombres de destino se reservan y se registran
+    por lotes antes de repartir los archivos, de modo que cada lote cuesta
+    una sola sincronización del diario.
+
+    ``run_stream`` mueve los archivos a medida que llegan de un iterable: las
+    carpetas se crean la primera vez que se necesitan y solo se guardan los
+    recuentos, no los archivos movidos, para que la memoria no crezca con
+    el número de archivos.
+    """
+
+    def __init__(self, root, workers=DEFAULT_WORKERS, reporter=None, token=None, journal=None,
+                 slowest=0, limiter=None, layout=None):
+        """
+        Inicializa el motor.
+
+        Args:
+            root (str): Directorio raíz donde se crean las carpetas de categoría.
+            workers (int, optional): Número máximo de movimientos simultáneos.
+            reporter (ProgressReporter, optional): Informador que recibe el progreso
+                                                 en archivos y en bytes, también
+                                                 durante la copia de archivos grandes.
+            token (ControlToken, optional): Testigo para pausar o cancelar la ejecución.
+                                           Se comprueba entre archivos y entre
+                                           bloques de cada copia.
+            journal (MoveJournal, optional): Diario donde se registran los movimientos.
+            slowest (int, optional): Movimientos más lentos que se guardan en ``slowest``.
+            limiter (IOLimiter, optional): Límite de movimientos simultáneos compartido
+                                           con otros motores (ver ``sorter.batch``).
+            layout (FolderLayout, optional): Disposición de las carpetas de destino.
+                                             Por defecto, una carpeta por categoría.
+        """
+        self.root = root
+        self.workers = max(1, int(workers))
+        self.reporter = reporter if reporter is not None else ProgressReporter()
+        self.token = token
+        self.journal = journal
+        self.limiter = limiter
+        self.layout = layout if layout is not None else FolderLayout()
+        self._targets = {}
+        self._folders = {}
+        self._sources = None
+        self._reserved = {}
+        self.moved = []
+        self.moved_count = 0
+        self.bytes_moved = 0
+        self.renamed = 0
+        self.errors = []
+        self.destinations = {}
+        self.timings = {}
+        self.phases = {}
+        self.slowest_count = max(0, int(slowest))
+        self.slowest = []
+        self._keep_results = True
+        self._timings_lock = threading.Lock()
+
+    def run(self, planned_files):
+        """
+        Mueve los archivos indicados a sus carpetas de categoría.
+
+        Args:
+            planned_files (list): Lista de ``PlannedFile`` a mover.
+
+        Returns:
+            tuple: (moved, errors) con los ``PlannedFile`` movidos y la lista
+                   de tuplas (filename, error_message) de los que fallaron.
+                   La ruta final de cada archivo movido queda en ``destinations``,
+                   indexada por ``id`` del ``PlannedFile``, y el tiempo empleado
+                   en ``timings``: (dispositivo de destino, a otro dispositivo)
+                   → [archivos, bytes, segundos], sumando los de todos los hilos.
+                   ``phases`` guarda los segundos de la creación de carpetas
+                   (``folders``), de la elección de nombres (``collisions``,
+                   sumando los hilos) y de los movimientos (``moves``), y
+                   ``slowest`` los movimientos más lentos como tuplas
+                   (seconds, relative_path, size, cross_device), del más lento
+                   al más rápido. ``moved_count``, ``bytes_moved`` y ``renamed``
+                   cuentan los archivos movidos, sus bytes y los que recibieron
+                   un sufijo por colisión.
+
+        Note:
+            Si la ejecución se interrumpe, los movimientos pendientes se cancelan
+            y ``moved`` conserva los ya realizados.
+
+        Raises:
+            OSError: Si no hay suficiente espacio en disco.
+            OperationCancelled: Si se cancela mediante ``token``. Las copias a
+                                otro dispositivo a medias se deshacen.
+        """
+        ordered, self._folders = self._group_by_folder(planned_files)
+        self._reset(keep_results=True)
+        self.reporter.start(len(ordered), sum(planned.size for planned in ordered))
+        self._execute(ordered, lambda: self._prepare_targets(ordered))
+        return self.moved, self.errors
+
+    def run_stream(self, planned_files, files_total=None):
+        """
+        Mueve los archivos de un iterable a medida que llegan.
+
+        A diferencia de ``run``, no agrupa los archivos por carpeta ni los
+        guarda: cada carpeta de destino se prepara la primera vez que llega
+        un archivo suyo y de los movidos solo se llevan los recuentos, por
+        lo que ``moved`` y ``destinations`` quedan vacíos.
+
+        Args:
+            planned_files (iterable): ``PlannedFile`` a mover; puede ser un
+                                      generador que aún esté listando.
+            files_total (int, optional): Número estimado de archivos para el
+                                         progreso. El progreso se marca como
+                                         estimado hasta que quien produce los
+                                         archivos llame a ``reporter.set_totals``.
+
+        Returns:
+            tuple: (moved_count, errors) con el número de archivos movidos y la
+                   lista de tuplas (filename, error_message) de los que fallaron.
+                   ``timings``, ``phases`` y ``slowest`` se rellenan como en
+                   ``run``; la creación de carpetas se descuenta de los movimientos.
+
+        Raises:
+            OSError: Si no hay suficiente espacio en disco.
+            OperationCancelled: Si se cancela mediante ``token``.
+        """
+        self._folders = {}
+        self._reset(keep_results=False)
+        self.reporter.start(files_total, 0, estimated=True)
+        self._execute(self._prepare_as_needed(planned_files))
+        return self.moved_count, self.errors
+
+    def _reset(self, keep_results):
+        """Vacía los resultados de la ejecución anterior."""
+        self._keep_results = keep_results
+        self.moved = []
+        self.moved_count = 0
+        self.bytes_moved = 0
+        self.renamed = 0
+        self.errors = []
+        self.destinations = {}
+        self.timings = {}
+        self.slowest = []
+
+        for target in self._targets.values():
+            target.reserve_seconds = 0.0
+
+    def _execute(self, planned_files, prepare=None):
+        """Prepara las carpetas (si se indica ``prepare``) y mueve los archivos."""
+        started = time.perf_counter()
+        self.phases = {'folders': 0.0}
+
+        try:
+            self._sources = _SourceDirectories.open(self.root) if _DIR_FD_MOVES else None
+            if prepare is not None:
+                prepare()
+
+            if self.workers == 1:
+                for planned in self._journaled(planned_files):
+                    check_token(self.token)
+                    self._record(planned, self._move_file_to_category(planned))
+            else:
+                self._run_parallel(planned_files)
+        finally:
+            self._release_reserved()
+            self._close_directories()
+            self.reporter.finish()
+            self.phases['moves'] = max(0.0, time.perf_counter() - started - self.phases['folders'])
+            self.phases['collisions'] = sum(target.reserve_seconds
+                                            for target in self._targets.values())
+            self.slowest.sort(reverse=True)
+
+    def preview(self, planned_files):
+        """
+        Calcula el destino de cada archivo sin mover nada ni crear carpetas.
+
+        Las carpetas de categoría existentes se listan igual que al mover, de
+        modo que los nombres obtenidos son los que usaría ``run`` si nada
+        cambia entretanto.
+
+        Args:
+            planned_files (list): Lista de ``PlannedFile`` a mover.
+
+        Returns:
+            list: Tuplas (planned, target_path, cross_device), agrupadas por
+                  carpeta en el mismo orden en que ``run`` las movería.
+        """
+        targets = {}
+        root_device = None
+        moves = []
+        ordered, folders = self._group_by_folder(planned_files)
+
+        for planned in ordered:
+            folder = folders[id(planned)]
+            target = targets.get(folder)
+            if target is None:
+                target = _CategoryTarget(os.path.join(self.root, folder))
+                targets[folder] = target
+                target.load()
+                try:
+                    target.device = os.stat(target.folder).st_dev
+                except OSError:
+                    # La carpeta se crearía dentro de la raíz (o de su categoría)
+                    if root_device is None:
+                        root_device = os.stat(self.root).st_dev
+                    target.device = root_device
+
+            target_path = os.path.join(target.folder, target.reserve(planned.name))
+            moves.append((planned, target_path, _is_cross_device(planned, target)))
+
+        return moves
+
+    def _run_parallel(self, planned_files):
+        """Reparte los movimientos entre los hilos manteniendo una cola acotada."""
+        # concurrent.futures arrastra logging: se importa solo si hay hilos
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, ALL_COMPLETED
+
+        limit = self.workers * _PENDING_PER_WORKER
+        pending = {}
+        executor = ThreadPoolExecutor(max_workers=self.workers)
+
+        try:
+            for planned in self._journaled(planned_files):
+                check_token(self.token)
+                if len(pending) >= limit:
+                    self._drain(pending, FIRST_COMPLETED)
+                future = executor.submit(self._move_file_to_category, planned)
+                pending[future] = planned
+
+            self._drain(pending, ALL_COMPLETED)
+        except BaseException:
+            for future in pending:
+                future.cancel()
+            executor.shutdown(wait=True)
+            self._collect_finished(pending)
+            raise
+        finally:
+            executor.shutdown(wait=True)
+
+    def _drain(self, pending, return_when):
+        """Recoge los movimientos terminados."""
+        from concurrent.futures import wait
+
+        done, _ = wait(pending, return_when=return_when)
+        for future in done:
+            planned = pending.pop(future)
+            self._record(planned, future.result())
+
+    def _collect_finished(self, pending):
+        """Registra los movimientos que terminaron antes de interrumpir la ejecución."""
+        for future, planned in pending.items():
+            if future.done() and not future.cancelled() and future.exception() is None:
+                self._record(planned, future.result())
+
+    def _journaled(self, planned_files):
+        """Recorre los archivos registrando en el diario cada lote antes de moverlos."""
+        if self.journal is None:
+            yield from planned_files
+            return
+
+        planned_files = iter(planned_files)
+        while True:
+            check_token(self.token)
+            batch = list(itertools.islice(planned_files, _JOURNAL_BATCH))
+            if not batch:
+                return
+            self._journal_batch(batch)
+            yield from batch
+
+    def _journal_batch(self, batch):
+        """
+        Reserva los nombres de destino de un lote y registra sus movimientos.
+
+        Los archivos que ya no existen o cuya carpeta no pudo crearse no se
+        registran: el hilo que los procese informará del error.
+
+        Raises:
+            OSError: Si el diario no puede escribirse. Ningún archivo del lote
+                     llega a moverse.
+        """
+        reserved = []
+        moves = []
+        for planned in batch:
+            target = self._target_of(planned)
+            if target.error is not None:
+                continue
+            file_path = os.path.join(self.root, planned.relative_path)
+            try:
+                stat = self._source_stat(planned, file_path)
+            except OSError:
+                continue
+
+            with target.lock:
+                target_name = target.reserve(planned.name)
+            reserved.append((planned, target, target_name))
+            moves.append((file_path, os.path.join(target.folder, target_name), stat.st_size,
+                          stat.st_mtime_ns, _is_cross_device(planned, target)))
+
+        try:
+            move_ids = self.journal.record_moves(moves)
+        except BaseException:
+            for planned, target, target_name in reserved:
+                with target.lock:
+                    target.release(target_name)
+            raise
+
+        for (planned, target, target_name), move_id in zip(reserved, move_ids):
+            self._reserved[id(planned)] = (target, target_name, move_id)
+
+    def _release_reserved(self):
+        """Libera los nombres reservados de los archivos que no llegaron a moverse."""
+        for target, target_name, move_id in self._reserved.values():
+            with target.lock:
+                target.release(target_name)
+            self.journal.mark_aborted(move_id)
+        self._reserved = {}
+
+    def _record(self, planned, error):
+        """Registra el resultado de un movimiento y notifica el progreso."""
+        if error:
+            self.errors.append(error)
+        else:
+            self.moved_count += 1
+            self.bytes_moved += planned.size
+            if self._keep_results:
+                self.moved.append(planned)
+
+        if not self._keep_results:
+            del self._folders[id(planned)]
+        self.reporter.file_done()
+
+    def _move_file_to_category(self, planned):
+        """
+        Mueve un archivo a su carpeta de categoría.
+
+        Returns:
+            tuple: (filename, error_message) si hay error, None si es exitoso.
+        """
+        check_token(self.token)
+        file = planned.relative_path
+        target = self._target_of(planned)
+
+        if target.error is not None:
+            self.reporter.add_bytes(planned.size)
+            return _describe_move_error(file, target.error)
+
+        copied = 0
+
+        def on_chunk(amount):
+            nonlocal copied
+            copied += amount
+            self.reporter.add_bytes(amount)
+            check_token(self.token)
+
+        try:
+            with self._io_slot(planned, target):
+                started = time.perf_counter()
+                destination = self._move_file_safely(planned, target, on_chunk)
+                self._add_timing(planned, target, destination, time.perf_counter() - started)
+            if self._keep_results:
+                self.destinations[id(planned)] = destination
+            return None
+        except OSError as e:
+            return _describe_move_error(file, e)
+        finally:
+            self.reporter.add_bytes(max(0, planned.size - copied))
+
+    def _io_slot(self, planned, target):
+        """Ocupa una plaza del límite compartido para un movimiento, si lo hay."""
+        if self.limiter is None:
+            return contextlib.nullcontext()
+        return self.limiter.slot(planned.device, target.device)
+
+    def _add_timing(self, planned, target, destination, seconds):
+        """Acumula el tiempo de un movimiento por dispositivo de destino."""
+        cross_device = _is_cross_device(planned, target)
+        renamed = os.path.basename(destination) != planned.name
+        with self._timings_lock:
+            if renamed:
+                self.renamed += 1
+            timing = self.timings.setdefault((target.device, cross_device), [0, 0, 0.0])
+            timing[0] += 1
+            timing[1] += planned.size
+            timing[2] += seconds
+
+            if self.slowest_count:
+                move = (seconds, planned.relative_path, planned.size, cross_device)
+                if len(self.slowest) < self.slowest_count:
+                    heapq.heappush(self.slowest, move)
+                elif move > self.slowest[0]:
+                    heapq.heapreplace(self.slowest, move)
+
+    def _prepare_targets(self, ordered):
+        """
+        Crea de una vez las carpetas de destino que necesita el plan.
+
+        Cada carpeta se crea y se indexa una sola vez por ejecución; las que
+        no existían no se listan. Si una carpeta no puede crearse, el error
+        se guarda y se asigna a todos sus archivos.
+        """
+        for folder in dict.fromkeys(self._folders[id(planned)] for planned in ordered):
+            if folder not in self._targets:
+                self._prepare_folder(folder)
+
+    def _prepare_as_needed(self, planned_files):
+        """Genera los archivos calculando su carpeta y preparándola la primera vez."""
+        folder_of = self.layout.folder
+        for planned in planned_files:
+            folder = folder_of(planned)
+            self._folders[id(planned)] = folder
+            if folder not in self._targets:
+                self._prepare_folder(folder)
+            yield planned
+
+    def _prepare_folder(self, folder):
+        """Crea e indexa una carpeta de destino, sumando el tiempo a la fase ``folders``."""
+        started = time.perf_counter()
+        target = _CategoryTarget(os.path.join(self.root, folder))
+        self._targets[folder] = target
+        try:
+            created = _make_folder(target.folder)
+            if created and self.journal is not None:
+                self.journal.record_folders(created)
+            if self._sources is not None:
+                target.fd = os.open(target.folder, _DIRECTORY_FLAGS)
+                target.device = os.fstat(target.fd).st_dev
+            else:
+                target.device = os.stat(target.folder).st_dev
+            if created:
+                target.names = set()
+            else:
+                target.load()
+        except OSError as e:
+            target.error = e
+        finally:
+            self.phases['folders'] += time.perf_counter() - started
+
+    def _close_directories(self):
+        """Cierra los descriptores de las carpetas abiertas durante la ejecución."""
+        if self._sources is not None:
+            self._sources.close()
+            self._sources = None
+        for target in self._targets.values():
+            target.close()
+
+    def _source_stat(self, planned, file_path):
+        """Consulta el estado del archivo de origen sin seguir enlaces simbólicos."""
+        if self._sources is None:
+            return os.lstat(file_path)
+        directory, name = os.path.split(planned.relative_path)
+        return os.stat(name, dir_fd=self._sources.get(directory), follow_symlinks=False)
+
+    def _group_by_folder(self, planned_files):
+        """
+        Calcula la carpeta de destino de cada archivo y los agrupa por carpeta.
+
+        Returns:
+            tuple: (ordered, folders) con los archivos ordenados por carpeta y
+                   la carpeta relativa de cada uno, indexada por ``id``.
+        """
+        folder_of = self.layout.folder
+        folders = {id(planned): folder_of(planned) for planned in planned_files}
+        ordered = sorted(planned_files, key=lambda planned: folders[id(planned)])
+        return ordered, folders
+
+    def _target_of(self, planned):
+        """Devuelve la carpeta de destino preparada para un archivo."""
+        return self._targets[self._folders[id(planned)]]
+
+    def _move_file_safely(self, planned, target, on_chunk):
+        """
+        Mueve un archivo manejando colisiones de nombres.
+
+        El nombre se elige en el índice en memoria; si otro proceso ha creado
+        ese nombre después de listar la carpeta, el movimiento sin sobrescritura
+        falla y se prueba con el siguiente nombre libre.
+
+        Returns:
+            str: Ruta final del archivo.
+        """
+        file_path = os.path.join(self.root, planned.relative_path)
+        cross_device = _is_cross_device(planned, target)
+        folder_recreated = False
+        reserved = self._reserved.pop(id(planned), None)
+
+        while True:
+            if reserved is not None:
+                (_, target_name, move_id), reserved = reserved, None
+            else:
+                with target.lock:
+                    target_name = target.reserve(planned.name)
+                move_id = self._journal_move(planned, file_path, target, target_name,
+                                             cross_device)
+
+            target_path = os.path.join(target.folder, target_name)
+            try:
+                if cross_device:
+                    move_across_devices(file_path, target_path, on_chunk)
+                elif self._sources is not None and target.fd is not None:
+                    directory, name = os.path.split(planned.relative_path)
+                    _move_without_overwrite_at(self._sources.get(directory), name, target.fd,
+                                               target_name, file_path, target_path, on_chunk)
+                else:
+                    move_without_overwrite(file_path, target_path, on_chunk)
+            except FileExistsError:
+                # El destino registrado es de otro archivo: el descarte debe
+                # estar en disco antes de reintentar para que la recuperación
+                # no lo toque
+                self._journal_abort(move_id, sync=True)
+                continue
+            except FileNotFoundError:
+                self._journal_abort(move_id)
+                with target.lock:
+                    target.release(target_name)
+                    if folder_recreated or not target.recreate_if_missing():
+                        raise
+                folder_recreated = True
+            except BaseException:
+                self._journal_abort(move_id)
+                with target.lock:
+                    target.release(target_name)
+                raise
+            else:
+                if move_id is not None:
+                    self.journal.mark_done(move_id)
+                return target_path
+
+    def _journal_move(self, planned, file_path, target, target_name, cross_device):
+        """
+        Registra en el diario un movimiento que no se reservó por lotes.
+
+        Returns:
+            int: Identificador del movimiento, o None si no hay diario.
+        """
+        if self.journal is None:
+            return None
+
+        try:
+            stat = self._source_stat(planned, file_path)
+            return self.journal.record_move(file_path, os.path.join(target.folder, target_name),
+                                            stat.st_size, stat.st_mtime_ns, cross_device)
+        except BaseException:
+            with target.lock:
+                target.release(target_name)
+            raise
+
+    def _journal_abort(self, move_id, sync=False):
+        """Descarta en el diario un movimiento que no llegó a hacerse."""
+        if move_id is not None:
+            self.journal.mark_aborted(move_id, sync)
+
+
+class _CategoryTarget:
+    """
+    Carpeta de destino de una categoría con su índice de nombres ocupados.
+
+    El índice se construye listando la carpeta una única vez y guarda, para
+    cada nombre base, el sufijo numérico más alto visto (``foto_7.jpg`` → 7),
+    de modo que los nombres libres se obtienen en memoria sin consultar el
+    disco. Los nombres se añaden al reservarlos, antes de mover el archivo.
+    """
+
+    __slots__ = ('folder', 'lock', 'names', 'counters', 'device', 'error', 'reserve_seconds',
+                 'fd', 'stale_fds')
+
+    def __init__(self, folder):
+        self.folder = folder
+        self.lock = threading.Lock()
+        self.names = None
+        self.counters = {}
+        self.device = None
+        self.error = None
+        self.reserve_seconds = 0.0
+        self.fd = None
+        self.stale_fds = []
+
+    def reserve(self, filename):
+        """
+        Elige un nombre libre para el archivo y lo reserva.
+
+        Debe llamarse con ``lock`` adquirido.
+
+        Returns:
+            str: Nombre reservado dentro de ``folder``.
+        """
+        started = time.perf_counter()
+        if self.names is None:
+            self.load()
+
+        if os.path.normcase(filename) in self.names:
+            filename = self._resolve_collision(filename)
+
+        self._add_name(filename)
+        self.reserve_seconds += time.perf_counter() - started
+        return filename
+
+    def release(self, filename):
+        """Libera un nombre reservado cuyo movimiento no llegó a realizarse."""
+        self.names.discard(os.path.normcase(filename))
+
+    def recreate_if_missing(self):
+        """
+        Vuelve a crear la carpeta si se ha borrado durante la ejecución.
+
+        Debe llamarse con ``lock`` adquirido.
+
+        Returns:
+            bool: True si la carpeta no existía (o se sustituyó por otra) y se
+                  ha creado o abierto de nuevo.
+        """
+        if os.path.isdir(self.folder) and not self._fd_replaced():
+            return False
+
+        os.makedirs(self.folder, exist_ok=True)
+        if self.fd is not None:
+            # Otros hilos pueden estar usando el descriptor: se cierra al terminar
+            self.stale_fds.append(self.fd)
+            self.fd = os.open(self.folder, _DIRECTORY_FLAGS)
+        self.names = None
+        self.counters = {}
+        return True
+
+    def close(self):
+        """Cierra los descriptores de la carpeta."""
+        for fd in self.stale_fds + ([self.fd] if self.fd is not None else []):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.fd = None
+        self.stale_fds = []
+
+    def load(self):
+        """Lista la carpeta de destino y construye el índice de nombres."""
+        self.names = set()
+        try:
+            with os.scandir(self.fd if self.fd is not None else self.folder) as entries:
+                for entry in entries:
+                    self._add_name(entry.name)
+        except FileNotFoundError:
+            pass
+
+    def _fd_replaced(self):
+        """Indica si la carpeta abierta ya no es la que hay en su ruta."""
+        if self.fd is None:
+            return False
+        try:
+            return not os.path.samestat(os.fstat(self.fd), os.stat(self.folder))
+        except OSError:
+            return True
+
+    def _add_name(self, filename):
+        """Registra un nombre ocupado y actualiza el contador de su nombre base."""
+        key = os.path.normcase(filename)
+        self.names.add(key)
+
+        base, extension = os.path.splitext(key)
+        stem, separator, suffix = base.rpartition('_')
+        if separator and suffix.isdigit():
+            counter_key = (stem, extension)
+            self.counters[counter_key] = max(self.counters.get(counter_key, 0), int(suffix))
+
+    def _resolve_collision(self, filename):
+        """Genera un nombre único para evitar sobreescribir archivos."""
+        base, extension = os.path.splitext(filename)
+        counter_key = (os.path.normcase(base), os.path.normcase(extension))
+        counter = self.counters.get(counter_key, 0) + 1
+
+        while True:
+            new_name = f"{base}_{counter}{extension}"
+            if os.path.normcase(new_name) not in self.names:
+                return new_name
+            counter += 1
+
+
+def _make_folder(folder):
+    """
+    Crea una carpeta y las que falten por encima.
+
+    Returns:
+        list: Carpetas creadas, de la más externa a la más interna; vacía si
+              la carpeta ya existía.
+
+    Raises:
+        FileExistsError: Si existe un archivo con ese nombre.
+    """
+    try:
+        os.mkdir(folder)
+        return [folder]
+    except FileExistsError:
+        if not os.path.isdir(folder):
+            raise
+        return []
+    except FileNotFoundError:
+        created = _make_folder(os.path.dirname(folder))
+        try:
+            os.mkdir(folder)
+        except FileExistsError:
+            return created
+        return created + [folder]
+
+
+class _SourceDirectories:
+    """
+    Descriptores de las carpetas de origen de una ejecución.
+
+    La raíz se abre al empezar y cada subcarpeta, relativa a ella, la primera
+    vez que se mueve un archivo suyo.
+    """
+
+    __slots__ = ('fds', 'lock')
+
+    def __init__(self, root_fd):
+        self.fds = {'': root_fd}
+        self.lock = threading.Lock()
+
+    @classmethod
+    def open(cls, root):
+        """
+        Abre la raíz.
+
+        Returns:
+            _SourceDirectories: Los descriptores, o None si la raíz no puede
+                                abrirse (se usarán rutas completas).
+        """
+        try:
+            return cls(os.open(root, _DIRECTORY_FLAGS))
+        except OSError:
+            return None
+
+    def get(self, directory):
+        """
+        Obtiene el descriptor de una carpeta de origen.
+
+        Args:
+            directory (str): Ruta relativa a la raíz ('' para la raíz).
+
+        Raises:
+            OSError: Si la carpeta no puede abrirse.
+        """
+        fd = self.fds.get(directory)
+        if fd is None:
+            with self.lock:
+                fd = self.fds.get(directory)
+                if fd is None:
+                    fd = os.open(directory, _DIRECTORY_FLAGS, dir_fd=self.fds[''])
+                    self.fds[directory] = fd
+        return fd
+
+    def close(self):
+        """Cierra todos los descriptores."""
+        for fd in self.fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self.fds = {}
+
+
+def _is_cross_device(planned, target):
+    """
+    Indica si el archivo y su carpeta de destino están en dispositivos distintos.
+
+    Un dispositivo 0 se considera desconocido (``DirEntry.stat`` en Windows no
+    lo rellena); en ese caso se intenta renombrar y se copia solo si falla.
+    """
+    return bool(planned.device and target.device and planned.device != target.device)
+
+
+def move_without_overwrite(file_path, target_path, on_chunk=None):
+    """
+    Mueve un archivo sin sobrescribir nunca el destino.
+
+    En Windows ``os.rename`` ya falla si el destino existe; en POSIX se usa
+    ``link`` + ``unlink``, que es atómico frente a otros procesos. Si el sistema
+    de archivos no admite enlaces, se reserva el nombre creando el archivo con
+    ``O_EXCL`` y se mueve encima. Si el destino resulta estar en otro
+    dispositivo, se copia con ``move_across_devices``.
+
+    Raises:
+        FileExistsError: Si el destino ya existe.
+        OSError: Si el movimiento falla por cualquier otro motivo.
+    """
+    if os.name == 'nt':
+        try:
+            os.rename(file_path, target_path)
+            return
+        except OSError as e:
+            if e.errno != errno.EXDEV:
+                raise
+            move_across_devices(file_path, target_path, on_chunk)
+            return
+    elif _LINK_WITHOUT_FOLLOW:
+        try:
+            os.link(file_path, target_path, follow_symlinks=False)
+        except (FileExistsError, FileNotFoundError):
+            raise
+        except OSError as e:
+            if e.errno == errno.EXDEV:
+                move_across_devices(file_path, target_path, on_chunk)
+                return
+        else:
+            _unlink_source(file_path, target_path)
+            return
+
+    _move_over_placeholder(file_path, target_path, on_chunk)
+
+
+def _move_without_overwrite_at(source_fd, name, target_fd, target_name, file_path, target_path,
+                               on_chunk=None):
+    """
+    Mueve un archivo sin sobrescribir el destino usando nombres relativos a carpetas abiertas.
+
+    Equivale a ``move_without_overwrite`` con ``link`` + ``unlink`` relativos
+    a ``source_fd`` y ``target_fd``. ``file_path`` y ``target_path`` solo se
+    usan si el destino resulta estar en otro dispositivo.
+
+    Raises:
+        FileExistsError: Si el destino ya existe.
+        OSError: Si el movimiento falla por cualquier otro motivo.
+    """
+    try:
+        os.link(name, target_name, src_dir_fd=source_fd, dst_dir_fd=target_fd,
+                follow_symlinks=False)
+    except (FileExistsError, FileNotFoundError):
+        raise
+    except OSError as e:
+        if e.errno == errno.EXDEV:
+            move_across_devices(file_path, target_path, on_chunk)
+            return
+        _move_over_placeholder_at(source_fd, name, target_fd, target_name, file_path,
+                                  target_path, on_chunk)
+        return
+
+    try:
+        os.unlink(name, dir_fd=source_fd)
+    except BaseException:
+        _remove_quietly(target_name, target_fd)
+        raise
+
+
+def _move_over_placeholder_at(source_fd, name, target_fd, target_name, file_path, target_path,
+                              on_chunk=None):
+    """Como ``_move_over_placeholder``, con nombres relativos a carpetas abiertas."""
+    fd = os.open(target_name, os.O_CREAT | os.O_EXCL | os.O_WRONLY, dir_fd=target_fd)
+    os.close(fd)
+
+    try:
+        os.replace(name, target_name, src_dir_fd=source_fd, dst_dir_fd=target_fd)
+    except OSError as e:
+        _remove_quietly(target_name, target_fd)
+        if e.errno != errno.EXDEV:
+            raise
+        move_across_devices(file_path, target_path, on_chunk)
+    except BaseException:
+        _remove_quietly(target_name, target_fd)
+        raise
+
+
+def _unlink_source(file_path, target_path):
+    """Elimina el origen tras enlazarlo; si falla, deshace el enlace creado."""
+    try:
+        os.unlink(file_path)
+    except BaseException:
+        _remove_quietly(target_path)
+        raise
+
+
+def _move_over_placeholder(file_path, target_path, on_chunk=None):
+    """Reserva el destino creándolo de forma exclusiva y mueve el archivo encima."""
+    fd = os.open(target_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    os.close(fd)
+
+    try:
+        os.replace(file_path, target_path)
+    except OSError as e:
+        _remove_quietly(target_path)
+        if e.errno != errno.EXDEV:
+            raise
+        move_across_devices(file_path, target_path, on_chunk)
+    except BaseException:
+        _remove_quietly(target_path)
+        raise
+
+
+def _remove_quietly(path, dir_fd=None):
+    """Elimina un archivo ignorando los errores."""
+    try:
+        os.unlink(path, dir_fd=dir_fd)
+    except OSError:
+        pass
+
+
+def _describe_move_error(file, error):
+    """Convierte un error de movimiento en la tupla (filename, error_message)."""
+    if isinstance(error, PermissionError):
+        return (file, "Sin permisos para mover el archivo")
+    return _handle_move_error(file, error)
+
+
+def _handle_move_error(file, error):
+    """Maneja errores específicos al mover archivos."""
+    if error.errno == 32:
+        return (file, "Archivo en uso por otra aplicación")
+    elif error.errno == 28:
+        raise OSError("No hay suficiente espacio en disco")
+    else:
+        return (file, str(error))
@@ -0,0 +1,294 @@
+"""
+Módulo de estimación de una organización.
+
+Contiene la simulación que describe lo que haría ``sort_files`` sin mover
+nada (archivos y bytes por categoría, colisiones de nombres, movimientos
+dentro del mismo dispositivo o copias a otro) y estima su duración a partir
+de la velocidad medida de cada dispositivo en organizaciones anteriores.
+"""
+
+import json
+import os
+import threading
+import time
+from sorter.engine import move_without_overwrite
+
+# Valores supuestos cuando un dispositivo aún no se ha medido
+DEFAULT_RENAME_SECONDS = 0.0005
+DEFAULT_COPY_RATE = 100 * 1024 * 1024
+
+# Peso de la última medición frente al histórico
+_SMOOTHING = 0.3
+
+# Movimientos de la prueba de velocidad de un dispositivo sin histórico
+_PROBE_MOVES = 16
+
+
+class SortEstimate:
+    """
+    Descripción de una organización antes de ejecutarla.
+
+    Attributes:
+        root (str): Directorio a organizar.
+        moves (list): Tuplas (planned, target_path, cross_device) de cada archivo,
+                      en el orden en que se moverían.
+        categories (dict): Categorías como claves (ordenadas) con count y bytes.
+        renamed (list): Tuplas (relative_path, new_name) de los archivos que
+                        recibirían un sufijo por coincidir con uno existente.
+        same_device (dict): count y bytes de los movimientos que son renombrados.
+        cross_device (dict): count y bytes de los que requieren copiar los datos.
+        duplicates (list): ``Duplicate`` que no se moverían por estar repetidos.
+        seconds (float): Duración estimada en segundos.
+        measured (bool): True si todos los dispositivos implicados tienen una
+                         velocidad medida; si no, se han supuesto valores típicos.
+    """
+
+    def __init__(self, root):
+        self.root = root
+        self.moves = []
+        self.categories = {}
+        self.renamed = []
+        self.same_device = {'count': 0, 'bytes': 0}
+        self.cross_device = {'count': 0, 'bytes': 0}
+        self.duplicates = []
+        self.seconds = 0.0
+        self.measured = True
+
+    def __len__(self):
+        return len(self.moves)
+
+    @property
+    def total_count(self):
+        """int: Archivos que se moverían."""
+        return len(self.moves)
+
+    @property
+    def total_bytes(self):
+        """int: Bytes de los archivos que se moverían."""
+        return self.same_device['bytes'] + self.cross_device['bytes']
+
+
+class ThroughputStore:
+    """
+    Velocidades medidas de cada dispositivo de destino.
+
+    Guarda, por dispositivo, los segundos que tarda en promedio un renombrado
+    y los bytes por segundo de las copias desde otro dispositivo, suavizados
+    entre ejecuciones. Se guarda en un archivo JSON pequeño.
+    """
+
+    def __init__(self, path=None):
+        """
+        Carga las velocidades guardadas.
+
+        Args:
+            path (str, optional): Archivo JSON. Por defecto, junto al índice de
+                                  escaneos en la carpeta de caché del usuario.
+        """
+        self.path = path or default_throughput_path()
+        try:
+            with open(self.path, encoding="utf-8") as file:
+                self.devices = json.load(file)
+        except (OSError, ValueError):
+            self.devices = {}
+        if not isinstance(self.devices, dict):
+            self.devices = {}
+        self._lock = threading.Lock()
+
+    def rates(self, device):
+        """
+        Obtiene las velocidades medidas de un dispositivo.
+
+        Returns:
+            dict: Con ``rename_seconds`` y ``copy_rate`` (los que se hayan medido),
+                  vacío si el dispositivo no se ha medido nunca.
+        """
+        return self.devices.get(str(device), {})
+
+    def record(self, device, cross_device, count, size, seconds):
+        """
+        Añade una medición de una organización.
+
+        Args:
+            device (int): Dispositivo de destino.
+            cross_device (bool): True si los archivos se copiaron desde otro dispositivo.
+            count (int): Archivos movidos.
+            size (int): Bytes movidos.
+            seconds (float): Segundos empleados, sumando los de todos los hilos.
+        """
+        if count <= 0 or seconds <= 0:
+            return
+
+        # Varias organizaciones de un lote pueden anotar a la vez
+        with self._lock:
+            rates = self.devices.setdefault(str(device), {})
+            if cross_device:
+                if size > 0:
+                    _smooth(rates, 'copy_rate', size / seconds)
+            else:
+                _smooth(rates, 'rename_seconds', seconds / count)
+
+    def record_timings(self, timings):
+        """
+        Añade las mediciones de ``MoveEngine.timings``.
+
+        Args:
+            timings (dict): (dispositivo, a otro dispositivo) → [archivos, bytes, segundos].
+        """
+        for (device, cross_device), (count, size, seconds) in timings.items():
+            if device is not None:
+                self.record(device, cross_device, count, size, seconds)
+
+    def save(self):
+        """
+        Guarda las velocidades en disco.
+
+        Raises:
+            OSError: Si no puede escribirse el archivo.
+        """
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        temporary = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary, "w", encoding="utf-8") as file:
+            json.dump(self.devices, file)
+        os.replace(temporary, self.path)
+
+
+def estimate_moves(root, moves, workers=1, store=None, probe=False):
+    """
+    Resume una lista de movimientos y estima su duración.
+
+    La duración es la suma de los renombrados (por su tiempo medio) y de las
+    copias (por su velocidad) de cada dispositivo, repartida entre los hilos.
+    Es aproximada: no tiene en cuenta la caché del sistema ni otros procesos.
+
+    Args:
+        root (str): Directorio a organizar.
+        moves (list): Tuplas (planned, target_path, cross_device) de
+                      ``MoveEngine.preview``.
+        workers (int, optional): Archivos que se moverían a la vez.
+        store (ThroughputStore, optional): Velocidades medidas de cada dispositivo.
+        probe (bool, optional): Medir en el momento el tiempo de un renombrado en
+                                los dispositivos sin histórico, moviendo unas
+                                cuantas veces un archivo temporal vacío en la
+                                carpeta de destino. Escribe en el árbol que se
+                                simula, así que por defecto no se hace y se
+                                suponen ``DEFAULT_RENAME_SECONDS``.
+
+    Returns:
+        SortEstimate: Descripción de la organización.
+    """
+    estimate = SortEstimate(root)
+    estimate.moves = moves
+    per_device = {}
+
+    for planned, target_path, cross_device in moves:
+        category = estimate.categories.setdefault(planned.category, {'count': 0, 'bytes': 0})
+        category['count'] += 1
+        category['bytes'] += planned.size
+
+        split = estimate.cross_device if cross_device else estimate.same_device
+        split['count'] += 1
+        split['bytes'] += planned.size
+
+        new_name = os.path.basename(target_path)
+        if new_name != planned.name:
+            estimate.renamed.append((planned.relative_path, new_name))
+
+        folder = os.path.dirname(target_path)
+        device = per_device.setdefault(folder, [0, 0])
+        if cross_device:
+            device[1] += planned.size
+        else:
+            device[0] += 1
+
+    estimate.categories = dict(sorted(estimate.categories.items()))
+
+    seconds = 0.0
+    probed = {}
+    for folder, (renames, copied) in per_device.items():
+        device = _device_of(folder)
+        rates = store.rates(device) if store is not None and device is not None else {}
+
+        rename_seconds = rates.get('rename_seconds')
+        if rename_seconds is None and renames:
+            if device not in probed:
+                probed[device] = probe_rename_seconds(folder) if probe else None
+            rename_seconds = probed[device]
+        if rename_seconds is None and renames:
+            rename_seconds = DEFAULT_RENAME_SECONDS
+            estimate.measured = False
+
+        copy_rate = rates.get('copy_rate')
+        if copy_rate is None and copied:
+            copy_rate = DEFAULT_COPY_RATE
+            estimate.measured = False
+
+        if renames:
+            seconds += renames * rename_seconds
+        if copied:
+            seconds += copied / copy_rate
+
+    estimate.seconds = seconds / max(1, workers)
+    return estimate
+
+
+def probe_rename_seconds(folder, moves=_PROBE_MOVES):
+    """
+    Mide el tiempo de un movimiento dentro de un dispositivo.
+
+    Crea un archivo temporal vacío en ``folder`` (o en su carpeta padre si aún
+    no existe), lo mueve varias veces sin sobrescribir y lo elimina.
+
+    Returns:
+        float: Segundos por movimiento, o None si no puede medirse.
+    """
+    if not os.path.isdir(folder):
+        folder = os.path.dirname(folder)
+    path = os.path.join(folder, f".sorter-probe-{os.getpid()}-{time.time_ns()}")
+    try:
+        os.close(os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+    except OSError:
+        return None
+
+    other = path + "-moved"
+    try:
+        started = time.perf_counter()
+        for _ in range(moves):
+            move_without_overwrite(path, other)
+            path, other = other, path
+        return (time.perf_counter() - started) / moves
+    except OSError:
+        return None
+    finally:
+        for leftover in (path, other):
+            try:
+                os.unlink(leftover)
+            except OSError:
+                pass
+
+
+def default_throughput_path():
+    """
+    Obtiene la ruta por defecto de las velocidades medidas.
+
+    Returns:
+        str: Ruta del archivo JSON.
+    """
+    from sorter.scan_index import default_index_path
+    return os.path.join(os.path.dirname(default_index_path()), "throughput.json")
+
+
+def _smooth(rates, key, value):
+    """Combina una medición nueva con la guardada."""
+    previous = rates.get(key)
+    rates[key] = value if previous is None else previous * (1 - _SMOOTHING) + value * _SMOOTHING
+
+
+def _device_of(folder):
+    """Obtiene el dispositivo de una carpeta de destino, o de su padre si aún no existe."""
+    for path in (folder, os.path.dirname(folder)):
+        try:
+            return os.stat(path).st_dev
+        except OSError:
+            continue
+    return None
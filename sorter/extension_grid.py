@@ -0,0 +1,201 @@
+"""
+Módulo de la cuadrícula de extensiones.
+
+Contiene el selector de extensiones de la interfaz gráfica: una lista de
+categorías plegables cuyos checkboxes solo se crean al desplegarlas. La
+selección se guarda en un conjunto, de modo que aplicar el resultado de un
+escaneo cuesta lo que el número de extensiones encontradas y no lo que el
+número de extensiones soportadas.
+"""
+
+import tkinter as tk
+from sorter.progress import format_bytes
+from sorter import strings as txt
+
+
+class ExtensionGrid:
+    """
+    Selector de extensiones agrupadas por categoría.
+
+    Cada categoría es una cabecera que muestra cuántas de sus extensiones
+    están seleccionadas; al desplegarla se crean sus checkboxes y al
+    plegarla se destruyen. Tras un escaneo se despliegan solo las
+    categorías con archivos y, si está activada la opción correspondiente,
+    solo se muestran las extensiones encontradas con su número de archivos
+    y su tamaño.
+
+    Attributes:
+        frame (tk.Frame): Contenedor del selector.
+        selected (set): Extensiones seleccionadas.
+        totals (dict): Extensiones del último escaneo con count y bytes.
+    """
+
+    def __init__(self, parent, extensions_by_category, columns=txt.MAX_COLUMNS_CHECKBOXES):
+        """
+        Crea las cabeceras de las categorías, todas plegadas.
+
+        Args:
+            parent (tk.Widget): Widget donde se coloca el selector.
+            extensions_by_category (dict): Categorías con la lista de sus extensiones.
+            columns (int, optional): Checkboxes por fila.
+        """
+        self.frame = tk.Frame(parent)
+        self.selected = set()
+        self.totals = {}
+        self.columns = columns
+        self.only_present = tk.BooleanVar(value=True)
+        self._category_of = {}
+        self._sections = {}
+
+        tk.Checkbutton(
+            self.frame,
+            text=txt.LABEL_ONLY_PRESENT,
+            variable=self.only_present,
+            command=self._refresh_expanded
+        ).pack(anchor='w', padx=5, pady=(5, 0))
+
+        for category, extensions in extensions_by_category.items():
+            self._sections[category] = _CategorySection(self, category, extensions)
+            for ext in extensions:
+                self._category_of[ext] = category
+
+    def set_scan(self, totals):
+        """
+        Aplica el resultado de un escaneo.
+
+        Selecciona las extensiones encontradas, despliega las categorías que
+        tienen alguna y pliega las demás.
+
+        Args:
+            totals (dict): Extensiones encontradas con count y bytes (por ejemplo,
+                           ``ScanSummary.extensions``).
+        """
+        self.totals = totals or {}
+        self.selected = {ext for ext in self.totals if ext in self._category_of}
+
+        present = {self._category_of[ext] for ext in self.selected}
+        for category, section in self._sections.items():
+            section.set_expanded(category in present)
+
+    def clear(self):
+        """Olvida el último escaneo, desmarca todo y pliega todas las categorías."""
+        self.totals = {}
+        self.selected = set()
+        for section in self._sections.values():
+            section.set_expanded(False)
+
+    def get_selected(self):
+        """
+        Obtiene las extensiones seleccionadas.
+
+        Returns:
+            list: Extensiones seleccionadas, ordenadas.
+        """
+        return sorted(self.selected)
+
+    def set_selected(self, extension, selected):
+        """Marca o desmarca una extensión."""
+        if selected:
+            self.selected.add(extension)
+        else:
+            self.selected.discard(extension)
+        self._sections[self._category_of[extension]].update_header()
+
+    def visible_extensions(self, extensions):
+        """
+        Filtra las extensiones de una categoría que deben mostrarse.
+
+        Returns:
+            list: Todas, o solo las encontradas en el último escaneo si la
+                  opción está activada y hay un escaneo.
+        """
+        if self.only_present.get() and self.totals:
+            return [ext for ext in extensions if ext in self.totals]
+        return extensions
+
+    def describe(self, extension):
+        """Texto del checkbox de una extensión, con sus totales si se encontró."""
+        totals = self.totals.get(extension)
+        if totals is None:
+            return extension
+        if totals.get('bytes'):
+            return txt.LABEL_EXTENSION_TOTALS.format(extension, totals['count'],
+                                                     format_bytes(totals['bytes']))
+        return txt.LABEL_EXTENSION_COUNT.format(extension, totals['count'])
+
+    def _refresh_expanded(self):
+        """Vuelve a construir las categorías desplegadas al cambiar el filtro."""
+        for section in self._sections.values():
+            if section.expanded:
+                section.build()
+            else:
+                section.update_header()
+
+
+class _CategorySection:
+    """Cabecera plegable de una categoría y, si está desplegada, sus checkboxes."""
+
+    def __init__(self, grid, category, extensions):
+        self.grid = grid
+        self.category = category
+        self.extensions = list(extensions)
+        self.expanded = False
+
+        self.header = tk.Button(
+            grid.frame,
+            anchor='w',
+            relief=tk.FLAT,
+            font=('Arial', 10, 'bold'),
+            command=self.toggle
+        )
+        self.header.pack(fill=tk.X, padx=5, pady=(6, 0))
+        self.body = tk.Frame(grid.frame)
+        self.update_header()
+
+    def toggle(self):
+        """Despliega o pliega la categoría."""
+        self.set_expanded(not self.expanded)
+
+    def set_expanded(self, expanded):
+        """Despliega la categoría creando sus checkboxes, o la pliega destruyéndolos."""
+        if expanded:
+            self.expanded = True
+            self.build()
+        else:
+            if self.expanded:
+                self.expanded = False
+                self._destroy_body()
+            self.update_header()
+
+    def build(self):
+        """Crea los checkboxes de las extensiones visibles de la categoría."""
+        self._destroy_body()
+        grid = self.grid
+        columns = grid.columns
+
+        for i, ext in enumerate(grid.visible_extensions(self.extensions)):
+            var = tk.BooleanVar(value=ext in grid.selected)
+            checkbox = tk.Checkbutton(
+                self.body,
+                text=grid.describe(ext),
+                variable=var,
+                command=lambda ext=ext, var=var: grid.set_selected(ext, var.get())
+            )
+            checkbox.grid(row=i // columns, column=i % columns, sticky='w', padx=10, pady=2)
+
+        self.body.pack(fill=tk.X, after=self.header)
+        self.update_header()
+
+    def update_header(self):
+        """Actualiza la flecha y el recuento de seleccionadas de la cabecera."""
+        selected = self.grid.selected
+        count = sum(1 for ext in self.extensions if ext in selected)
+        arrow = "▾" if self.expanded else "▸"
+        self.header.config(text=txt.LABEL_CATEGORY_HEADER.format(
+            arrow, self.category, count, len(self.extensions)))
+
+    def _destroy_body(self):
+        """Destruye los checkboxes y oculta el contenedor."""
+        for widget in self.body.winfo_children():
+            widget.destroy()
+        self.body.pack_forget()
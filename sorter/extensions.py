@@ -0,0 +1,102 @@
+"""
+Módulo de extensiones soportadas.
+
+Contiene la tabla que asocia cada extensión de archivo con su carpeta de
+categoría. Está separada de los textos de la interfaz para que la lógica
+de negocio pueda importarla sin cargarlos.
+"""
+
+# Extensiones por categoría. Se admiten sufijos compuestos (``.tar.gz``),
+# que tienen prioridad sobre su última parte. Una extensión no puede
+# aparecer en dos categorías (``ExtensionClassifier`` informa del conflicto).
+EXTENSION_GROUPS = (
+    # Imágenes
+    ('Imágenes', (
+        '.jpg', '.jpeg', '.png', '.gif', '.bmp', '.svg', '.ico', '.webp', '.tif',
+        '.tiff', '.raw', '.cr2', '.nef', '.orf', '.sr2', '.heic', '.heif', '.psd',
+        '.ai', '.eps', '.dng', '.jfif', '.avif',
+    )),
+
+    # Documentos
+    ('Documentos', (
+        '.pdf', '.doc', '.docx', '.txt', '.xls', '.xlsx', '.ppt', '.pptx', '.odt',
+        '.ods', '.odp', '.rtf', '.tex', '.wpd', '.pages', '.numbers', '.key', '.csv',
+        '.md', '.log', '.epub', '.mobi', '.azw', '.azw3',
+    )),
+
+    # Audio
+    ('Audio', (
+        '.mp3', '.wav', '.flac', '.aac', '.ogg', '.m4a', '.wma', '.opus', '.alac',
+        '.ape', '.aiff', '.aif', '.mid', '.midi', '.amr', '.weba', '.ra', '.ram',
+        '.dsf', '.dff',
+    )),
+
+    # Video (.ts se clasifica como Código: TypeScript es mucho más habitual)
+    ('Video', (
+        '.mp4', '.avi', '.mkv', '.mov', '.wmv', '.flv', '.webm', '.m4v', '.mpg',
+        '.mpeg', '.3gp', '.3g2', '.f4v', '.swf', '.vob', '.ogv', '.m2ts', '.mts',
+        '.divx',
+    )),
+
+    # Comprimidos
+    ('Comprimidos', (
+        '.zip', '.rar', '.7z', '.tar', '.gz', '.bz2', '.xz', '.tgz', '.tbz2', '.zipx',
+        '.cab', '.iso', '.dmg', '.pkg', '.deb', '.rpm', '.z', '.lz', '.zst', '.tar.gz',
+        '.tar.bz2', '.tar.xz', '.tar.zst', '.tar.lz',
+    )),
+
+    # Código - Lenguajes de programación
+    ('Código', (
+        '.py', '.js', '.java', '.cpp', '.c', '.h', '.hpp', '.cs', '.rb', '.php',
+        '.swift', '.go', '.rs', '.kt', '.scala', '.r', '.m', '.vb', '.pl', '.perl',
+        '.sh', '.bash', '.bat', '.cmd', '.ps1', '.lua', '.dart', '.f', '.f90', '.asm',
+        '.s',
+    )),
+
+    # Código - Web
+    ('Código', (
+        '.html', '.htm', '.css', '.scss', '.sass', '.less', '.jsx', '.tsx', '.ts',
+        '.vue', '.svelte', '.xml', '.xhtml', '.asp', '.aspx', '.jsp',
+    )),
+
+    # Código - Configuración y datos
+    ('Código', (
+        '.json', '.yaml', '.yml', '.toml', '.ini', '.cfg', '.conf', '.properties',
+        '.env', '.sql', '.db', '.sqlite',
+    )),
+
+    # Ejecutables y binarios
+    ('Ejecutables', (
+        '.exe', '.msi', '.app', '.apk', '.jar', '.war', '.dll', '.so', '.dylib', '.bin',
+        '.com', '.gadget',
+    )),
+
+    # Fuentes
+    ('Fuentes', (
+        '.ttf', '.otf', '.woff', '.woff2', '.eot', '.fon', '.fnt',
+    )),
+
+    # Modelos 3D y diseño
+    ('3D', (
+        '.obj', '.fbx', '.stl', '.dae', '.3ds', '.blend', '.max', '.c4d', '.ma', '.mb',
+        '.skp', '.ply',
+    )),
+
+    # Bases de datos
+    ('Bases de datos', (
+        '.sqlite3', '.mdb', '.accdb', '.frm', '.myd', '.myi',
+    )),
+
+    # Máquinas virtuales y discos
+    ('Virtualización', (
+        '.vmdk', '.vdi', '.vhd', '.vhdx', '.ova', '.ovf',
+    )),
+
+    # Otros
+    ('Otros', (
+        '.torrent', '.lnk', '.url', '.webloc', '.tmp', '.temp', '.bak', '.old',
+    )),
+)
+
+# Extensión → categoría
+EXTENSIONS = {ext: category for category, extensions in EXTENSION_GROUPS for ext in extensions}
@@ -6,10 +6,18 @@ para la aplicación de organización de archivos usando Tkinter.
 """
 
 import os
+import queue
 import tkinter as tk
 import threading
+import time
 from tkinter import ttk, filedialog, messagebox
-from sorter.core import scan_directory, sort_files, get_extensions_by_category
+from sorter.control import ControlToken, OperationCancelled
+from sorter.core import (plan_directory, sort_files, estimate_sort, summarize_directory,
+                         get_extensions_by_category)
+from sorter.estimate import ThroughputStore
+from sorter.extension_grid import ExtensionGrid
+from sorter.journal import DONE, MoveJournal, recover_all, undo_journal
+from sorter.progress import ProgressReporter, format_bytes, format_duration
 from sorter import strings as txt
 
 
@@ -32,11 +40,24 @@ class FileSorterApp:
         self._configure_window()
         
         self.path_var = tk.StringVar()
-        self.check_vars = {} 
+        self.extension_grid = None
+        self.plan = None
         self.is_sorting = False
+        self.progress_queue = queue.Queue()
+        self.sort_token = None
+        self.sort_journal = None
+        self._scan_after_id = None
+        self._scan_token = None
+        self._scan_path = None
+        self._last_scan = None
+        self.scan_index = _open_scan_index()
+        self.last_journal = None
+        self.last_stats = None
+        self.throughput = ThroughputStore()
         
         self.create_widgets()
         self.populate_checkboxes()
+        self._start_recovery()
     
     def _configure_window(self):
         """Configura las propiedades de la ventana principal."""
@@ -122,17 +143,52 @@ class FileSorterApp:
             command=self.execute_sort,
             bg=txt.COLOR_EXECUTE_BG,
             fg=txt.COLOR_EXECUTE_FG,
-            width=15
+            width=12
         )
         self.execute_btn.pack(side=tk.LEFT, padx=5)
         
+        self.preview_btn = tk.Button(
+            btn_container,
+            text=txt.BTN_PREVIEW,
+            command=self.preview_sort,
+            width=12
+        )
+        self.preview_btn.pack(side=tk.LEFT, padx=5)
+        
         self.reset_btn = tk.Button(
             btn_container,
             text=txt.BTN_RESET,
             command=self.clear_all,
-            width=15
+            width=12
         )
         self.reset_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.pause_btn = tk.Button(
+            btn_container,
+            text=txt.BTN_PAUSE,
+            command=self.toggle_pause,
+            state=tk.DISABLED,
+            width=12
+        )
+        self.pause_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.cancel_btn = tk.Button(
+            btn_container,
+            text=txt.BTN_CANCEL,
+            command=self.cancel_sort,
+            state=tk.DISABLED,
+            width=12
+        )
+        self.cancel_btn.pack(side=tk.LEFT, padx=5)
+        
+        self.undo_btn = tk.Button(
+            btn_container,
+            text=txt.BTN_UNDO,
+            command=self.undo_last_sort,
+            state=tk.DISABLED,
+            width=12
+        )
+        self.undo_btn.pack(side=tk.LEFT, padx=5)
     
     def _create_progress_section(self):
         """Crea la barra de progreso."""
@@ -141,85 +197,22 @@ class FileSorterApp:
             orient=tk.HORIZONTAL,
             mode='determinate'
         )
-        self.progress.pack(fill=tk.X, padx=20, pady=(0, 20))
-    
-    def populate_checkboxes(self):
-        """Llena el área de checkboxes con todas las extensiones disponibles."""
-        self._clear_checkboxes()
-        
-        categories_dict = get_extensions_by_category()
-        container = self._create_checkbox_container()
-        
-        current_row = 0
-        for category_name, extensions in categories_dict.items():
-            current_row = self._add_category_section(
-                container,
-                category_name,
-                extensions,
-                current_row
-            )
-    
-    def _clear_checkboxes(self):
-        """Limpia todos los checkboxes existentes."""
-        for widget in self.checkbox_frame.winfo_children():
-            widget.destroy()
-        self.check_vars.clear()
-    
-    def _create_checkbox_container(self):
-        """Crea el contenedor para los checkboxes."""
-        container = tk.Frame(self.checkbox_frame)
-        container.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, anchor='nw')
-        return container
-    
-    def _add_category_section(self, container, category_name, extensions, start_row):
-        """
-        Añade una sección de categoría con sus checkboxes.
+        self.progress.pack(fill=tk.X, padx=20)
         
-        Returns:
-            int: La siguiente fila disponible.
-        """
-        current_row = self._add_category_label(container, category_name, start_row)
-        current_row = self._add_category_checkboxes(container, extensions, current_row)
-        return current_row
-    
-    def _add_category_label(self, container, category_name, row):
-        """Añade la etiqueta de una categoría."""
-        category_label = tk.Label(
-            container,
-            text=f"{category_name}:",
-            font=('Arial', 10, 'bold')
-        )
-        category_label.grid(
-            row=row,
-            column=0,
-            columnspan=txt.MAX_COLUMNS_CHECKBOXES,
-            sticky='w',
-            padx=5,
-            pady=(10, 5)
-        )
-        return row + 1
+        self.status_label = tk.Label(self.root, anchor=tk.W)
+        self.status_label.pack(fill=tk.X, padx=20, pady=(2, 20))
     
-    def _add_category_checkboxes(self, container, extensions, start_row):
+    def populate_checkboxes(self):
         """
-        Añade los checkboxes de una categoría en cuadrícula.
+        Crea el selector de extensiones con las categorías plegadas.
         
-        Returns:
-            int: La siguiente fila disponible.
+        Los checkboxes de cada categoría se crean al desplegarla.
         """
-        max_cols = txt.MAX_COLUMNS_CHECKBOXES
-        
-        for i, ext in enumerate(extensions):
-            row = start_row + (i // max_cols)
-            col = i % max_cols
-            
-            var = tk.BooleanVar(value=False)
-            self.check_vars[ext] = var
-            
-            cb = tk.Checkbutton(container, text=ext, variable=var)
-            cb.grid(row=row, column=col, sticky='w', padx=10, pady=2)
+        if self.extension_grid is not None:
+            self.extension_grid.frame.destroy()
         
-        rows_used = (len(extensions) + max_cols - 1) // max_cols
-        return start_row + rows_used
+        self.extension_grid = ExtensionGrid(self.checkbox_frame, get_extensions_by_category())
+        self.extension_grid.frame.pack(fill=tk.BOTH, expand=True, padx=5, pady=5, anchor='nw')
     
     def _on_mousewheel(self, event):
         """Maneja el evento de scroll con la rueda del ratón."""
@@ -230,37 +223,152 @@ class FileSorterApp:
         directory = filedialog.askdirectory()
         if directory:
             self.path_var.set(directory)
-            self.scan_and_update_ui(directory)
+            self.scan_and_update_ui(directory, force=True)
     
     def on_path_change(self, event=None):
         """Maneja el evento de cambio en el campo de ruta."""
         path = self.path_var.get()
-        if os.path.isdir(path):
+        if path:
             self.scan_and_update_ui(path)
     
-    def scan_and_update_ui(self, path):
-        """Escanea el directorio y actualiza la interfaz con los resultados."""
+    def scan_and_update_ui(self, path, force=False):
+        """
+        Solicita escanear el directorio en segundo plano y actualizar la interfaz.
+        
+        La solicitud espera ``SCAN_DEBOUNCE_MS`` antes de empezar. Las solicitudes
+        repetidas para la misma ruta se ignoran y una solicitud para otra ruta
+        cancela el escaneo en curso.
+        
+        Args:
+            path (str): Directorio a escanear.
+            force (bool, optional): Escanear aunque la ruta se acabe de escanear.
+        """
+        if self.is_sorting:
+            return
+        if not force and self._is_repeated_scan(path):
+            return
+        
+        self._cancel_scan()
+        self._scan_path = path
+        self._scan_after_id = self.root.after(
+            txt.SCAN_DEBOUNCE_MS,
+            self._start_scan,
+            path
+        )
+    
+    def _is_repeated_scan(self, path):
+        """Indica si la ruta ya se está escaneando o se acaba de escanear."""
+        if self._scan_path == path:
+            return True
+        if self._last_scan is None:
+            return False
+        
+        last_path, finished_at = self._last_scan
+        elapsed_ms = (time.monotonic() - finished_at) * 1000
+        return last_path == path and elapsed_ms < txt.SCAN_REPEAT_MS
+    
+    def _cancel_scan(self):
+        """Cancela el escaneo pendiente o en curso."""
+        if self._scan_after_id is not None:
+            self.root.after_cancel(self._scan_after_id)
+            self._scan_after_id = None
+        if self._scan_token is not None:
+            self._scan_token.cancel()
+            self._scan_token = None
+            self.status_label.config(text="")
+        self._scan_path = None
+    
+    def _start_scan(self, path):
+        """Lanza el escaneo en un hilo separado."""
+        self._scan_after_id = None
+        self._scan_token = ControlToken()
+        self.status_label.config(text=txt.PROGRESS_SCANNING)
+        
+        thread = threading.Thread(
+            target=self._run_scan_thread,
+            args=(path, self._scan_token)
+        )
+        thread.daemon = True
+        thread.start()
+    
+    def _run_scan_thread(self, path, token):
+        """Ejecuta el escaneo en un hilo separado y devuelve el resultado al hilo principal."""
+        plan = None
+        error = None
+        
         try:
-            results = scan_directory(path)
-            self._update_checkboxes_from_scan(results)
-        except PermissionError:
-            self._show_permission_error(path)
+            if os.path.isdir(path):
+                if not self._index_is_current(path):
+                    self._post_scan_sample(path, token)
+                plan = plan_directory(path, token=token, index=self.scan_index)
+        except OperationCancelled:
+            return
         except OSError as e:
-            self._show_scan_error(e)
+            error = e
+        
+        self.root.after(0, lambda: self._on_scan_complete(path, token, plan, error))
     
-    def _update_checkboxes_from_scan(self, results):
-        """Actualiza los checkboxes basándose en los resultados del escaneo."""
-        self._uncheck_all()
+    def _index_is_current(self, path):
+        """
+        Indica si el índice tiene un listado válido de la raíz.
+        
+        En ese caso el plan llega enseguida y una muestra solo duplicaría el
+        recorrido del directorio.
+        """
+        if self.scan_index is None:
+            return False
+        try:
+            return self.scan_index.is_current(path, os.stat(path))
+        except Exception:
+            return False
+    
+    def _post_scan_sample(self, path, token):
+        """
+        Muestra de inmediato las extensiones de los primeros archivos.
         
-        if results:
-            for extension in results.keys():
-                if extension in self.check_vars:
-                    self.check_vars[extension].set(True)
+        En directorios grandes el plan completo tarda en llegar; mientras tanto
+        se marcan las extensiones encontradas en una muestra del listado.
+        La muestra no usa el índice, que guarda directorios completos.
+        """
+        sample = summarize_directory(
+            path,
+            token=token,
+            sizes=False,
+            max_files=txt.SCAN_SAMPLE_FILES
+        )
+        if not sample.complete:
+            self.root.after(0, lambda: self._on_scan_sample(token, sample))
+    
+    def _on_scan_sample(self, token, sample):
+        """Aplica la muestra si el escaneo sigue en curso."""
+        if token is self._scan_token and not token.cancelled:
+            self._update_checkboxes_from_scan(sample.extensions)
+    
+    def _on_scan_complete(self, path, token, plan, error):
+        """Aplica el resultado del escaneo si sigue siendo el más reciente."""
+        if token is not self._scan_token or token.cancelled:
+            return
+        
+        self._scan_token = None
+        self._scan_path = None
+        self._last_scan = (path, time.monotonic())
+        self.status_label.config(text="")
+        
+        if isinstance(error, PermissionError):
+            self._show_permission_error(path)
+        elif error is not None:
+            self._show_scan_error(error)
+        elif plan is not None:
+            self.plan = plan
+            self._update_checkboxes_from_scan(plan.totals().extensions)
+    
+    def _update_checkboxes_from_scan(self, results):
+        """Selecciona las extensiones encontradas en el escaneo y despliega sus categorías."""
+        self.extension_grid.set_scan(results)
     
     def _uncheck_all(self):
-        """Desmarca todos los checkboxes."""
-        for var in self.check_vars.values():
-            var.set(False)
+        """Desmarca todos los checkboxes y pliega las categorías."""
+        self.extension_grid.clear()
     
     def _show_permission_error(self, path):
         """Muestra error de permisos."""
@@ -286,6 +394,69 @@ class FileSorterApp:
         
         self._start_sorting(path, selected_types)
     
+    def preview_sort(self):
+        """Muestra qué haría la organización y cuánto tardaría, y ofrece ejecutarla."""
+        if not self._validate_execution():
+            return
+        
+        path = self.path_var.get()
+        selected_types = self._get_selected_extensions()
+        
+        self._cancel_scan()
+        self.sort_token = ControlToken()
+        self._set_sorting_state(True)
+        self._reset_progress()
+        self.status_label.config(text=txt.PROGRESS_ESTIMATING)
+        
+        thread = threading.Thread(
+            target=self._run_preview_thread,
+            args=(path, selected_types, self.sort_token)
+        )
+        thread.daemon = True
+        thread.start()
+    
+    def _run_preview_thread(self, path, selected_types, token):
+        """Calcula la estimación en un hilo separado."""
+        try:
+            estimate = estimate_sort(
+                path,
+                selected_types,
+                plan=self.plan,
+                token=token,
+                throughput=self.throughput
+            )
+        except OperationCancelled:
+            self._on_sort_cancelled(path)
+            return
+        except Exception as e:
+            self._on_sort_error(path, txt.ERROR_SCAN_FAILED.format(str(e)))
+            return
+        
+        self.root.after(0, lambda: self._on_preview_complete(path, selected_types, estimate))
+    
+    def _on_preview_complete(self, path, selected_types, estimate):
+        """Muestra la estimación y, si el usuario confirma, inicia la organización."""
+        self.sort_token = None
+        self._set_sorting_state(False)
+        self.status_label.config(text="")
+        
+        categories = "\n".join(
+            txt.PREVIEW_CATEGORY.format(category, totals['count'], format_bytes(totals['bytes']))
+            for category, totals in estimate.categories.items()
+        )
+        message = txt.PREVIEW_SUMMARY.format(
+            categories,
+            estimate.same_device['count'],
+            estimate.cross_device['count'],
+            format_bytes(estimate.cross_device['bytes']),
+            len(estimate.renamed),
+            format_duration(estimate.seconds),
+            "" if estimate.measured else txt.PREVIEW_GUESSED
+        )
+        
+        if messagebox.askyesno(txt.PREVIEW_TITLE, message):
+            self._start_sorting(path, selected_types)
+    
     def _validate_execution(self):
         """
         Valida que se puede ejecutar la organización.
@@ -310,32 +481,74 @@ class FileSorterApp:
     
     def _get_selected_extensions(self):
         """Obtiene las extensiones seleccionadas."""
-        return [name for name, var in self.check_vars.items() if var.get()]
+        return self.extension_grid.get_selected()
     
     def _start_sorting(self, path, selected_types):
         """Inicia el proceso de organización en un hilo separado."""
+        self._cancel_scan()
+        self.sort_token = ControlToken()
+        self.sort_journal = _open_journal(path)
         self._set_sorting_state(True)
+        self._reset_progress()
         
         thread = threading.Thread(
             target=self._run_sort_thread,
-            args=(path, selected_types)
+            args=(path, selected_types, self.sort_token)
         )
         thread.daemon = True
         thread.start()
+        
+        self.root.after(txt.PROGRESS_POLL_MS, self._poll_progress)
     
     def _set_sorting_state(self, is_sorting):
         """Establece el estado de ordenación y actualiza la UI."""
         self.is_sorting = is_sorting
         state = tk.DISABLED if is_sorting else tk.NORMAL
+        control_state = tk.NORMAL if is_sorting else tk.DISABLED
         self.execute_btn.config(state=state)
+        self.preview_btn.config(state=state)
         self.reset_btn.config(state=state)
-    
-    def _run_sort_thread(self, path, selected_types):
+        self.pause_btn.config(state=control_state, text=txt.BTN_PAUSE)
+        self.cancel_btn.config(state=control_state)
+        undo_state = tk.NORMAL if self.last_journal and not is_sorting else tk.DISABLED
+        self.undo_btn.config(state=undo_state)
+    
+    def toggle_pause(self):
+        """Pausa o reanuda la organización en curso."""
+        if self.sort_token is None:
+            return
+        
+        if self.sort_token.paused:
+            self.sort_token.resume()
+            self.pause_btn.config(text=txt.BTN_PAUSE)
+            self.status_label.config(text="")
+        else:
+            self.sort_token.pause()
+            self.pause_btn.config(text=txt.BTN_RESUME)
+            self.status_label.config(text=txt.PROGRESS_PAUSED)
+    
+    def cancel_sort(self):
+        """Cancela la organización en curso tras el archivo o bloque actual."""
+        if self.sort_token is not None:
+            self.sort_token.cancel()
+            self.pause_btn.config(state=tk.DISABLED)
+            self.cancel_btn.config(state=tk.DISABLED)
+    
+    def _run_sort_thread(self, path, selected_types, token):
         """Ejecuta la lógica de ordenación en un hilo separado."""
         try:
-            self._reset_progress()
-            sort_files(path, selected_types, progress_callback=self._update_progress)
+            self.last_stats = sort_files(
+                path,
+                selected_types,
+                plan=self.plan,
+                reporter=ProgressReporter(self.progress_queue.put),
+                token=token,
+                journal=self.sort_journal,
+                throughput=self.throughput
+            )
             self._on_sort_success(path)
+        except OperationCancelled:
+            self._on_sort_cancelled(path)
         except PermissionError:
             self._on_sort_error(path, txt.ERROR_PERMISSION_DENIED.format(path))
         except OSError as e:
@@ -343,15 +556,135 @@ class FileSorterApp:
         except Exception as e:
             self._on_sort_error(path, txt.ERROR_ORGANIZING.format(str(e)))
     
+    def _close_journal(self):
+        """Cierra el diario de la organización y lo guarda para poder deshacerla."""
+        journal, self.sort_journal = self.sort_journal, None
+        if journal is None:
+            return
+        try:
+            journal.close()
+        except OSError:
+            pass
+        if not journal.empty:
+            self.last_journal = journal.path
+    
+    def _save_throughput(self):
+        """Guarda las velocidades medidas para las próximas estimaciones."""
+        try:
+            self.throughput.save()
+        except OSError:
+            pass
+    
+    def undo_last_sort(self):
+        """Devuelve a su sitio los archivos movidos en la última organización."""
+        if self.is_sorting or not self.last_journal:
+            return
+        
+        path = self.path_var.get()
+        journal_path, self.last_journal = self.last_journal, None
+        self._cancel_scan()
+        self.sort_token = ControlToken()
+        self._set_sorting_state(True)
+        self._reset_progress()
+        self.status_label.config(text=txt.PROGRESS_UNDOING)
+        
+        thread = threading.Thread(
+            target=self._run_undo_thread,
+            args=(path, journal_path, self.sort_token)
+        )
+        thread.daemon = True
+        thread.start()
+    
+    def _run_undo_thread(self, path, journal_path, token):
+        """Deshace un diario en un hilo separado."""
+        try:
+            undone, errors = undo_journal(journal_path, token=token)
+        except OperationCancelled:
+            self.last_journal = journal_path
+            self._on_sort_cancelled(path)
+            return
+        except Exception as e:
+            self.last_journal = journal_path
+            self._on_sort_error(path, txt.ERROR_ORGANIZING.format(str(e)))
+            return
+        
+        self.root.after(0, lambda: self._on_undo_complete(path, undone, errors))
+    
+    def _on_undo_complete(self, path, undone, errors):
+        """Muestra el resultado de deshacer y vuelve a escanear el directorio."""
+        self.sort_token = None
+        self._set_sorting_state(False)
+        self.plan = None
+        
+        if errors:
+            details = "\n".join(f"{f}: {msg}" for f, msg in errors[:10])
+            messagebox.showerror(txt.ERROR_TITLE, txt.ERROR_UNDO_FAILED.format(len(errors), details))
+        else:
+            messagebox.showinfo(txt.SUCCESS_TITLE, txt.SUCCESS_UNDONE.format(len(undone)))
+        self.status_label.config(text="")
+        
+        if path and os.path.isdir(path):
+            self.scan_and_update_ui(path, force=True)
+    
+    def _start_recovery(self):
+        """Recupera en segundo plano las organizaciones que quedaron a medias."""
+        thread = threading.Thread(target=self._run_recovery_thread)
+        thread.daemon = True
+        thread.start()
+    
+    def _run_recovery_thread(self):
+        """Recupera los diarios interrumpidos e informa en la barra de estado."""
+        try:
+            recovered = recover_all()
+        except Exception:
+            return
+        
+        outcomes = [outcome for results in recovered.values() for _, outcome in results]
+        if outcomes:
+            completed = outcomes.count(DONE)
+            message = txt.PROGRESS_RECOVERED.format(completed, len(outcomes) - completed)
+            self.root.after(0, lambda: self.status_label.config(text=message))
+    
     def _reset_progress(self):
         """Resetea la barra de progreso."""
-        self.root.after(0, lambda: self.progress.configure(value=0))
+        self._drain_progress_queue()
+        self.progress.configure(value=0)
+        self.status_label.config(text="")
+    
+    def _poll_progress(self):
+        """Consulta periódicamente la cola de progreso desde el bucle de Tkinter."""
+        snapshot = self._drain_progress_queue()
+        if snapshot is not None:
+            self._update_progress(snapshot)
+        
+        if self.is_sorting:
+            self.root.after(txt.PROGRESS_POLL_MS, self._poll_progress)
     
-    def _update_progress(self, current, total):
-        """Actualiza la barra de progreso."""
-        if total > 0:
-            progress_val = (current / total) * 100
-            self.root.after(0, lambda: self.progress.configure(value=progress_val))
+    def _drain_progress_queue(self):
+        """
+        Vacía la cola de progreso.
+        
+        Returns:
+            ProgressSnapshot: El estado más reciente, o None si la cola estaba vacía.
+        """
+        snapshot = None
+        while True:
+            try:
+                snapshot = self.progress_queue.get_nowait()
+            except queue.Empty:
+                return snapshot
+    
+    def _update_progress(self, snapshot):
+        """Actualiza la barra de progreso y el detalle de archivos, bytes y tiempo."""
+        self.progress.configure(value=snapshot.fraction * 100)
+        self.status_label.config(text=txt.PROGRESS_DETAIL.format(
+            snapshot.files_done,
+            snapshot.files_total,
+            format_bytes(snapshot.bytes_done),
+            format_bytes(snapshot.bytes_total),
+            format_bytes(snapshot.throughput),
+            format_duration(snapshot.eta)
+        ))
     
     def _get_error_message(self, error):
         """Obtiene el mensaje de error apropiado."""
@@ -372,21 +705,45 @@ class FileSorterApp:
         """Maneja el error de la organización."""
         self.root.after(0, lambda: self._on_sort_complete(False, path, error_message))
     
-    def _on_sort_complete(self, success, path, error_message=None):
+    def _on_sort_cancelled(self, path):
+        """Maneja la cancelación de la organización."""
+        self.root.after(0, lambda: self._on_sort_complete(False, path, cancelled=True))
+    
+    def _on_sort_complete(self, success, path, error_message=None, cancelled=False):
         """Maneja la finalización del proceso de ordenación en el hilo principal."""
+        self.sort_token = None
+        self._close_journal()
+        self._save_throughput()
         self._set_sorting_state(False)
         
-        if success:
+        snapshot = self._drain_progress_queue()
+        if snapshot is not None:
+            self._update_progress(snapshot)
+        
+        if cancelled:
+            self.status_label.config(text=txt.PROGRESS_CANCELLED)
+        elif success:
             self._show_success()
         else:
             self._show_error(error_message)
         
-        self.scan_and_update_ui(path)
+        self._refresh_from_plan(path)
+    
+    def _refresh_from_plan(self, path):
+        """Actualiza los checkboxes con el plan restante sin volver a escanear."""
+        if self.plan is not None and self.plan.matches(path):
+            self._update_checkboxes_from_scan(self.plan.totals().extensions)
+        else:
+            self.scan_and_update_ui(path, force=True)
     
     def _show_success(self):
         """Muestra mensaje de éxito."""
         self.progress['value'] = 100
-        messagebox.showinfo(txt.SUCCESS_TITLE, txt.SUCCESS_ORGANIZED)
+        if self.last_stats is not None:
+            message = txt.SUCCESS_ORGANIZED_COUNT.format(self.last_stats.moved)
+        else:
+            message = txt.SUCCESS_ORGANIZED
+        messagebox.showinfo(txt.SUCCESS_TITLE, message)
     
     def _show_error(self, error_message):
         """Muestra mensaje de error."""
@@ -395,5 +752,24 @@ class FileSorterApp:
     
     def clear_all(self):
         """Limpia la ruta y desmarca todos los checkboxes."""
+        self._cancel_scan()
         self.path_var.set("")
-        self._uncheck_all()
\ No newline at end of file
+        self.plan = None
+        self._uncheck_all()
+
+
+def _open_journal(path):
+    """Abre un diario para la organización, o devuelve None si no puede crearse."""
+    try:
+        return MoveJournal(root=path)
+    except OSError:
+        return None
+
+
+def _open_scan_index():
+    """Abre el índice persistente de escaneos, o devuelve None si no está disponible."""
+    try:
+        from sorter.scan_index import ScanIndex
+        return ScanIndex()
+    except Exception:
+        return None
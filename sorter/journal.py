@@ -0,0 +1,778 @@
+"""
+Módulo del diario de movimientos.
+
+Contiene el diario de escritura anticipada que registra cada movimiento
+(origen, destino, tamaño y mtime) y cada duplicado borrado o sustituido por
+un enlace duro antes de realizarlo, la operación que
+deshace una organización recorriendo el diario al revés y la recuperación
+que, al arrancar, completa o deshace los movimientos que quedaron a medias
+si el proceso terminó de forma abrupta.
+"""
+
+import itertools
+import json
+import os
+import shutil
+try:
+    import fcntl
+    msvcrt = None
+except ImportError:  # Windows
+    fcntl = None
+    try:
+        import msvcrt
+    except ImportError:
+        msvcrt = None
+import threading
+import time
+from sorter.control import check_token
+from sorter.engine import move_without_overwrite
+
+DEFAULT_UNDO_WORKERS = 4
+
+# Los diarios cerrados se eliminan al arrancar cuando llevan este tiempo sin cambios
+DEFAULT_RETENTION_SECONDS = 30 * 24 * 3600
+
+# Registros de un diario (uno por línea, en JSON)
+_OP_BEGIN = "begin"
+_OP_MOVE = "move"
+_OP_DEDUP = "dedup"
+_OP_FOLDER = "mkdir"
+_OP_DONE = "done"
+_OP_ABORT = "abort"
+_OP_UNDONE = "undone"
+_OP_END = "end"
+
+# Acciones de ``sorter.dedup`` que el diario sabe deshacer
+_DEDUP_DELETE = "delete"
+_DEDUP_HARDLINK = "hardlink"
+
+# Estados de un movimiento
+PENDING = "pending"
+DONE = "done"
+ABORTED = "aborted"
+UNDONE = "undone"
+
+_PENDING_PER_WORKER = 4
+
+# Bytes del final de un diario que se leen para saber si está cerrado
+_TAIL_BYTES = 4096
+
+# Byte que se bloquea con ``msvcrt``: muy por encima de los datos, para no
+# impedir que otros procesos lean el diario
+_MSVCRT_LOCK_OFFSET = 0x7FFFFFFF
+
+# Distingue los diarios que un mismo proceso abre a la vez (organización por lotes)
+_JOURNAL_SEQUENCE = itertools.count()
+
+
+class MoveJournal:
+    """
+    Diario de movimientos con confirmación agrupada.
+
+    Un movimiento se registra y se lleva a disco (``fsync``) antes de hacerse;
+    las confirmaciones de movimientos terminados o descartados se escriben
+    con la siguiente sincronización. Cuando varios hilos registran a la vez,
+    el primero que llega escribe y sincroniza los registros de todos con un
+    único ``fsync`` mientras los demás esperan; además, ``record_moves``
+    registra un lote completo con una sola sincronización.
+    """
+
+    def __init__(self, path=None, root=None):
+        """
+        Crea un diario nuevo.
+
+        Args:
+            path (str, optional): Archivo del diario. Por defecto, uno nuevo en
+                                  ``default_journal_dir()``.
+            root (str, optional): Directorio que se organiza, como referencia.
+
+        Raises:
+            OSError: Si no puede crearse el archivo.
+        """
+        self.path = path or new_journal_path()
+        os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self._file = open(self.path, "a", encoding="utf-8")
+        _try_lock(self._file)
+        self._condition = threading.Condition()
+        self._buffer = []
+        self._next_id = 1
+        self._written = 0
+        self._synced = 0
+        self._flushing = False
+        self._error = None
+        self._closed = False
+
+        self._append({"op": _OP_BEGIN, "root": root and os.path.abspath(root), "time": time.time()})
+        self.sync()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def record_move(self, source, target, size, mtime_ns, cross_device):
+        """
+        Registra un movimiento y espera a que esté en disco.
+
+        Returns:
+            int: Identificador del movimiento en el diario.
+
+        Raises:
+            OSError: Si el diario no puede escribirse.
+        """
+        return self.record_moves([(source, target, size, mtime_ns, cross_device)])[0]
+
+    def record_moves(self, moves):
+        """
+        Registra varios movimientos con una sola sincronización.
+
+        Args:
+            moves (list): Tuplas (source, target, size, mtime_ns, cross_device).
+
+        Returns:
+            list: Identificadores de los movimientos, en el mismo orden.
+
+        Raises:
+            OSError: Si el diario no puede escribirse.
+        """
+        if not moves:
+            return []
+
+        with self._condition:
+            ids = []
+            for source, target, size, mtime_ns, cross_device in moves:
+                ids.append(self._next_id)
+                self._append({
+                    "op": _OP_MOVE, "id": self._next_id,
+                    "src": os.path.abspath(source), "dst": os.path.abspath(target),
+                    "size": size, "mtime_ns": mtime_ns, "cross": bool(cross_device),
+                })
+                self._next_id += 1
+            sequence = self._written
+
+        self._wait_synced(sequence)
+        return ids
+
+    def record_dedups(self, dedups):
+        """
+        Registra varias acciones sobre duplicados con una sola sincronización.
+
+        No se guarda una copia del duplicado: era idéntico al original, así que
+        deshacer la acción vuelve a copiar el original en su ruta.
+
+        Args:
+            dedups (list): Tuplas (action, source, original, size, mtime_ns,
+                           original_mtime_ns, temporary), con ``temporary`` la
+                           ruta del enlace temporal que crea ``"hardlink"`` (o None).
+
+        Returns:
+            list: Identificadores de las acciones, en el mismo orden. Se confirman
+                  con ``mark_done`` o ``mark_aborted``.
+
+        Raises:
+            OSError: Si el diario no puede escribirse.
+        """
+        if not dedups:
+            return []
+
+        with self._condition:
+            ids = []
+            for action, source, original, size, mtime_ns, original_mtime_ns, temporary in dedups:
+                ids.append(self._next_id)
+                self._append({
+                    "op": _OP_DEDUP, "id": self._next_id, "action": action,
+                    "src": os.path.abspath(source), "original": os.path.abspath(original),
+                    "size": size, "mtime_ns": mtime_ns, "original_mtime_ns": original_mtime_ns,
+                    "tmp": temporary and os.path.abspath(temporary),
+                })
+                self._next_id += 1
+            sequence = self._written
+
+        self._wait_synced(sequence)
+        return ids
+
+    def record_folders(self, folders):
+        """
+        Anota las carpetas de destino que crea la organización.
+
+        Se escriben con la siguiente sincronización, antes que los movimientos
+        hacia ellas. Al deshacer solo se eliminan estas carpetas, si quedan vacías.
+
+        Args:
+            folders (list): Carpetas creadas, de la más externa a la más interna.
+        """
+        with self._condition:
+            for folder in folders:
+                self._append({"op": _OP_FOLDER, "path": os.path.abspath(folder)})
+
+    def mark_done(self, move_id):
+        """Confirma un movimiento terminado (se escribe con la siguiente sincronización)."""
+        with self._condition:
+            self._append({"op": _OP_DONE, "id": move_id})
+
+    def mark_aborted(self, move_id, sync=False):
+        """
+        Descarta un movimiento que no llegó a hacerse.
+
+        Args:
+            move_id (int): Identificador del movimiento.
+            sync (bool, optional): Esperar a que el descarte esté en disco. Hace
+                                   falta si el destino registrado pertenece a otro
+                                   archivo, para que la recuperación no lo toque.
+        """
+        with self._condition:
+            self._append({"op": _OP_ABORT, "id": move_id})
+            sequence = self._written
+        if sync:
+            self._wait_synced(sequence)
+
+    def sync(self):
+        """Lleva a disco todos los registros pendientes."""
+        with self._condition:
+            sequence = self._written
+        self._wait_synced(sequence)
+
+    @property
+    def empty(self):
+        """bool: True si no se ha registrado ningún movimiento ni duplicado."""
+        return self._next_id == 1
+
+    def close(self):
+        """
+        Marca el diario como terminado y lo cierra.
+
+        Un diario sin movimientos se elimina: no hay nada que deshacer.
+        """
+        if self._closed:
+            return
+        with self._condition:
+            self._append({"op": _OP_END})
+        try:
+            self.sync()
+        finally:
+            self._closed = True
+            self._file.close()
+        if self.empty:
+            try:
+                os.unlink(self.path)
+            except OSError:
+                pass
+
+    def _append(self, record):
+        """Añade un registro al búfer. Debe llamarse con ``_condition`` adquirido."""
+        self._buffer.append(json.dumps(record, ensure_ascii=False) + "\n")
+        self._written += 1
+
+    def _wait_synced(self, sequence):
+        """Espera a que los registros hasta ``sequence`` estén en disco, sincronizando si hace falta."""
+        while True:
+            with self._condition:
+                if self._error is not None:
+                    raise OSError(f"No se pudo escribir el diario: {self._error}")
+                if self._synced >= sequence:
+                    return
+                if self._flushing:
+                    self._condition.wait()
+                    continue
+                self._flushing = True
+                lines, self._buffer = self._buffer, []
+                upto = self._written
+
+            error = None
+            try:
+                self._file.write("".join(lines))
+                self._file.flush()
+                os.fsync(self._file.fileno())
+            except OSError as e:
+                error = e
+
+            with self._condition:
+                self._flushing = False
+                if error is None:
+                    self._synced = upto
+                else:
+                    self._error = error
+                self._condition.notify_all()
+
+
+class JournalState:
+    """
+    Contenido de un diario leído de disco.
+
+    Attributes:
+        path (str): Archivo del diario.
+        root (str): Directorio que se organizó, si se conoce.
+        started (float): Marca de tiempo del inicio.
+        finished (bool): True si el diario se cerró correctamente.
+        moves (list): Movimientos en orden, como diccionarios con id, src,
+                      dst, size, mtime_ns, cross y state.
+        dedups (list): Acciones sobre duplicados en orden, como diccionarios con
+                       id, action, src, original, size, mtime_ns,
+                       original_mtime_ns, tmp y state.
+        folders (list): Carpetas creadas por la organización, en orden de creación.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.root = None
+        self.started = None
+        self.finished = False
+        self.moves = []
+        self.dedups = []
+        self.folders = []
+
+    def completed(self):
+        """
+        Movimientos terminados y no deshechos.
+
+        Returns:
+            list: Movimientos en estado ``DONE``.
+        """
+        return [move for move in self.moves if move["state"] == DONE]
+
+    def pending(self):
+        """
+        Movimientos registrados sin confirmación ni descarte.
+
+        Returns:
+            list: Movimientos en estado ``PENDING``.
+        """
+        return [move for move in self.moves if move["state"] == PENDING]
+
+
+def read_journal(path):
+    """
+    Lee un diario.
+
+    Las líneas incompletas o ilegibles (por ejemplo, la última si el proceso
+    terminó mientras se escribía) se ignoran.
+
+    Args:
+        path (str): Archivo del diario.
+
+    Returns:
+        JournalState: Estado de cada movimiento registrado.
+
+    Raises:
+        OSError: Si no puede leerse el archivo.
+    """
+    state = JournalState(path)
+    moves = {}
+    transitions = {_OP_DONE: DONE, _OP_ABORT: ABORTED, _OP_UNDONE: UNDONE}
+
+    with open(path, encoding="utf-8") as file:
+        for line in file:
+            try:
+                record = json.loads(line)
+                op = record["op"]
+            except (ValueError, KeyError, TypeError):
+                continue
+
+            if op == _OP_BEGIN:
+                state.root = record.get("root")
+                state.started = record.get("time")
+            elif op in (_OP_MOVE, _OP_DEDUP):
+                move = dict(record, state=PENDING)
+                del move["op"]
+                moves[move["id"]] = move
+                (state.moves if op == _OP_MOVE else state.dedups).append(move)
+            elif op == _OP_FOLDER and record.get("path"):
+                state.folders.append(record["path"])
+            elif op in transitions and record.get("id") in moves:
+                moves[record["id"]]["state"] = transitions[op]
+            elif op == _OP_END:
+                state.finished = True
+
+    return state
+
+
+def recover_journal(path):
+    """
+    Completa o deshace los movimientos que quedaron a medias en un diario.
+
+    Para cada movimiento sin confirmar se mira qué hay en disco:
+
+    - Si solo existe el origen, el movimiento no llegó a hacerse.
+    - Si solo existe el destino, el movimiento se hizo.
+    - Si existen los dos y son el mismo archivo (enlace sin borrar el origen),
+      o el destino es una copia terminada (mismo tamaño y mtime que el origen
+      registrado), se completa borrando el origen.
+    - Si el destino es una copia a medias o una reserva vacía, se borra.
+
+    Si el origen ha cambiado desde que se registró el movimiento, o el destino
+    no parece obra del movimiento, ambos se dejan como están. Las acciones
+    sobre duplicados se dan por hechas si el duplicado ya no existe (borrado)
+    o ya es un enlace al original, y se borra su enlace temporal.
+
+    Args:
+        path (str): Archivo del diario.
+
+    Returns:
+        list: Tuplas (move, outcome) con outcome ``DONE`` (completado) o
+              ``ABORTED`` (deshecho) para cada movimiento sin confirmar.
+
+    Raises:
+        OSError: Si no puede leerse o escribirse el diario.
+    """
+    state = read_journal(path)
+    outcomes = []
+
+    for move in state.pending():
+        try:
+            outcome = _recover_move(move)
+        except OSError:
+            continue
+        if outcome is not None:
+            outcomes.append((move, outcome))
+
+    for dedup in state.dedups:
+        if dedup["state"] == PENDING:
+            outcomes.append((dedup, _recover_dedup(dedup)))
+
+    records = [{"op": _OP_DONE if outcome == DONE else _OP_ABORT, "id": move["id"]}
+               for move, outcome in outcomes]
+    # El diario debe terminar en ``end`` para que ``recover_all`` lo reconozca como cerrado
+    if records or not state.finished:
+        records.append({"op": _OP_END})
+    _append_records(path, records)
+    return outcomes
+
+
+def recover_all(directory=None, retention=DEFAULT_RETENTION_SECONDS):
+    """
+    Recupera todos los diarios que no se cerraron correctamente y elimina los antiguos.
+
+    Un diario cerrado termina en un registro ``end``, así que basta leer su
+    final para descartarlo sin leerlo entero ni bloquearlo. Los demás solo se
+    recuperan si pueden bloquearse: si el sistema no permite bloquear
+    archivos, no se recupera ninguno, porque podría pertenecer a una
+    organización en curso en otro proceso.
+
+    Args:
+        directory (str, optional): Carpeta de los diarios. Por defecto,
+                                   ``default_journal_dir()``.
+        retention (float, optional): Segundos sin cambios tras los que se elimina
+                                     un diario cerrado; su organización ya no
+                                     podrá deshacerse. Con None se conservan todos.
+
+    Returns:
+        dict: Ruta de cada diario recuperado con la lista de ``recover_journal``.
+    """
+    recovered = {}
+    now = time.time()
+    for path in list_journals(directory):
+        try:
+            if _ends_closed(path):
+                if retention is not None and now - os.path.getmtime(path) > retention:
+                    os.unlink(path)
+                continue
+            with open(path, "a", encoding="utf-8") as file:
+                # Los diarios bloqueados pertenecen a una organización en curso
+                if not _try_lock(file):
+                    continue
+                if read_journal(path).finished:
+                    # Registros añadidos tras el cierre: se cierra de nuevo para no releerlo
+                    _append_records(path, [{"op": _OP_END}])
+                else:
+                    recovered[path] = recover_journal(path)
+        except OSError:
+            continue
+    return recovered
+
+
+def undo_journal(path, workers=DEFAULT_UNDO_WORKERS, token=None):
+    """
+    Deshace los movimientos de un diario, del último al primero.
+
+    Cada archivo vuelve a su ruta original sin sobrescribir nada; las
+    carpetas que creó la organización y quedan vacías se eliminan. Los
+    duplicados borrados se vuelven a crear copiando su original, y los
+    sustituidos por un enlace duro vuelven a ser un archivo independiente,
+    siempre que el original no haya cambiado. Los movimientos deshechos se
+    anotan en el diario, de modo que una operación interrumpida puede
+    repetirse sin volver a mover los ya restaurados.
+
+    Args:
+        path (str): Archivo del diario.
+        workers (int, optional): Archivos que se restauran a la vez.
+        token (ControlToken, optional): Testigo para pausar o cancelar.
+
+    Returns:
+        tuple: (undone, errors) con los movimientos deshechos y las tuplas
+               (filename, error_message) de los que no pudieron deshacerse.
+
+    Raises:
+        OSError: Si no puede leerse o escribirse el diario.
+        OperationCancelled: Si se cancela mediante ``token``.
+    """
+    recover_journal(path)
+    state = read_journal(path)
+    moves = list(reversed(state.completed()))
+    undone = []
+    errors = []
+
+    # Los duplicados se tratan todos antes (enlaces) o después (borrados) de los
+    # movimientos, y se deshacen en el orden contrario
+    last_move = max((move["id"] for move in state.moves), default=0)
+    dedups = [dedup for dedup in reversed(state.dedups) if dedup["state"] == DONE]
+    after_moves = [dedup for dedup in dedups if dedup["id"] > last_move]
+    before_moves = [dedup for dedup in dedups if dedup["id"] < last_move]
+
+    def undo_dedups(entries):
+        for dedup in entries:
+            check_token(token)
+            try:
+                _undo_dedup(dedup)
+            except OSError as e:
+                errors.append((dedup["src"], str(e)))
+            else:
+                undone.append(dedup)
+
+    # concurrent.futures arrastra logging: se importa solo al deshacer
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+    limit = max(1, workers) * _PENDING_PER_WORKER
+    pending = {}
+
+    def collect(done):
+        for future in done:
+            move = pending.pop(future)
+            error = future.exception()
+            if error is None:
+                undone.append(move)
+            elif isinstance(error, OSError):
+                errors.append((move["dst"], str(error)))
+            else:
+                raise error
+
+    try:
+        undo_dedups(after_moves)
+        with ThreadPoolExecutor(max_workers=max(1, workers)) as executor:
+            for move in moves:
+                check_token(token)
+                if len(pending) >= limit:
+                    collect(wait(pending, return_when=FIRST_COMPLETED)[0])
+                pending[executor.submit(_undo_move, move, token)] = move
+            while pending:
+                collect(wait(pending, return_when=FIRST_COMPLETED)[0])
+        undo_dedups(before_moves)
+    finally:
+        records = [{"op": _OP_UNDONE, "id": move["id"]} for move in undone]
+        _append_records(path, records + [{"op": _OP_END}] if records else [])
+        _remove_empty_folders(state.root, state.folders)
+
+    return undone, errors
+
+
+def list_journals(directory=None):
+    """
+    Lista los diarios de una carpeta, del más antiguo al más reciente.
+
+    Returns:
+        list: Rutas de los diarios.
+    """
+    directory = directory or default_journal_dir()
+    try:
+        names = sorted(name for name in os.listdir(directory) if name.endswith(".jsonl"))
+    except FileNotFoundError:
+        return []
+    return [os.path.join(directory, name) for name in names]
+
+
+def default_journal_dir():
+    """
+    Obtiene la carpeta por defecto de los diarios, junto al índice de escaneos.
+
+    Returns:
+        str: Ruta de la carpeta.
+    """
+    from sorter.scan_index import default_index_path
+    return os.path.join(os.path.dirname(default_index_path()), "journals")
+
+
+def new_journal_path(directory=None):
+    """
+    Genera la ruta de un diario nuevo.
+
+    Returns:
+        str: Ruta con la fecha, el proceso y un número de secuencia, que ordena
+             los diarios por antigüedad.
+    """
+    name = (time.strftime("%Y%m%d-%H%M%S") + f"-{time.time_ns() % 10**9:09d}-{os.getpid()}"
+            f"-{next(_JOURNAL_SEQUENCE)}.jsonl")
+    return os.path.join(directory or default_journal_dir(), name)
+
+
+def _recover_move(move):
+    """Decide y aplica la recuperación de un movimiento sin confirmar."""
+    source, target = move["src"], move["dst"]
+    source_stat = _lstat_or_none(source)
+    target_stat = _lstat_or_none(target)
+
+    if target_stat is None:
+        return ABORTED
+    if source_stat is None:
+        return DONE
+
+    if os.path.samestat(source_stat, target_stat):
+        os.unlink(source)
+        return DONE
+
+    # Si el origen ha cambiado desde que se registró, no se toca nada
+    recorded = (move["size"], move["mtime_ns"])
+    if (source_stat.st_size, source_stat.st_mtime_ns) != recorded:
+        return None
+
+    # La copia termina copiando el mtime: si coincide, solo faltaba borrar el origen
+    if (target_stat.st_size, target_stat.st_mtime_ns) == recorded:
+        os.unlink(source)
+        return DONE
+
+    # Copia a medias o reserva vacía
+    if target_stat.st_size < move["size"]:
+        os.unlink(target)
+        return ABORTED
+
+    return None
+
+
+def _recover_dedup(dedup):
+    """Decide la recuperación de una acción sobre un duplicado sin confirmar."""
+    if dedup.get("tmp"):
+        try:
+            os.unlink(dedup["tmp"])
+        except OSError:
+            pass
+
+    source_stat = _lstat_or_none(dedup["src"])
+    if dedup["action"] == _DEDUP_DELETE:
+        return DONE if source_stat is None else ABORTED
+    original_stat = _lstat_or_none(dedup["original"])
+    if source_stat is not None and original_stat is not None \
+            and os.path.samestat(source_stat, original_stat):
+        return DONE
+    return ABORTED
+
+
+def _undo_dedup(dedup):
+    """Vuelve a crear un duplicado borrado o separa del original uno enlazado."""
+    source, original = dedup["src"], dedup["original"]
+    original_stat = os.stat(original)
+    if dedup["action"] == _DEDUP_HARDLINK:
+        # Si ya no comparte inodo con el original, no queda nada que separar
+        if not os.path.samestat(os.lstat(source), original_stat):
+            return
+    if (original_stat.st_size, original_stat.st_mtime_ns) != \
+            (dedup["size"], dedup["original_mtime_ns"]):
+        raise OSError(f"El original ha cambiado; no puede restaurarse el duplicado: {original}")
+
+    temporary = f"{source}.{os.getpid()}.{threading.get_ident()}.undo"
+    try:
+        shutil.copyfile(original, temporary)
+        shutil.copymode(original, temporary)
+        os.utime(temporary, ns=(dedup["mtime_ns"], dedup["mtime_ns"]))
+        if dedup["action"] == _DEDUP_HARDLINK:
+            os.replace(temporary, source)
+        else:
+            os.makedirs(os.path.dirname(source), exist_ok=True)
+            move_without_overwrite(temporary, source)
+    except BaseException:
+        try:
+            os.unlink(temporary)
+        except OSError:
+            pass
+        raise
+
+
+def _undo_move(move, token):
+    """Devuelve un archivo a su ruta original."""
+    check_token(token)
+    os.makedirs(os.path.dirname(move["src"]), exist_ok=True)
+    move_without_overwrite(move["dst"], move["src"], lambda amount: check_token(token))
+
+
+def _append_records(path, records):
+    """Añade registros a un diario existente y los lleva a disco."""
+    if not records:
+        return
+    text = "".join(json.dumps(record, ensure_ascii=False) + "\n" for record in records)
+    with open(path, "ab+") as file:
+        # Una última línea incompleta (proceso interrumpido) no debe absorber los registros
+        if file.tell() > 0:
+            file.seek(-1, os.SEEK_END)
+            if file.read(1) != b"\n":
+                text = "\n" + text
+        file.write(text.encode("utf-8"))
+        file.flush()
+        os.fsync(file.fileno())
+
+
+def _ends_closed(path):
+    """Comprueba, leyendo solo el final del archivo, si la última línea de un diario es ``end``."""
+    with open(path, "rb") as file:
+        file.seek(0, os.SEEK_END)
+        file.seek(max(0, file.tell() - _TAIL_BYTES))
+        last_line = file.read().rstrip(b"\n").rpartition(b"\n")[2]
+    try:
+        return json.loads(last_line).get("op") == _OP_END
+    except (ValueError, AttributeError):
+        return False
+
+
+def _remove_empty_folders(root, folders):
+    """
+    Elimina, de la más interna a la más externa, las carpetas creadas que hayan quedado vacías.
+
+    Nunca se sale de ``root``: ni la raíz ni lo que haya por encima se eliminan.
+    """
+    if not root:
+        return
+    root = os.path.abspath(root)
+    for folder in reversed(folders):
+        folder = os.path.abspath(folder)
+        try:
+            if folder != root and os.path.commonpath([root, folder]) == root:
+                os.rmdir(folder)
+        except (OSError, ValueError):  # ValueError: otra unidad en Windows
+            pass
+
+
+def _try_lock(file):
+    """
+    Bloquea un diario para que la recuperación no toque una organización en curso.
+
+    Usa ``fcntl.flock`` o, en Windows, ``msvcrt.locking`` sobre un byte fuera
+    de los datos. El bloqueo se libera al cerrar el archivo.
+
+    Returns:
+        bool: False si otro proceso lo tiene bloqueado o si el sistema no
+              permite bloquearlo.
+    """
+    if fcntl is not None:
+        try:
+            fcntl.flock(file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return True
+        except BlockingIOError:
+            return False
+
+    if msvcrt is not None:
+        fd = file.fileno()
+        os.lseek(fd, _MSVCRT_LOCK_OFFSET, os.SEEK_SET)
+        try:
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+            return True
+        except OSError:
+            return False
+        finally:
+            os.lseek(fd, 0, os.SEEK_END)
+
+    return False
+
+
+def _lstat_or_none(path):
+    """Obtiene el estado de una ruta sin seguir enlaces, o None si no existe."""
+    try:
+        return os.lstat(path)
+    except FileNotFoundError:
+        return None
@@ -0,0 +1,102 @@
+"""
+Módulo de la disposición de las carpetas de destino.
+
+Decide en qué carpeta se organiza cada archivo: la de su categoría o una
+subcarpeta por año, por mes o por tamaño (por ejemplo ``Imágenes/2025/03``).
+Las subcarpetas se calculan con los metadatos que el escaneo ya obtuvo
+(``PlannedFile.mtime`` y ``PlannedFile.size``), por lo que no se consulta
+de nuevo ningún archivo, salvo si el plan se leyó de un ``ScanIndex``
+(ver ``SortPlan.indexed``).
+"""
+
+import os
+import time
+
+BUCKET_YEAR = "year"
+BUCKET_MONTH = "month"
+BUCKET_SIZE = "size"
+BUCKETS = (BUCKET_YEAR, BUCKET_MONTH, BUCKET_SIZE)
+
+# Niveles de subcarpetas como máximo dentro de una carpeta de categoría
+MAX_BUCKET_DEPTH = 2
+
+# Límite superior (exclusivo) de cada franja de tamaño y nombre de su carpeta
+SIZE_BANDS = (
+    (1024 ** 2, "Hasta 1 MB"),
+    (100 * 1024 ** 2, "De 1 MB a 100 MB"),
+    (1024 ** 3, "De 100 MB a 1 GB"),
+    (None, "Más de 1 GB"),
+)
+
+
+class FolderLayout:
+    """
+    Disposición de las carpetas de destino.
+
+    Sin subdivisión, cada archivo va a la carpeta de su categoría. Con
+    ``year`` o ``month`` va a una subcarpeta según su fecha de modificación
+    local y con ``size`` según su franja de ``SIZE_BANDS``. Los archivos
+    sin fecha conocida se quedan en la carpeta de su categoría.
+    """
+
+    def __init__(self, bucket=None):
+        """
+        Inicializa la disposición.
+
+        Args:
+            bucket (str, optional): Subdivisión de ``BUCKETS``, o None para
+                                    organizar solo por categoría.
+
+        Raises:
+            ValueError: Si la subdivisión no existe.
+        """
+        if bucket is not None and bucket not in BUCKETS:
+            raise ValueError(f"Subdivisión desconocida: {bucket!r} "
+                             f"(disponibles: {', '.join(BUCKETS)})")
+        self.bucket = bucket
+
+    def __repr__(self):
+        return f"FolderLayout({self.bucket!r})"
+
+    def folder(self, planned):
+        """
+        Obtiene la carpeta de destino de un archivo.
+
+        Args:
+            planned (PlannedFile): Archivo del plan.
+
+        Returns:
+            str: Ruta de la carpeta relativa a la raíz de la organización.
+        """
+        if self.bucket is None:
+            return planned.category
+
+        subfolder = self.subfolder(planned)
+        if subfolder is None:
+            return planned.category
+        return os.path.join(planned.category, subfolder)
+
+    def subfolder(self, planned):
+        """
+        Obtiene la subcarpeta de un archivo dentro de su carpeta de categoría.
+
+        Returns:
+            str: Ruta relativa de la subcarpeta, o None si no corresponde ninguna.
+        """
+        if self.bucket == BUCKET_SIZE:
+            for limit, name in SIZE_BANDS:
+                if limit is None or planned.size < limit:
+                    return name
+
+        if self.bucket is None or planned.mtime is None:
+            return None
+
+        try:
+            date = time.localtime(planned.mtime)
+        except (OverflowError, OSError, ValueError):
+            return None
+
+        year = f"{date.tm_year:04d}"
+        if self.bucket == BUCKET_YEAR:
+            return year
+        return os.path.join(year, f"{date.tm_mon:02d}")
@@ -0,0 +1,209 @@
+"""
+Módulo del plan de organización.
+
+Contiene las clases que describen los archivos detectados en un escaneo
+para que puedan reutilizarse al organizarlos sin volver a listar el
+directorio ni consultar de nuevo el sistema de archivos.
+"""
+
+import os
+
+
+class PlannedFile:
+    """
+    Archivo detectado durante el escaneo, con los metadatos necesarios para moverlo.
+
+    Attributes:
+        name (str): Nombre del archivo.
+        relative_path (str): Ruta relativa a la raíz del plan.
+        extension (str): Extensión normalizada en minúsculas.
+        category (str): Carpeta de categoría de destino.
+        size (int): Tamaño en bytes.
+        device (int): Identificador del dispositivo (``st_dev``).
+        mtime (float): Fecha de modificación (``st_mtime``), o None si se desconoce.
+    """
+
+    __slots__ = ('name', 'relative_path', 'extension', 'category', 'size', 'device', 'mtime')
+
+    def __init__(self, name, relative_path, extension, category, size, device, mtime=None):
+        self.name = name
+        self.relative_path = relative_path
+        self.extension = extension
+        self.category = category
+        self.size = size
+        self.device = device
+        self.mtime = mtime
+
+    def __repr__(self):
+        return f"PlannedFile({self.relative_path!r}, {self.category!r}, {self.size})"
+
+
+class SortPlan:
+    """
+    Resultado reutilizable de escanear un directorio.
+
+    Lo produce ``plan_directory`` y lo consume ``sort_files``, de modo que el
+    directorio se lista una sola vez por ejecución.
+
+    Attributes:
+        timings (dict): Segundos del escaneo que produjo el plan: ``listing``
+                        (recorrido y consultas al sistema de archivos) y
+                        ``classification`` (clasificación de los nombres).
+        indexed (bool): True si los archivos salen de un ``ScanIndex``; sus
+                        tamaños y fechas pueden no reflejar cambios de contenido
+                        posteriores al escaneo que los guardó.
+    """
+
+    def __init__(self, root, depth=0, files=None):
+        """
+        Inicializa el plan.
+
+        Args:
+            root (str): Directorio escaneado.
+            depth (int, optional): Profundidad con la que se escaneó.
+            files (list, optional): Lista de ``PlannedFile`` detectados.
+        """
+        self.root = root
+        self.depth = depth
+        self.files = files if files is not None else []
+        self.timings = {'listing': 0.0, 'classification': 0.0}
+        self.indexed = False
+
+    def __len__(self):
+        return len(self.files)
+
+    def __iter__(self):
+        return iter(self.files)
+
+    def add(self, planned_file):
+        """Añade un archivo al plan."""
+        self.files.append(planned_file)
+
+    def matches(self, path):
+        """
+        Indica si el plan corresponde a la ruta indicada.
+
+        Returns:
+            bool: True si ``path`` apunta al mismo directorio que ``root``.
+        """
+        return _normalize(path) == _normalize(self.root)
+
+    def select(self, selected_extensions):
+        """
+        Filtra los archivos cuyas extensiones estén seleccionadas.
+
+        Args:
+            selected_extensions (iterable): Extensiones a organizar.
+
+        Returns:
+            list: Lista de ``PlannedFile`` a mover.
+        """
+        selected = set(selected_extensions)
+        return [f for f in self.files if f.extension in selected]
+
+    def discard(self, planned_files):
+        """
+        Elimina del plan los archivos indicados (por ejemplo, los ya movidos).
+
+        Args:
+            planned_files (iterable): ``PlannedFile`` a descartar.
+        """
+        removed = set(map(id, planned_files))
+        if removed:
+            self.files = [f for f in self.files if id(f) not in removed]
+
+    def summary(self):
+        """
+        Resume el plan con el mismo formato que ``scan_directory``.
+
+        Returns:
+            dict: Extensiones como claves con count, files y category.
+        """
+        results = {}
+        for planned in self.files:
+            if planned.extension not in results:
+                results[planned.extension] = {
+                    'count': 0,
+                    'files': [],
+                    'category': planned.category
+                }
+            results[planned.extension]['count'] += 1
+            results[planned.extension]['files'].append(planned.relative_path)
+        return results
+
+    def totals(self):
+        """
+        Cuenta los archivos y bytes del plan por extensión, sin listar los nombres.
+
+        Returns:
+            ScanSummary: Totales del plan.
+        """
+        totals = ScanSummary()
+        for planned in self.files:
+            totals.add(planned.extension, planned.category, planned.size)
+        totals.files_seen = len(self.files)
+        return totals
+
+
+class ScanSummary:
+    """
+    Recuento de un directorio por extensión, sin los nombres de los archivos.
+
+    Ocupa memoria proporcional al número de extensiones distintas, no al de
+    archivos. Lo producen ``summarize_directory`` y ``SortPlan.totals``.
+
+    Attributes:
+        extensions (dict): Extensiones como claves con count, bytes y category.
+        files_seen (int): Archivos examinados. Sin índice incluye los no soportados.
+        complete (bool): False si el recuento se detuvo antes de terminar.
+    """
+
+    __slots__ = ('extensions', 'files_seen', 'complete')
+
+    def __init__(self):
+        self.extensions = {}
+        self.files_seen = 0
+        self.complete = True
+
+    def __len__(self):
+        return len(self.extensions)
+
+    def __contains__(self, extension):
+        return extension in self.extensions
+
+    def add(self, extension, category, size):
+        """Cuenta un archivo."""
+        totals = self.extensions.get(extension)
+        if totals is None:
+            totals = self.extensions[extension] = {'count': 0, 'bytes': 0, 'category': category}
+        totals['count'] += 1
+        totals['bytes'] += size
+
+    def categories(self):
+        """
+        Agrupa los totales por categoría.
+
+        Returns:
+            dict: Categorías como claves (ordenadas) con count y bytes.
+        """
+        categories = {}
+        for totals in self.extensions.values():
+            category = categories.setdefault(totals['category'], {'count': 0, 'bytes': 0})
+            category['count'] += totals['count']
+            category['bytes'] += totals['bytes']
+        return dict(sorted(categories.items()))
+
+    @property
+    def total_count(self):
+        """int: Archivos de extensiones soportadas."""
+        return sum(totals['count'] for totals in self.extensions.values())
+
+    @property
+    def total_bytes(self):
+        """int: Bytes de los archivos de extensiones soportadas."""
+        return sum(totals['bytes'] for totals in self.extensions.values())
+
+
+def _normalize(path):
+    """Normaliza una ruta para compararla."""
+    return os.path.normcase(os.path.abspath(path))
@@ -0,0 +1,224 @@
+"""
+Módulo de notificación del progreso.
+
+Contiene el informador que acumula el progreso de una organización
+(archivos, bytes, velocidad y tiempo restante) y lo notifica agrupado
+a una frecuencia máxima, en lugar de una vez por archivo o por bloque.
+"""
+
+import threading
+import time
+
+# Notificaciones por segundo como máximo
+DEFAULT_PROGRESS_RATE = 20.0
+
+# Fracción máxima que se muestra mientras el total es una estimación
+_ESTIMATED_FRACTION = 0.99
+
+
+class ProgressSnapshot:
+    """
+    Estado del progreso en un instante.
+
+    Attributes:
+        files_done (int): Archivos procesados (movidos o con error).
+        files_total (int): Archivos a procesar, o None si aún no se conocen.
+        bytes_done (int): Bytes procesados.
+        bytes_total (int): Bytes a procesar.
+        elapsed (float): Segundos transcurridos desde el inicio.
+        throughput (float): Bytes por segundo desde el inicio.
+        eta (float): Segundos restantes estimados, o None si aún no se conocen.
+        finished (bool): True en la última notificación.
+        estimated (bool): True si los totales son una estimación (por ejemplo,
+                          mientras una organización continua sigue listando).
+    """
+
+    __slots__ = (
+        'files_done', 'files_total', 'bytes_done', 'bytes_total',
+        'elapsed', 'throughput', 'eta', 'finished', 'estimated'
+    )
+
+    def __init__(self, files_done, files_total, bytes_done, bytes_total,
+                 elapsed, throughput, eta, finished, estimated=False):
+        self.files_done = files_done
+        self.files_total = files_total
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.elapsed = elapsed
+        self.throughput = throughput
+        self.eta = eta
+        self.finished = finished
+        self.estimated = estimated
+
+    @property
+    def fraction(self):
+        """
+        Fracción completada entre 0 y 1.
+
+        Se calcula en bytes cuando se conoce el total y, si no, en archivos.
+        Con un total estimado no llega a 1 hasta que se conoce el real.
+        """
+        if self.bytes_total > 0:
+            fraction = self.bytes_done / self.bytes_total
+        elif self.files_total:
+            fraction = self.files_done / self.files_total
+        else:
+            return 1.0 if self.finished else 0.0
+        return min(_ESTIMATED_FRACTION if self.estimated else 1.0, fraction)
+
+
+class ProgressReporter:
+    """
+    Acumula el progreso de una ejecución y lo notifica a una frecuencia limitada.
+
+    Puede actualizarse desde varios hilos. La función de notificación recibe un
+    ``ProgressSnapshot`` y se llama como mucho ``rate`` veces por segundo, más
+    una notificación inicial y otra final; debe ser rápida (por ejemplo,
+    encolar el estado para otro hilo).
+    """
+
+    def __init__(self, callback=None, rate=DEFAULT_PROGRESS_RATE, clock=time.monotonic):
+        """
+        Inicializa el informador.
+
+        Args:
+            callback (callable, optional): Función que recibe cada ``ProgressSnapshot``.
+            rate (float, optional): Notificaciones por segundo como máximo.
+            clock (callable, optional): Reloj monotónico en segundos.
+        """
+        self.callback = callback
+        self.interval = 1.0 / rate if rate and rate > 0 else 0.0
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.files_done = 0
+        self.files_total = 0
+        self.bytes_done = 0
+        self.bytes_total = 0
+        self.estimated = False
+        self._started = clock()
+        self._next_emit = self._started
+
+    def start(self, files_total, bytes_total, estimated=False):
+        """
+        Reinicia el progreso para una ejecución con los totales indicados.
+
+        Args:
+            files_total (int): Archivos a procesar, o None si no se conocen.
+            bytes_total (int): Bytes a procesar, o 0 si no se conocen.
+            estimated (bool, optional): True si los totales son una estimación que
+                                        se corregirá con ``set_totals``.
+        """
+        with self._lock:
+            self.files_done = 0
+            self.files_total = files_total
+            self.bytes_done = 0
+            self.bytes_total = bytes_total
+            self.estimated = estimated
+            self._started = self.clock()
+            self._emit(self._started, finished=False)
+
+    def set_totals(self, files_total, bytes_total, estimated=False):
+        """Sustituye los totales de la ejecución en curso, por ejemplo al terminar de listar."""
+        with self._lock:
+            self.files_total = files_total
+            self.bytes_total = bytes_total
+            self.estimated = estimated
+            self._emit(self.clock(), finished=False)
+
+    def add_bytes(self, amount):
+        """Suma bytes procesados."""
+        if not amount:
+            return
+        with self._lock:
+            self.bytes_done += amount
+            self._maybe_emit()
+
+    def file_done(self):
+        """Cuenta un archivo procesado."""
+        with self._lock:
+            self.files_done += 1
+            self._maybe_emit()
+
+    def finish(self):
+        """Envía la notificación final, sin limitar la frecuencia."""
+        with self._lock:
+            self._emit(self.clock(), finished=True)
+
+    def snapshot(self, finished=False):
+        """
+        Obtiene el estado actual del progreso.
+
+        Returns:
+            ProgressSnapshot: Estado con velocidad y tiempo restante estimado.
+        """
+        with self._lock:
+            return self._snapshot(self.clock(), finished)
+
+    def _maybe_emit(self):
+        """Notifica si ha pasado el intervalo mínimo desde la última notificación."""
+        now = self.clock()
+        if now >= self._next_emit:
+            self._emit(now, finished=False)
+
+    def _emit(self, now, finished):
+        """Notifica el estado actual. Debe llamarse con ``_lock`` adquirido."""
+        self._next_emit = now + self.interval
+        if self.callback:
+            self.callback(self._snapshot(now, finished))
+
+    def _snapshot(self, now, finished):
+        """Construye el estado actual. Debe llamarse con ``_lock`` adquirido."""
+        elapsed = max(0.0, now - self._started)
+        throughput = self.bytes_done / elapsed if elapsed > 0 else 0.0
+        return ProgressSnapshot(
+            self.files_done,
+            self.files_total,
+            self.bytes_done,
+            self.bytes_total,
+            elapsed,
+            throughput,
+            0.0 if finished else self._estimate_remaining(elapsed, throughput),
+            finished,
+            self.estimated and not finished
+        )
+
+    def _estimate_remaining(self, elapsed, throughput):
+        """Estima los segundos restantes a partir del ritmo medio."""
+        if self.bytes_total > 0 and throughput > 0:
+            return max(0.0, (self.bytes_total - self.bytes_done) / throughput)
+        if self.files_total and self.files_done > 0 and elapsed > 0:
+            if self.estimated and self.files_done >= self.files_total:
+                return None
+            return max(0, self.files_total - self.files_done) * elapsed / self.files_done
+        return None
+
+
+def format_bytes(amount):
+    """
+    Formatea una cantidad de bytes con la unidad más adecuada.
+
+    Returns:
+        str: Por ejemplo, ``"1.5 GB"``.
+    """
+    value = float(amount)
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if value < 1024 or unit == "TB":
+            return f"{value:.0f} {unit}" if unit == "B" else f"{value:.1f} {unit}"
+        value /= 1024
+
+
+def format_duration(seconds):
+    """
+    Formatea una duración en segundos como ``h:mm:ss`` o ``m:ss``.
+
+    Returns:
+        str: Duración formateada, o ``"--:--"`` si no se conoce.
+    """
+    if seconds is None:
+        return "--:--"
+    seconds = int(round(seconds))
+    hours, rest = divmod(seconds, 3600)
+    minutes, seconds = divmod(rest, 60)
+    if hours:
+        return f"{hours}:{minutes:02d}:{seconds:02d}"
+    return f"{minutes}:{seconds:02d}"
@@ -0,0 +1,311 @@
+"""
+Módulo del índice persistente de escaneos.
+
+Contiene un índice en SQLite que guarda, por cada directorio escaneado,
+el listado en bruto de sus archivos (nombre, tamaño, dispositivo y fecha)
+y sus subdirectorios. Los archivos se clasifican al leerlos, así que el
+mismo índice sirve para cualquier tabla de extensiones. Cada entrada se
+valida con el ``st_mtime_ns``, el inodo y el dispositivo del directorio,
+de modo que los directorios sin cambios no vuelven a listarse.
+"""
+
+import contextlib
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+DEFAULT_MAX_DIRECTORIES = 2000
+DEFAULT_MAX_ENTRIES = 2000000
+
+# Un directorio modificado hace menos de este tiempo podría volver a cambiar
+# sin que cambie su mtime (resolución del sistema de archivos), así que no se guarda
+RACY_WINDOW_NS = 2 * 1000 * 1000 * 1000
+
+_SCHEMA_VERSION = "3"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS directories (
+    id INTEGER PRIMARY KEY,
+    path TEXT NOT NULL UNIQUE,
+    mtime_ns INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    device INTEGER NOT NULL,
+    entry_count INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS directories_last_used ON directories (last_used);
+CREATE TABLE IF NOT EXISTS files (
+    directory_id INTEGER NOT NULL REFERENCES directories (id) ON DELETE CASCADE,
+    name TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    device INTEGER NOT NULL,
+    mtime REAL
+);
+CREATE INDEX IF NOT EXISTS files_directory ON files (directory_id);
+CREATE TABLE IF NOT EXISTS subdirectories (
+    directory_id INTEGER NOT NULL REFERENCES directories (id) ON DELETE CASCADE,
+    name TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS subdirectories_directory ON subdirectories (directory_id);
+"""
+
+
+class ScanIndex:
+    """
+    Índice persistente de listados de directorios.
+
+    Puede compartirse entre hilos. Cuando se superan ``max_directories``
+    directorios o ``max_entries`` archivos guardados, se eliminan los
+    directorios usados hace más tiempo.
+    """
+
+    def __init__(self, path=None, max_directories=DEFAULT_MAX_DIRECTORIES,
+                 max_entries=DEFAULT_MAX_ENTRIES):
+        """
+        Abre (o crea) el índice.
+
+        Args:
+            path (str, optional): Archivo SQLite. Por defecto, ``default_index_path()``.
+            max_directories (int, optional): Directorios guardados como máximo.
+            max_entries (int, optional): Archivos guardados como máximo entre todos
+                                         los directorios.
+
+        Raises:
+            OSError: Si no puede crearse la carpeta del índice.
+            sqlite3.Error: Si no puede abrirse la base de datos.
+        """
+        self.path = path or default_index_path()
+        self.max_directories = max_directories
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA foreign_keys = ON")
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._prepare_schema()
+
+    def close(self):
+        """Cierra la base de datos."""
+        with self._lock:
+            self._connection.close()
+
+    @contextlib.contextmanager
+    def batch(self):
+        """
+        Agrupa las consultas de un escaneo en una sola transacción.
+
+        Al salir se aplican los límites de tamaño y se confirman los cambios.
+        """
+        with self._lock:
+            try:
+                yield self
+                self._evict()
+                self._connection.commit()
+            except BaseException:
+                self._connection.rollback()
+                raise
+
+    def lookup(self, directory, stat):
+        """
+        Obtiene el listado guardado de un directorio si sigue siendo válido.
+
+        Args:
+            directory (str): Ruta del directorio.
+            stat (os.stat_result): Estado actual del directorio.
+
+        Returns:
+            tuple: (files, subdirs) con las tuplas (name, size, device, mtime)
+                   de todos los archivos y los nombres de los subdirectorios,
+                   o None si no existe o ha cambiado.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT id, mtime_ns, inode, device FROM directories WHERE path = ?",
+                (_key(directory),)
+            ).fetchone()
+
+            if row is None:
+                return None
+
+            directory_id, mtime_ns, inode, device = row
+            if (mtime_ns, inode, device) != (stat.st_mtime_ns, stat.st_ino, stat.st_dev):
+                return None
+
+            self._connection.execute(
+                "UPDATE directories SET last_used = ? WHERE id = ?",
+                (time.time(), directory_id)
+            )
+            files = self._connection.execute(
+                "SELECT name, size, device, mtime FROM files WHERE directory_id = ?",
+                (directory_id,)
+            ).fetchall()
+            subdirs = [name for (name,) in self._connection.execute(
+                "SELECT name FROM subdirectories WHERE directory_id = ?",
+                (directory_id,)
+            )]
+            return files, subdirs
+
+    def is_current(self, directory, stat):
+        """
+        Indica si el listado guardado de un directorio sigue siendo válido, sin leerlo.
+
+        Args:
+            directory (str): Ruta del directorio.
+            stat (os.stat_result): Estado actual del directorio.
+
+        Returns:
+            bool: True si el directorio está en el índice y no ha cambiado.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT mtime_ns, inode, device FROM directories WHERE path = ?",
+                (_key(directory),)
+            ).fetchone()
+        return row is not None and tuple(row) == (stat.st_mtime_ns, stat.st_ino, stat.st_dev)
+
+    def store(self, directory, stat, files, subdirs):
+        """
+        Guarda el listado de un directorio.
+
+        Los directorios modificados hace menos de ``RACY_WINDOW_NS`` no se
+        guardan, porque otro cambio inmediato podría no alterar su mtime.
+
+        Args:
+            directory (str): Ruta del directorio.
+            stat (os.stat_result): Estado del directorio antes de listarlo.
+            files (list): Tuplas (name, size, device, mtime) de todos los archivos,
+                          sin clasificar.
+            subdirs (list): Nombres de los subdirectorios.
+        """
+        if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+            return
+
+        with self._lock:
+            key = _key(directory)
+            self._connection.execute("DELETE FROM directories WHERE path = ?", (key,))
+            cursor = self._connection.execute(
+                "INSERT INTO directories (path, mtime_ns, inode, device, entry_count, last_used) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, stat.st_mtime_ns, stat.st_ino, stat.st_dev,
+                 len(files), time.time())
+            )
+            directory_id = cursor.lastrowid
+            self._connection.executemany(
+                "INSERT INTO files (directory_id, name, size, device, mtime) "
+                "VALUES (?, ?, ?, ?, ?)",
+                ((directory_id,) + tuple(row) for row in files)
+            )
+            self._connection.executemany(
+                "INSERT INTO subdirectories (directory_id, name) VALUES (?, ?)",
+                ((directory_id, name) for name in subdirs)
+            )
+
+    def count_files(self, directory, recursive=False):
+        """
+        Cuenta los archivos guardados de un directorio sin comprobar si ha cambiado.
+
+        Sirve como estimación del tamaño de un directorio antes de listarlo.
+
+        Args:
+            directory (str): Ruta del directorio.
+            recursive (bool, optional): Sumar también los subdirectorios guardados,
+                                        a cualquier profundidad.
+
+        Returns:
+            int: Archivos guardados, de cualquier extensión, o None si el
+                 directorio no está en el índice.
+        """
+        key = _key(directory)
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT entry_count FROM directories WHERE path = ?", (key,)
+            ).fetchone()
+            if row is None or not recursive:
+                return row[0] if row is not None else None
+
+            prefix = os.path.join(key, "")
+            (below,) = self._connection.execute(
+                "SELECT COALESCE(SUM(entry_count), 0) FROM directories "
+                "WHERE substr(path, 1, ?) = ?",
+                (len(prefix), prefix)
+            ).fetchone()
+            return row[0] + below
+
+    def clear(self):
+        """Elimina todos los listados guardados."""
+        with self._lock:
+            self._connection.execute("DELETE FROM directories")
+            self._connection.commit()
+
+    def _prepare_schema(self):
+        """Crea las tablas y las recrea vacías si cambia la versión del esquema."""
+        with self._lock:
+            self._connection.executescript(_SCHEMA)
+            expected = {"schema": _SCHEMA_VERSION}
+            stored = dict(self._connection.execute("SELECT key, value FROM meta"))
+
+            if stored != expected:
+                # Las tablas de otra versión pueden tener otras columnas
+                self._connection.executescript(
+                    "DROP TABLE files; DROP TABLE subdirectories; DROP TABLE directories;"
+                    "DELETE FROM meta;"
+                )
+                self._connection.executescript(_SCHEMA)
+                self._connection.executemany(
+                    "INSERT INTO meta (key, value) VALUES (?, ?)",
+                    expected.items()
+                )
+            self._connection.commit()
+
+    def _evict(self):
+        """Elimina los directorios menos usados hasta cumplir los límites."""
+        directories, entries = self._connection.execute(
+            "SELECT COUNT(*), COALESCE(SUM(entry_count), 0) FROM directories"
+        ).fetchone()
+
+        if directories <= self.max_directories and entries <= self.max_entries:
+            return
+
+        to_delete = []
+        for directory_id, entry_count in self._connection.execute(
+            "SELECT id, entry_count FROM directories ORDER BY last_used"
+        ):
+            if directories <= self.max_directories and entries <= self.max_entries:
+                break
+            to_delete.append((directory_id,))
+            directories -= 1
+            entries -= entry_count
+
+        self._connection.executemany("DELETE FROM directories WHERE id = ?", to_delete)
+
+
+def default_index_path():
+    """
+    Obtiene la ruta por defecto del índice en la carpeta de caché del usuario.
+
+    Returns:
+        str: Ruta del archivo SQLite.
+    """
+    if sys.platform == "win32":
+        base = os.environ.get("LOCALAPPDATA") or os.path.expanduser("~\\AppData\\Local")
+    elif sys.platform == "darwin":
+        base = os.path.expanduser("~/Library/Caches")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache")
+    return os.path.join(base, "sorter", "scan_index.sqlite3")
+
+
+def _key(directory):
+    """Normaliza la ruta de un directorio para usarla como clave."""
+    return os.path.normcase(os.path.abspath(directory))
+
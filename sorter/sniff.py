@@ -0,0 +1,388 @@
+"""
+Módulo de clasificación por contenido.
+
+Contiene el detector que lee los primeros bytes de los archivos sin
+extensión (o con una extensión no soportada), reconoce su formato por la
+firma del contenido (JPEG, PNG, PDF, ZIP/OOXML, MP4, ELF, ...) y les asigna
+la extensión y la categoría correspondientes de la tabla de extensiones.
+Los formatos detectados pueden guardarse entre ejecuciones en ``SniffCache``.
+"""
+
+import os
+import sqlite3
+import threading
+import time
+from sorter.classifier import DEFAULT_CLASSIFIER
+from sorter.control import check_token
+from sorter.scan_index import RACY_WINDOW_NS, default_index_path
+
+DEFAULT_SNIFF_WORKERS = 4
+DEFAULT_READ_SIZE = 8 * 1024
+DEFAULT_MAX_CACHED = 100000
+DEFAULT_MAX_SNIFFED = 500000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sniffed (
+    device INTEGER NOT NULL,
+    inode INTEGER NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL,
+    extension TEXT NOT NULL,
+    last_used REAL NOT NULL,
+    PRIMARY KEY (device, inode)
+);
+CREATE INDEX IF NOT EXISTS sniffed_last_used ON sniffed (last_used);
+"""
+
+# Lecturas en curso o pendientes por hilo como máximo
+_PENDING_PER_WORKER = 4
+
+# Firmas al inicio del archivo: (prefijo, extensión)
+_PREFIX_SIGNATURES = (
+    (b"\xff\xd8\xff", ".jpg"),
+    (b"\x89PNG\r\n\x1a\n", ".png"),
+    (b"GIF87a", ".gif"),
+    (b"GIF89a", ".gif"),
+    (b"II*\x00", ".tif"),
+    (b"MM\x00*", ".tif"),
+    (b"8BPS", ".psd"),
+    (b"%PDF-", ".pdf"),
+    (b"{\\rtf", ".rtf"),
+    (b"Rar!\x1a\x07", ".rar"),
+    (b"7z\xbc\xaf\x27\x1c", ".7z"),
+    (b"\x1f\x8b", ".gz"),
+    (b"BZh", ".bz2"),
+    (b"\xfd7zXZ\x00", ".xz"),
+    (b"\x28\xb5\x2f\xfd", ".zst"),
+    (b"ID3", ".mp3"),
+    (b"fLaC", ".flac"),
+    (b"OggS", ".ogg"),
+    (b"MThd", ".mid"),
+    (b"\x7fELF", ".so"),
+    (b"\xcf\xfa\xed\xfe", ".dylib"),
+    (b"\xce\xfa\xed\xfe", ".dylib"),
+    (b"SQLite format 3\x00", ".sqlite3"),
+    (b"wOFF", ".woff"),
+    (b"wOF2", ".woff2"),
+    (b"OTTO", ".otf"),
+    (b"\x00\x01\x00\x00\x00", ".ttf"),
+    (b"d8:announce", ".torrent"),
+)
+
+# Subtipos de RIFF (bytes 8 a 12)
+_RIFF_TYPES = {
+    b"WAVE": ".wav",
+    b"AVI ": ".avi",
+    b"WEBP": ".webp",
+}
+
+# Marcas de ISO BMFF (bytes 8 a 12, tras ``ftyp``)
+_FTYP_BRANDS = {
+    b"qt  ": ".mov",
+    b"M4A ": ".m4a",
+    b"M4V ": ".m4v",
+    b"heic": ".heic",
+    b"heix": ".heic",
+    b"mif1": ".heif",
+    b"avif": ".avif",
+    b"3gp4": ".3gp",
+    b"3gp5": ".3gp",
+    b"3g2a": ".3g2",
+}
+
+# Contenido de un ZIP que identifica el formato (el primero que aparezca)
+_ZIP_MARKERS = (
+    (b"mimetypeapplication/epub+zip", ".epub"),
+    (b"mimetypeapplication/vnd.oasis.opendocument.text", ".odt"),
+    (b"mimetypeapplication/vnd.oasis.opendocument.spreadsheet", ".ods"),
+    (b"mimetypeapplication/vnd.oasis.opendocument.presentation", ".odp"),
+    (b"word/", ".docx"),
+    (b"xl/", ".xlsx"),
+    (b"ppt/", ".pptx"),
+    (b"AndroidManifest.xml", ".apk"),
+    (b"META-INF/", ".jar"),
+)
+
+
+class ContentSniffer:
+    """
+    Detector del formato de los archivos a partir de su contenido.
+
+    Lee como mucho ``read_size`` bytes de cada archivo en un conjunto acotado
+    de hilos. Los resultados se guardan por (dispositivo, inodo, tamaño,
+    mtime), de modo que al volver a escanear no se leen de nuevo los archivos
+    sin cambios; con ``cache``, tampoco en ejecuciones posteriores. Puede
+    compartirse entre escaneos y entre hilos.
+    """
+
+    def __init__(self, workers=DEFAULT_SNIFF_WORKERS, read_size=DEFAULT_READ_SIZE,
+                 max_cached=DEFAULT_MAX_CACHED, classifier=None, cache=None):
+        """
+        Inicializa el detector.
+
+        Args:
+            workers (int, optional): Lecturas simultáneas como máximo.
+            read_size (int, optional): Bytes leídos del inicio de cada archivo.
+            max_cached (int, optional): Resultados guardados como máximo; al superarse
+                                        se descartan los más antiguos.
+            classifier (ExtensionClassifier, optional): Clasificador del que se toman
+                                                        las categorías.
+            cache (SniffCache, optional): Caché persistente de los formatos detectados.
+        """
+        self.workers = workers
+        self.read_size = read_size
+        self.max_cached = max_cached
+        self.classifier = classifier or DEFAULT_CLASSIFIER
+        self.cache = cache
+        self._cache = {}
+        self._lock = threading.Lock()
+
+    def sniff(self, file_path, stat):
+        """
+        Detecta el formato de un archivo.
+
+        Args:
+            file_path (str): Ruta del archivo.
+            stat (os.stat_result): Estado del archivo, para la caché.
+
+        Returns:
+            tuple: (extension, category) del formato detectado, o None si no se
+                   reconoce, su extensión no está soportada o no puede leerse.
+        """
+        key = (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns)
+        with self._lock:
+            if key in self._cache:
+                return self._cache[key]
+
+        ext = self.cache.lookup(stat) if self.cache is not None else None
+        if ext is None:
+            try:
+                with open(file_path, "rb") as file:
+                    header = file.read(self.read_size)
+            except OSError:
+                return None
+            ext = detect_extension(header)
+            if self.cache is not None:
+                self.cache.store(stat, ext)
+
+        category = self.classifier.category(ext) if ext else None
+        match = (ext, category) if category else None
+
+        with self._lock:
+            if len(self._cache) >= self.max_cached:
+                del self._cache[next(iter(self._cache))]
+            self._cache[key] = match
+        return match
+
+    def sniff_entries(self, entries, token=None):
+        """
+        Detecta el formato de varios archivos en paralelo.
+
+        Args:
+            entries (iterable): Pares (clave, os.DirEntry). Se consumen a medida
+                                que quedan hilos libres, sin materializarlos.
+            token (ControlToken, optional): Testigo para cancelar las lecturas.
+
+        Yields:
+            tuple: (clave, os.DirEntry, (extension, category)) de cada archivo
+                   reconocido, en el orden en que terminan las lecturas.
+
+        Raises:
+            OperationCancelled: Si se cancela mediante ``token``.
+        """
+        # concurrent.futures arrastra logging: se importa solo al detectar
+        from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+        limit = max(1, self.workers) * _PENDING_PER_WORKER
+        pending = {}
+
+        with ThreadPoolExecutor(max_workers=max(1, self.workers)) as executor:
+            try:
+                for key, entry in entries:
+                    check_token(token)
+                    if len(pending) >= limit:
+                        yield from _finished(pending, wait(pending, return_when=FIRST_COMPLETED)[0])
+                    pending[executor.submit(self._sniff_entry, entry)] = (key, entry)
+
+                while pending:
+                    check_token(token)
+                    yield from _finished(pending, wait(pending, return_when=FIRST_COMPLETED)[0])
+            finally:
+                for future in pending:
+                    future.cancel()
+                if self.cache is not None:
+                    self.cache.flush()
+
+    def clear(self):
+        """Descarta los resultados guardados."""
+        with self._lock:
+            self._cache.clear()
+
+    def _sniff_entry(self, entry):
+        """Detecta el formato de una entrada del listado."""
+        try:
+            stat = entry.stat()
+        except OSError:
+            return None
+        return self.sniff(entry.path, stat)
+
+
+class SniffCache:
+    """
+    Caché persistente de los formatos detectados por contenido.
+
+    Guarda la extensión detectada de cada archivo por dispositivo e inodo y la
+    valida con el tamaño y el ``st_mtime_ns``, como ``HashCache``. Se guarda la
+    extensión y no la categoría, de modo que sirve con cualquier clasificador.
+    Puede compartirse entre hilos. Cuando se superan ``max_entries`` archivos
+    guardados, se eliminan los usados hace más tiempo.
+    """
+
+    def __init__(self, path=None, max_entries=DEFAULT_MAX_SNIFFED):
+        """
+        Abre (o crea) la caché.
+
+        Args:
+            path (str, optional): Archivo SQLite. Por defecto, junto al índice de
+                                  escaneos en la carpeta de caché del usuario.
+            max_entries (int, optional): Archivos guardados como máximo.
+
+        Raises:
+            OSError: Si no puede crearse la carpeta de la caché.
+            sqlite3.Error: Si no puede abrirse la base de datos.
+        """
+        self.path = path or os.path.join(os.path.dirname(default_index_path()), "sniffed.sqlite3")
+        self.max_entries = max_entries
+        self._lock = threading.RLock()
+
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+
+        self._connection = sqlite3.connect(self.path, check_same_thread=False)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def close(self):
+        """Confirma los cambios y cierra la base de datos."""
+        with self._lock:
+            self._evict()
+            self._connection.commit()
+            self._connection.close()
+
+    def lookup(self, stat):
+        """
+        Obtiene el formato guardado de un archivo si sigue sin cambios.
+
+        Returns:
+            str: Extensión detectada, cadena vacía si no se reconoció ningún
+                 formato, o None si el archivo no está en la caché o ha cambiado.
+        """
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT size, mtime_ns, extension FROM sniffed WHERE device = ? AND inode = ?",
+                (stat.st_dev, stat.st_ino)
+            ).fetchone()
+            if row is None or (row[0], row[1]) != (stat.st_size, stat.st_mtime_ns):
+                return None
+            self._connection.execute(
+                "UPDATE sniffed SET last_used = ? WHERE device = ? AND inode = ?",
+                (time.time(), stat.st_dev, stat.st_ino)
+            )
+        return row[2]
+
+    def store(self, stat, extension):
+        """
+        Guarda el formato detectado de un archivo (None si no se reconoció).
+
+        Los archivos modificados hace menos de ``RACY_WINDOW_NS`` no se guardan,
+        porque otro cambio inmediato podría no alterar su mtime.
+        """
+        if time.time_ns() - stat.st_mtime_ns < RACY_WINDOW_NS:
+            return
+
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO sniffed "
+                "(device, inode, size, mtime_ns, extension, last_used) VALUES (?, ?, ?, ?, ?, ?)",
+                (stat.st_dev, stat.st_ino, stat.st_size, stat.st_mtime_ns, extension or "",
+                 time.time())
+            )
+
+    def flush(self):
+        """Confirma los formatos guardados, eliminando antes los que superan el límite."""
+        with self._lock:
+            self._evict()
+            self._connection.commit()
+
+    def clear(self):
+        """Elimina todos los formatos guardados."""
+        with self._lock:
+            self._connection.execute("DELETE FROM sniffed")
+            self._connection.commit()
+
+    def _evict(self):
+        """Elimina los formatos menos usados hasta cumplir el límite."""
+        count = self._connection.execute("SELECT COUNT(*) FROM sniffed").fetchone()[0]
+        if count <= self.max_entries:
+            return
+        self._connection.execute(
+            "DELETE FROM sniffed WHERE rowid IN "
+            "(SELECT rowid FROM sniffed ORDER BY last_used LIMIT ?)",
+            (count - self.max_entries,)
+        )
+
+
+def detect_extension(header):
+    """
+    Reconoce el formato de un archivo por los primeros bytes de su contenido.
+
+    Args:
+        header (bytes): Inicio del archivo.
+
+    Returns:
+        str: Extensión típica del formato (por ejemplo ``".png"``), o None.
+    """
+    if header.startswith(b"PK\x03\x04"):
+        for marker, ext in _ZIP_MARKERS:
+            if marker in header:
+                return ext
+        return ".zip"
+
+    if header[4:8] == b"ftyp":
+        return _FTYP_BRANDS.get(header[8:12], ".mp4")
+
+    if header.startswith(b"RIFF"):
+        return _RIFF_TYPES.get(header[8:12])
+
+    if header.startswith(b"MZ"):
+        return ".exe" if _is_portable_executable(header) else None
+
+    if header.startswith(b"\x1a\x45\xdf\xa3"):
+        return ".webm" if b"webm" in header[:64] else ".mkv"
+
+    for prefix, ext in _PREFIX_SIGNATURES:
+        if header.startswith(prefix):
+            return ext
+
+    if len(header) > 1 and header[0] == 0xFF and header[1] in (0xFB, 0xF3, 0xF2):
+        return ".mp3"
+
+    return None
+
+
+def _is_portable_executable(header):
+    """Comprueba la cabecera PE a la que apunta la cabecera MZ."""
+    if len(header) < 0x40:
+        return False
+    offset = int.from_bytes(header[0x3C:0x40], "little")
+    return header[offset:offset + 4] == b"PE\x00\x00"
+
+
+def _finished(pending, done):
+    """Genera los resultados reconocidos de las lecturas terminadas."""
+    for future in done:
+        key, entry = pending.pop(future)
+        match = future.result()
+        if match is not None:
+            yield key, entry, match
@@ -0,0 +1,89 @@
+"""
+Módulo de estadísticas de una organización.
+
+Contiene el resumen que devuelve ``sort_files``: el tiempo de cada fase
+(listado, clasificación, creación de carpetas, resolución de colisiones y
+movimientos), los recuentos de archivos y bytes, el reparto entre
+renombrados y copias a otro dispositivo y, si se pide, los movimientos
+más lentos.
+"""
+
+PHASES = ("listing", "classification", "folders", "collisions", "moves", "dedup")
+
+
+class SortStats:
+    """
+    Estadísticas de una ejecución de ``sort_files``.
+
+    Attributes:
+        timings (dict): Segundos de cada fase de ``PHASES``. El listado y la
+                        clasificación son los del escaneo que produjo el plan;
+                        la resolución de colisiones suma el tiempo de todos los
+                        hilos y los movimientos son tiempo real transcurrido.
+        moved (int): Archivos movidos.
+        renamed (int): Archivos movidos con un sufijo numérico por colisión.
+        skipped (int): Archivos seleccionados que no se movieron por ser duplicados.
+        failed (int): Archivos que no pudieron moverse.
+        bytes_moved (int): Bytes de los archivos movidos.
+        same_device (dict): count, bytes y seconds (sumando los hilos) de los
+                            movimientos dentro del mismo dispositivo.
+        cross_device (dict): Lo mismo para las copias a otro dispositivo.
+        slowest (list): Tuplas (seconds, relative_path, size, cross_device) de
+                        los movimientos más lentos, del más lento al más rápido.
+                        Vacía salvo que se pida con ``slowest`` en ``sort_files``.
+    """
+
+    def __init__(self):
+        self.timings = dict.fromkeys(PHASES, 0.0)
+        self.moved = 0
+        self.renamed = 0
+        self.skipped = 0
+        self.failed = 0
+        self.bytes_moved = 0
+        self.same_device = {'count': 0, 'bytes': 0, 'seconds': 0.0}
+        self.cross_device = {'count': 0, 'bytes': 0, 'seconds': 0.0}
+        self.slowest = []
+
+    def __repr__(self):
+        return (f"SortStats(moved={self.moved}, renamed={self.renamed}, skipped={self.skipped}, "
+                f"failed={self.failed}, bytes_moved={self.bytes_moved})")
+
+    @property
+    def total_seconds(self):
+        """float: Suma de los tiempos de todas las fases."""
+        return sum(self.timings.values())
+
+    def add_timings(self, timings):
+        """
+        Acumula el reparto por dispositivo de ``MoveEngine.timings``.
+
+        Args:
+            timings (dict): (dispositivo, a otro dispositivo) → [archivos, bytes, segundos].
+        """
+        for (_, cross_device), (count, size, seconds) in timings.items():
+            split = self.cross_device if cross_device else self.same_device
+            split['count'] += count
+            split['bytes'] += size
+            split['seconds'] += seconds
+
+    def as_dict(self):
+        """
+        Convierte las estadísticas en un diccionario serializable en JSON.
+
+        Returns:
+            dict: Los atributos, con los movimientos más lentos como diccionarios.
+        """
+        return {
+            "timings": dict(self.timings),
+            "moved": self.moved,
+            "renamed": self.renamed,
+            "skipped": self.skipped,
+            "failed": self.failed,
+            "bytes_moved": self.bytes_moved,
+            "same_device": dict(self.same_device),
+            "cross_device": dict(self.cross_device),
+            "slowest": [
+                {"file": path, "seconds": seconds, "size": size, "cross_device": cross_device}
+                for seconds, path, size, cross_device in self.slowest
+            ],
+        }
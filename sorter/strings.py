@@ -12,11 +12,20 @@ WINDOW_GEOMETRY = "700x700"
 # Labels
 LABEL_PATH = "Ruta a organizar:"
 LABEL_FILE_TYPES = "Tipos de archivos:"
+LABEL_ONLY_PRESENT = "Mostrar solo las extensiones encontradas"
+LABEL_CATEGORY_HEADER = "{} {} ({}/{})"
+LABEL_EXTENSION_COUNT = "{} ({})"
+LABEL_EXTENSION_TOTALS = "{} ({}, {})"
 
 # Botones
 BTN_BROWSE = "📂"
 BTN_EXECUTE = "Ejecutar"
 BTN_RESET = "Reset"
+BTN_PAUSE = "Pausar"
+BTN_RESUME = "Reanudar"
+BTN_CANCEL = "Cancelar"
+BTN_UNDO = "Deshacer"
+BTN_PREVIEW = "Simular"
 
 # Colores
 COLOR_EXECUTE_BG = "#4CAF50"
@@ -32,6 +41,7 @@ ERROR_DISK_FULL = "No hay suficiente espacio en disco."
 ERROR_PATH_TOO_LONG = "La ruta es demasiado larga:\n{}"
 ERROR_SCAN_FAILED = "Error al escanear el directorio:\n{}"
 ERROR_MOVE_FAILED = "Error al mover el archivo '{}':\n{}"
+ERROR_UNDO_FAILED = "No se pudieron devolver {} archivos a su sitio:\n{}"
 
 # Mensajes de advertencia
 WARNING_TITLE = "Advertencia"
@@ -41,100 +51,98 @@ WARNING_NO_SELECTION = "No ha seleccionado ningún tipo de archivo."
 SUCCESS_TITLE = "Éxito"
 SUCCESS_ORGANIZED = "Archivos organizados correctamente."
 SUCCESS_ORGANIZED_COUNT = "{} archivos organizados correctamente."
+SUCCESS_UNDONE = "{} archivos devueltos a su ubicación original."
 
 # Mensajes de progreso
 PROGRESS_SCANNING = "Escaneando directorio..."
 PROGRESS_ORGANIZING = "Organizando archivos... {}/{}"
 PROGRESS_COMPLETE = "Completado"
+PROGRESS_PAUSED = "En pausa"
+PROGRESS_CANCELLED = "Organización cancelada"
+PROGRESS_DETAIL = "{}/{} archivos · {} de {} · {}/s · {} restantes"
+PROGRESS_ESTIMATING = "Calculando el plan de organización..."
+PROGRESS_UNDOING = "Deshaciendo la última organización..."
+PROGRESS_RECOVERED = "Recuperada una organización interrumpida: {} movimientos completados, {} deshechos"
+
+# Simulación
+PREVIEW_TITLE = "Plan de organización"
+PREVIEW_CATEGORY = "  {}: {} archivos, {}"
+PREVIEW_SUMMARY = (
+    "{}\n\n"
+    "Renombrados en el mismo disco: {}\n"
+    "Copias a otro disco: {} ({})\n"
+    "Archivos con nombre nuevo: {}\n"
+    "Duración estimada: {}{}\n\n"
+    "¿Organizar ahora?"
+)
+PREVIEW_GUESSED = " (aproximada: sin mediciones previas)"
 
 # Configuración UI
 MAX_COLUMNS_CHECKBOXES = 7
+PROGRESS_POLL_MS = 50
+SCAN_DEBOUNCE_MS = 250
+SCAN_REPEAT_MS = 1000
+SCAN_SAMPLE_FILES = 5000
+
+# Línea de comandos
+CLI_DESCRIPTION = "Organiza los archivos de un directorio en carpetas por categoría."
+CLI_HELP_PATH = "directorio a organizar (con varios, se organizan en lote)"
+CLI_HELP_EXTENSION = "extensión a organizar (repetible); por defecto, todas"
+CLI_HELP_CATEGORY = "categoría a organizar (repetible), por ejemplo 'Imágenes'"
+CLI_HELP_DEPTH = "niveles de subdirectorios a recorrer (por defecto, 0)"
+CLI_HELP_RECURSIVE = "recorrer el árbol completo"
+CLI_HELP_DRY_RUN = "mostrar qué se movería sin mover nada"
+CLI_HELP_WORKERS = "archivos que se mueven a la vez (por defecto, {})"
+CLI_HELP_SNIFF = "clasificar por su contenido los archivos sin extensión soportada"
+CLI_HELP_DEDUP = "acción para los archivos idénticos a otro ya organizado"
+CLI_HELP_BUCKET = "subcarpetas dentro de cada categoría: por año, por mes o por tamaño"
+CLI_HELP_MAP = ("asignar una extensión a una categoría (repetible), por ejemplo "
+                "'.ts=Video'; prevalece sobre la tabla de extensiones")
+CLI_HELP_JSON = "escribir el resultado en JSON por la salida estándar"
+CLI_HELP_NO_JOURNAL = "no registrar los movimientos en un diario (no podrán deshacerse)"
+CLI_HELP_STATS = "mostrar el tiempo de cada fase y los recuentos al terminar"
+CLI_HELP_SLOWEST = "incluir en las estadísticas los N movimientos más lentos"
+CLI_HELP_UNDO = "deshacer la organización registrada en el diario indicado"
+CLI_HELP_PARALLEL = "directorios de un lote que se organizan a la vez (por defecto, {})"
+CLI_HELP_MAX_MOVES = "movimientos simultáneos como máximo entre todos los directorios"
+CLI_HELP_PER_DEVICE = "movimientos simultáneos como máximo en cada disco"
+CLI_HELP_WATCH = "seguir vigilando el directorio y organizar los archivos que lleguen (Ctrl+C para terminar)"
+CLI_HELP_STREAM = ("mover los archivos mientras se lista el directorio, sin planificar antes "
+                   "(para directorios enormes; no guarda la lista de archivos movidos)")
+CLI_ERROR_NO_DIRECTORY = "no existe el directorio: {}"
+CLI_ERROR_UNKNOWN_EXTENSION = "extensión no soportada: {}"
+CLI_ERROR_UNKNOWN_CATEGORY = "categoría desconocida: {} (disponibles: {})"
+CLI_ERROR_MAP = "asignación no válida: {} (use EXTENSIÓN=CATEGORÍA)"
+CLI_ERROR_WORKERS = "el número de hilos debe ser al menos 1"
+CLI_ERROR_LIMIT = "{} debe ser al menos 1"
+CLI_ERROR_STREAM = "--stream no es compatible con {}"
+CLI_ERROR_WATCH = "--watch no es compatible con {}"
+CLI_ERROR_WATCH_PATHS = "--watch vigila un solo directorio"
+CLI_ERROR_NO_PATH = "indique el directorio a organizar o --undo DIARIO"
+CLI_ERROR_NO_JOURNAL = "no existe el diario: {}"
+CLI_ERROR_DEDUP_JOURNAL = "--dedup delete necesita el diario para poder deshacerse; no admite --no-journal"
+CLI_PLANNED_FILE = "{} -> {}"
+CLI_DUPLICATE = "{} = {} (duplicado)"
+CLI_SUMMARY = "{} archivos movidos, {} errores."
+CLI_SUMMARY_DRY_RUN = "{} archivos se moverían (simulación)."
+CLI_ESTIMATE_CATEGORY = "  {}: {} archivos, {}"
+CLI_ESTIMATE_MOVES = "{} renombrados en el mismo dispositivo, {} copias a otro dispositivo ({}), {} con nombre nuevo."
+CLI_ESTIMATE_DURATION = "Duración estimada: {}"
+CLI_ESTIMATE_GUESSED = " (sin mediciones previas de algún dispositivo)"
+CLI_CANCELLED = "Organización cancelada."
+CLI_STATS_PHASE = "  {:<15} {:9.3f} s"
+CLI_STATS_COUNTS = "{} movidos, {} renombrados, {} omitidos, {} fallidos, {} movidos en total."
+CLI_STATS_SPLIT = "  {}: {} archivos, {}, {:.3f} s"
+CLI_STATS_SAME_DEVICE = "Mismo dispositivo"
+CLI_STATS_CROSS_DEVICE = "Otro dispositivo"
+CLI_STATS_SLOW_MOVE = "  {:9.2f} ms  {} ({})"
+CLI_JOURNAL = "Diario: {} (deshacer con --undo)"
+CLI_UNDONE = "{} archivos devueltos a su sitio, {} errores."
+CLI_BATCH_ROOT = "== {} =="
+CLI_BATCH_SUMMARY = "{} directorios: {} archivos movidos, {} errores, {} cancelados."
+CLI_WATCHING = "Vigilando {} (Ctrl+C para terminar)..."
+CLI_WATCH_BATCH = "Lote: {} archivos movidos, {} errores."
+CLI_RECOVERED = "Recuperado {}: {} movimientos completados, {} deshechos."
 
-# Extensiones y categorías
-EXTENSIONS = {
-    # Imágenes
-    '.jpg': 'Imágenes', '.jpeg': 'Imágenes', '.png': 'Imágenes', '.gif': 'Imágenes', 
-    '.bmp': 'Imágenes', '.svg': 'Imágenes', '.ico': 'Imágenes', '.webp': 'Imágenes',
-    '.tif': 'Imágenes', '.tiff': 'Imágenes', '.raw': 'Imágenes', '.cr2': 'Imágenes',
-    '.nef': 'Imágenes', '.orf': 'Imágenes', '.sr2': 'Imágenes', '.heic': 'Imágenes',
-    '.heif': 'Imágenes', '.psd': 'Imágenes', '.ai': 'Imágenes', '.eps': 'Imágenes',
-    '.dng': 'Imágenes', '.jfif': 'Imágenes', '.avif': 'Imágenes',
-    
-    # Documentos
-    '.pdf': 'Documentos', '.doc': 'Documentos', '.docx': 'Documentos', '.txt': 'Documentos',
-    '.xls': 'Documentos', '.xlsx': 'Documentos', '.ppt': 'Documentos', '.pptx': 'Documentos',
-    '.odt': 'Documentos', '.ods': 'Documentos', '.odp': 'Documentos', '.rtf': 'Documentos',
-    '.tex': 'Documentos', '.wpd': 'Documentos', '.pages': 'Documentos', '.numbers': 'Documentos',
-    '.key': 'Documentos', '.csv': 'Documentos', '.md': 'Documentos', '.log': 'Documentos',
-    '.epub': 'Documentos', '.mobi': 'Documentos', '.azw': 'Documentos', '.azw3': 'Documentos',
-    
-    # Audio
-    '.mp3': 'Audio', '.wav': 'Audio', '.flac': 'Audio', '.aac': 'Audio',
-    '.ogg': 'Audio', '.m4a': 'Audio', '.wma': 'Audio', '.opus': 'Audio',
-    '.alac': 'Audio', '.ape': 'Audio', '.aiff': 'Audio', '.aif': 'Audio',
-    '.mid': 'Audio', '.midi': 'Audio', '.amr': 'Audio', '.weba': 'Audio',
-    '.ra': 'Audio', '.ram': 'Audio', '.dsf': 'Audio', '.dff': 'Audio',
-    
-    # Video
-    '.mp4': 'Video', '.avi': 'Video', '.mkv': 'Video', '.mov': 'Video',
-    '.wmv': 'Video', '.flv': 'Video', '.webm': 'Video', '.m4v': 'Video',
-    '.mpg': 'Video', '.mpeg': 'Video', '.3gp': 'Video', '.3g2': 'Video',
-    '.f4v': 'Video', '.swf': 'Video', '.vob': 'Video', '.ogv': 'Video',
-    '.ts': 'Video', '.m2ts': 'Video', '.mts': 'Video', '.divx': 'Video',
-    
-    # Comprimidos
-    '.zip': 'Comprimidos', '.rar': 'Comprimidos', '.7z': 'Comprimidos', 
-    '.tar': 'Comprimidos', '.gz': 'Comprimidos', '.bz2': 'Comprimidos',
-    '.xz': 'Comprimidos', '.tgz': 'Comprimidos', '.tbz2': 'Comprimidos',
-    '.zipx': 'Comprimidos', '.cab': 'Comprimidos', '.iso': 'Comprimidos',
-    '.dmg': 'Comprimidos', '.pkg': 'Comprimidos', '.deb': 'Comprimidos',
-    '.rpm': 'Comprimidos', '.z': 'Comprimidos', '.lz': 'Comprimidos',
-    
-    # Código - Lenguajes de programación
-    '.py': 'Código', '.js': 'Código', '.java': 'Código', '.cpp': 'Código',
-    '.c': 'Código', '.h': 'Código', '.hpp': 'Código', '.cs': 'Código',
-    '.rb': 'Código', '.php': 'Código', '.swift': 'Código', '.go': 'Código',
-    '.rs': 'Código', '.kt': 'Código', '.scala': 'Código', '.r': 'Código',
-    '.m': 'Código', '.vb': 'Código', '.pl': 'Código', '.perl': 'Código',
-    '.sh': 'Código', '.bash': 'Código', '.bat': 'Código', '.cmd': 'Código',
-    '.ps1': 'Código', '.lua': 'Código', '.dart': 'Código', '.f': 'Código',
-    '.f90': 'Código', '.asm': 'Código', '.s': 'Código',
-    
-    # Código - Web
-    '.html': 'Código', '.htm': 'Código', '.css': 'Código', '.scss': 'Código',
-    '.sass': 'Código', '.less': 'Código', '.jsx': 'Código', '.tsx': 'Código',
-    '.ts': 'Código', '.vue': 'Código', '.svelte': 'Código', '.xml': 'Código',
-    '.xhtml': 'Código', '.asp': 'Código', '.aspx': 'Código', '.jsp': 'Código',
-    
-    # Código - Configuración y datos
-    '.json': 'Código', '.yaml': 'Código', '.yml': 'Código', '.toml': 'Código',
-    '.ini': 'Código', '.cfg': 'Código', '.conf': 'Código', '.properties': 'Código',
-    '.env': 'Código', '.sql': 'Código', '.db': 'Código', '.sqlite': 'Código',
-    
-    # Ejecutables y binarios
-    '.exe': 'Ejecutables', '.msi': 'Ejecutables', '.app': 'Ejecutables',
-    '.apk': 'Ejecutables', '.jar': 'Ejecutables', '.war': 'Ejecutables',
-    '.dll': 'Ejecutables', '.so': 'Ejecutables', '.dylib': 'Ejecutables',
-    '.bin': 'Ejecutables', '.com': 'Ejecutables', '.gadget': 'Ejecutables',
-    
-    # Fuentes
-    '.ttf': 'Fuentes', '.otf': 'Fuentes', '.woff': 'Fuentes', '.woff2': 'Fuentes',
-    '.eot': 'Fuentes', '.fon': 'Fuentes', '.fnt': 'Fuentes',
-    
-    # Modelos 3D y diseño
-    '.obj': '3D', '.fbx': '3D', '.stl': '3D', '.dae': '3D',
-    '.3ds': '3D', '.blend': '3D', '.max': '3D', '.c4d': '3D',
-    '.ma': '3D', '.mb': '3D', '.skp': '3D', '.ply': '3D',
-    
-    # Bases de datos
-    '.sqlite3': 'Bases de datos', '.mdb': 'Bases de datos', '.accdb': 'Bases de datos',
-    '.frm': 'Bases de datos', '.myd': 'Bases de datos', '.myi': 'Bases de datos',
-    
-    # Máquinas virtuales y discos
-    '.vmdk': 'Virtualización', '.vdi': 'Virtualización', '.vhd': 'Virtualización',
-    '.vhdx': 'Virtualización', '.ova': 'Virtualización', '.ovf': 'Virtualización',
-    
-    # Otros
-    '.torrent': 'Otros', '.lnk': 'Otros', '.url': 'Otros', '.webloc': 'Otros',
-    '.tmp': 'Otros', '.temp': 'Otros', '.bak': 'Otros', '.old': 'Otros'
-}
+# Extensiones y categorías (definidas en sorter.extensions)
+from sorter.extensions import EXTENSIONS  # noqa: E402,F401
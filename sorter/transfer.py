@@ -0,0 +1,199 @@
+"""
+Módulo de copia de archivos entre dispositivos.
+
+Contiene las funciones que mueven un archivo a otro sistema de archivos
+copiando sus datos dentro del kernel cuando es posible (``copy_file_range``
+o ``sendfile``) y eliminando el origen solo tras verificar la copia.
+"""
+
+import errno
+import os
+import shutil
+
+# Tamaño de cada bloque copiado; también marca la frecuencia del progreso
+COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+# Errores que indican que una llamada de copia no está disponible para estos archivos
+_UNSUPPORTED_ERRNOS = frozenset(
+    code for code in (
+        getattr(errno, 'ENOSYS', None),
+        getattr(errno, 'EXDEV', None),
+        getattr(errno, 'EINVAL', None),
+        getattr(errno, 'ENOTSUP', None),
+        getattr(errno, 'EOPNOTSUPP', None),
+        getattr(errno, 'EBADF', None),
+        getattr(errno, 'ENOTSOCK', None),
+    ) if code is not None
+)
+
+_OPEN_SOURCE_FLAGS = os.O_RDONLY | getattr(os, 'O_BINARY', 0)
+_OPEN_TARGET_FLAGS = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+
+
+def move_across_devices(file_path, target_path, progress=None):
+    """
+    Mueve un archivo a otro dispositivo sin sobrescribir el destino.
+
+    El destino se crea en exclusiva, se copian los datos por bloques, se
+    conservan permisos y fechas y, tras comprobar que el tamaño copiado
+    coincide con el del origen, se elimina el origen. Si algo falla, se
+    borra la copia parcial y el origen queda intacto.
+
+    Args:
+        file_path (str): Archivo de origen.
+        target_path (str): Ruta de destino; no debe existir.
+        progress (callable, optional): Función que recibe los bytes copiados
+                                       tras cada bloque.
+
+    Returns:
+        int: Bytes copiados.
+
+    Raises:
+        FileExistsError: Si el destino ya existe.
+        OSError: Si la copia falla o no puede verificarse.
+    """
+    if os.path.islink(file_path):
+        os.symlink(os.readlink(file_path), target_path)
+        os.unlink(file_path)
+        return 0
+
+    src_fd = os.open(file_path, _OPEN_SOURCE_FLAGS)
+    try:
+        dst_fd = os.open(target_path, _OPEN_TARGET_FLAGS, 0o666)
+        try:
+            try:
+                copied = copy_data(src_fd, dst_fd, progress)
+                _verify_copy(src_fd, dst_fd, copied, file_path)
+            finally:
+                os.close(dst_fd)
+            shutil.copystat(file_path, target_path)
+        except BaseException:
+            _remove_quietly(target_path)
+            raise
+    finally:
+        os.close(src_fd)
+
+    os.unlink(file_path)
+    return copied
+
+
+def copy_data(src_fd, dst_fd, progress=None):
+    """
+    Copia todo el contenido de ``src_fd`` en ``dst_fd``.
+
+    Prueba, por este orden, ``os.copy_file_range``, ``os.sendfile`` y una copia
+    con lectura y escritura en espacio de usuario; se pasa al siguiente método
+    solo si el anterior no está disponible para estos descriptores.
+
+    Returns:
+        int: Bytes copiados.
+    """
+    for method in _COPY_METHODS:
+        copied = method(src_fd, dst_fd, progress)
+        if copied is not None:
+            return copied
+    return _copy_with_buffer(src_fd, dst_fd, progress)
+
+
+def _copy_with_copy_file_range(src_fd, dst_fd, progress):
+    """Copia dentro del kernel sin pasar por espacio de usuario (Linux 4.5+)."""
+    return _copy_with_syscall(
+        lambda: os.copy_file_range(src_fd, dst_fd, COPY_CHUNK_SIZE),
+        progress
+    )
+
+
+def _copy_with_sendfile(src_fd, dst_fd, progress):
+    """Copia dentro del kernel con ``sendfile`` entre archivos."""
+    return _copy_with_syscall(
+        lambda: os.sendfile(dst_fd, src_fd, None, COPY_CHUNK_SIZE),
+        progress
+    )
+
+
+def _copy_with_syscall(copy_chunk, progress):
+    """
+    Repite una llamada de copia hasta el final del archivo.
+
+    Returns:
+        int: Bytes copiados, o None si la llamada no está disponible y aún
+             no se había copiado nada.
+    """
+    copied = 0
+    while True:
+        try:
+            sent = copy_chunk()
+        except OSError as e:
+            if copied == 0 and e.errno in _UNSUPPORTED_ERRNOS:
+                return None
+            raise
+
+        if sent == 0:
+            return copied
+
+        copied += sent
+        _notify(progress, sent)
+
+
+def _copy_with_buffer(src_fd, dst_fd, progress):
+    """Copia con lectura y escritura por bloques, disponible en cualquier plataforma."""
+    copied = 0
+    buffer = bytearray(COPY_CHUNK_SIZE)
+    view = memoryview(buffer)
+
+    while True:
+        read = _read_into(src_fd, buffer)
+        if read == 0:
+            return copied
+
+        written = 0
+        while written < read:
+            written += os.write(dst_fd, view[written:read])
+
+        copied += read
+        _notify(progress, read)
+
+
+def _read_into(fd, buffer):
+    """Lee en ``buffer`` reutilizándolo entre bloques cuando hay ``os.readv``."""
+    if hasattr(os, 'readv'):
+        return os.readv(fd, [buffer])
+
+    data = os.read(fd, len(buffer))
+    buffer[:len(data)] = data
+    return len(data)
+
+
+def _verify_copy(src_fd, dst_fd, copied, file_path):
+    """Comprueba que la copia tiene el mismo tamaño que el origen."""
+    source_size = os.fstat(src_fd).st_size
+    target_size = os.fstat(dst_fd).st_size
+
+    if not source_size == target_size == copied:
+        raise OSError(
+            errno.EIO,
+            f"La copia no coincide con el original ({target_size} de {source_size} bytes)",
+            file_path
+        )
+
+
+def _notify(progress, amount):
+    """Notifica los bytes copiados si hay función de progreso."""
+    if progress:
+        progress(amount)
+
+
+def _remove_quietly(path):
+    """Elimina un archivo ignorando los errores."""
+    try:
+        os.unlink(path)
+    except OSError:
+        pass
+
+
+_COPY_METHODS = tuple(
+    method for available, method in (
+        (hasattr(os, 'copy_file_range'), _copy_with_copy_file_range),
+        (hasattr(os, 'sendfile'), _copy_with_sendfile),
+    ) if available
+)
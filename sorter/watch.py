@@ -0,0 +1,410 @@
+"""
+Módulo de organización continua.
+
+Contiene el vigilante que detecta los archivos que llegan a un directorio
+(con inotify en Linux o sondeando el directorio en el resto de sistemas),
+espera a que dejen de escribirse y los organiza en pequeños lotes con
+``sort_files``, usando la misma clasificación y resolución de colisiones.
+Los archivos que no pueden moverse se reintentan más tarde con una espera
+creciente.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from stat import S_ISREG
+from sorter.classifier import DEFAULT_CLASSIFIER
+from sorter.control import check_token
+from sorter.core import SortError, sort_files, DEFAULT_WORKERS
+from sorter.plan import PlannedFile, SortPlan
+
+DEFAULT_STABLE_SECONDS = 2.0
+DEFAULT_DEBOUNCE_SECONDS = 3.0
+DEFAULT_POLL_SECONDS = 2.0
+DEFAULT_MAX_BATCH = 1000
+DEFAULT_RETRY_SECONDS = 5.0
+DEFAULT_MAX_RETRIES = 5
+
+# Espera máxima entre reintentos de un archivo, por mucho que se duplique
+_MAX_RETRY_SECONDS = 300.0
+
+# Espera máxima sin eventos; solo sirve para atender la cancelación
+_IDLE_TIMEOUT = 1.0
+
+# Constantes de <sys/inotify.h>
+_IN_CLOSE_WRITE = 0x00000008
+_IN_MOVED_TO = 0x00000080
+_IN_CREATE = 0x00000100
+_IN_DELETE_SELF = 0x00000400
+_IN_MOVE_SELF = 0x00000800
+_IN_Q_OVERFLOW = 0x00004000
+_IN_IGNORED = 0x00008000
+_IN_ISDIR = 0x40000000
+_IN_EVENT_HEADER = struct.Struct("iIII")
+_IN_READ_SIZE = 64 * 1024
+
+
+class DirectoryWatcher:
+    """
+    Vigila un directorio y organiza en lotes los archivos que van llegando.
+
+    Un archivo se considera listo cuando su tamaño y su fecha de modificación
+    no cambian durante ``stable_for`` segundos. Los archivos listos se agrupan
+    y se organizan cuando pasan ``debounce`` segundos sin que llegue ninguno
+    nuevo o cuando el lote alcanza ``max_batch`` archivos. Sin actividad, el
+    hilo queda bloqueado esperando eventos del sistema.
+
+    Los archivos de un lote que no llegan a moverse (en uso, sin permisos,
+    disco lleno...) vuelven al lote siguiente tras ``retry_after`` segundos,
+    el doble en cada intento, hasta ``max_retries`` reintentos.
+    """
+
+    def __init__(self, path, selected_extensions=None, stable_for=DEFAULT_STABLE_SECONDS,
+                 debounce=DEFAULT_DEBOUNCE_SECONDS, max_batch=DEFAULT_MAX_BATCH,
+                 poll_interval=DEFAULT_POLL_SECONDS, workers=DEFAULT_WORKERS,
+                 include_existing=True, on_batch=None, token=None, classifier=None,
+                 retry_after=DEFAULT_RETRY_SECONDS, max_retries=DEFAULT_MAX_RETRIES,
+                 journal=None, layout=None):
+        """
+        Inicializa el vigilante.
+
+        Args:
+            path (str): Directorio a vigilar.
+            selected_extensions (iterable, optional): Extensiones a organizar.
+                                                      Por defecto, todas las soportadas.
+            stable_for (float, optional): Segundos sin cambios para dar un archivo por terminado.
+            debounce (float, optional): Segundos sin llegadas antes de organizar el lote.
+            max_batch (int, optional): Archivos por lote como máximo.
+            poll_interval (float, optional): Segundos entre sondeos si no hay inotify.
+            workers (int, optional): Movimientos simultáneos en cada lote.
+            include_existing (bool, optional): Organizar también los archivos que ya
+                                               estaban en el directorio al empezar.
+            on_batch (callable, optional): Función a llamar tras cada lote. Recibe la
+                                           lista de ``PlannedFile`` del lote, las
+                                           ``SortStats`` de su organización (o None
+                                           si no llegó a empezar) y el error
+                                           producido (o None); un ``SortError``
+                                           detalla los archivos que fallaron.
+            token (ControlToken, optional): Testigo para detener o pausar la vigilancia.
+            classifier (ExtensionClassifier, optional): Clasificador de extensiones.
+            retry_after (float, optional): Segundos antes del primer reintento de un
+                                           archivo que no pudo moverse.
+            max_retries (int, optional): Reintentos de un archivo antes de abandonarlo.
+            journal (MoveJournal, optional): Diario donde se registran los movimientos
+                                             de todos los lotes. No se cierra al terminar.
+            layout (FolderLayout, optional): Disposición de las carpetas de destino.
+        """
+        self.path = path
+        self.classifier = classifier or DEFAULT_CLASSIFIER
+        self.selected_extensions = frozenset(
+            selected_extensions if selected_extensions is not None else self.classifier.mapping
+        )
+        self.stable_for = stable_for
+        self.debounce = debounce
+        self.max_batch = max_batch
+        self.poll_interval = poll_interval
+        self.workers = workers
+        self.include_existing = include_existing
+        self.on_batch = on_batch
+        self.token = token
+        self.retry_after = retry_after
+        self.max_retries = max_retries
+        self.journal = journal
+        self.layout = layout
+        self._candidates = {}
+        self._ready = []
+        self._last_ready_at = None
+        self._retries = {}
+
+    def run(self):
+        """
+        Vigila el directorio hasta que se cancele ``token``.
+
+        Raises:
+            OperationCancelled: Al cancelarse mediante ``token``.
+            OSError: Si el directorio deja de existir o no puede vigilarse.
+        """
+        source = _open_event_source(self.path, self.poll_interval)
+        try:
+            if self.include_existing:
+                self._add_candidates(_list_file_names(self.path), time.monotonic())
+
+            while True:
+                check_token(self.token)
+                names = source.wait(self._next_timeout(time.monotonic()))
+                now = time.monotonic()
+
+                if names is None:
+                    names = _list_file_names(self.path)
+                self._add_candidates(names, now)
+                self._check_stability(now)
+                self._check_retries(now)
+
+                if self._batch_due(now):
+                    self._flush()
+        finally:
+            source.close()
+
+    def _add_candidates(self, names, now):
+        """Empieza a seguir los archivos nuevos o modificados de extensiones seleccionadas."""
+        for name in names:
+            match = self.classifier.classify(name)
+            if match is None or match[0] not in self.selected_extensions:
+                continue
+            stat = _stat_file(os.path.join(self.path, name))
+            if stat is None:
+                continue
+            known = self._candidates.get(name)
+            if known is None or known[:2] != (stat.st_size, stat.st_mtime_ns):
+                self._candidates[name] = (stat.st_size, stat.st_mtime_ns, now)
+                self._retries.pop(name, None)
+
+    def _check_stability(self, now):
+        """Pasa al lote los archivos que llevan ``stable_for`` segundos sin cambios."""
+        for name, (size, mtime_ns, changed_at) in list(self._candidates.items()):
+            stat = _stat_file(os.path.join(self.path, name))
+            if stat is None:
+                del self._candidates[name]
+            elif (stat.st_size, stat.st_mtime_ns) != (size, mtime_ns):
+                self._candidates[name] = (stat.st_size, stat.st_mtime_ns, now)
+            elif now - changed_at >= self.stable_for:
+                del self._candidates[name]
+                self._ready.append(self._planned_file(name, stat))
+                self._last_ready_at = now
+
+    def _check_retries(self, now):
+        """Devuelve al lote los archivos fallidos cuya espera ha terminado."""
+        for name, (attempts, retry_at) in list(self._retries.items()):
+            if retry_at is None or now < retry_at or name in self._candidates:
+                continue
+            stat = _stat_file(os.path.join(self.path, name))
+            if stat is None:
+                del self._retries[name]
+                continue
+            # Sin hora de reintento mientras espera en el lote
+            self._retries[name] = (attempts, None)
+            self._ready.append(self._planned_file(name, stat))
+            self._last_ready_at = now
+
+    def _schedule_retries(self, planned_files, now):
+        """Programa el reintento de los archivos que no llegaron a moverse."""
+        for planned in planned_files:
+            attempts = self._retries.get(planned.name, (0, None))[0] + 1
+            if attempts > self.max_retries:
+                self._retries.pop(planned.name, None)
+                continue
+            delay = min(self.retry_after * 2 ** (attempts - 1), _MAX_RETRY_SECONDS)
+            self._retries[planned.name] = (attempts, now + delay)
+
+    def _planned_file(self, name, stat):
+        """Crea la entrada del plan de un archivo listo para organizar."""
+        ext, category = self.classifier.classify(name)
+        return PlannedFile(name, name, ext, category, stat.st_size, stat.st_dev, stat.st_mtime)
+
+    def _batch_due(self, now):
+        """Indica si hay que organizar el lote pendiente."""
+        if not self._ready:
+            return False
+        return len(self._ready) >= self.max_batch or now - self._last_ready_at >= self.debounce
+
+    def _next_timeout(self, now):
+        """Calcula cuánto esperar eventos antes de la siguiente comprobación."""
+        deadlines = []
+        if self._candidates:
+            deadlines.append(min(self.stable_for, _IDLE_TIMEOUT))
+        if self._ready:
+            deadlines.append(max(0.0, self._last_ready_at + self.debounce - now))
+        retries = [retry_at for _, retry_at in self._retries.values() if retry_at is not None]
+        if retries:
+            deadlines.append(min(max(0.0, min(retries) - now), _IDLE_TIMEOUT))
+        return min(deadlines) if deadlines else _IDLE_TIMEOUT
+
+    def _flush(self):
+        """Organiza el lote pendiente y programa el reintento de los que fallen."""
+        batch, self._ready = self._ready, []
+        plan = SortPlan(self.path, 0, list(batch))
+        stats = None
+        error = None
+        try:
+            stats = sort_files(
+                self.path,
+                self.selected_extensions,
+                plan=plan,
+                workers=self.workers,
+                token=self.token,
+                journal=self.journal,
+                layout=self.layout
+            )
+        except SortError as e:
+            stats = e.stats
+            error = e
+        except OSError as e:
+            error = e
+
+        # El plan conserva los archivos que no llegaron a moverse
+        remaining = set(id(planned) for planned in plan.files)
+        for planned in batch:
+            if id(planned) not in remaining:
+                self._retries.pop(planned.name, None)
+        self._schedule_retries(plan.files, time.monotonic())
+
+        if self.on_batch:
+            self.on_batch(batch, stats, error)
+
+
+def watch_directory(path, selected_extensions=None, token=None, **options):
+    """
+    Vigila un directorio y organiza continuamente los archivos que llegan.
+
+    Args:
+        path (str): Directorio a vigilar.
+        selected_extensions (iterable, optional): Extensiones a organizar.
+        token (ControlToken, optional): Testigo para detener la vigilancia.
+        **options: Resto de opciones de ``DirectoryWatcher``.
+
+    Raises:
+        OperationCancelled: Al cancelarse mediante ``token``.
+        OSError: Si el directorio deja de existir o no puede vigilarse.
+    """
+    DirectoryWatcher(path, selected_extensions, token=token, **options).run()
+
+
+class _InotifySource:
+    """Fuente de eventos basada en inotify (Linux)."""
+
+    def __init__(self, path):
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise _errno_error(path)
+
+        mask = (_IN_CLOSE_WRITE | _IN_MOVED_TO | _IN_CREATE
+                | _IN_DELETE_SELF | _IN_MOVE_SELF)
+        if self._libc.inotify_add_watch(self._fd, os.fsencode(path), mask) < 0:
+            error = _errno_error(path)
+            os.close(self._fd)
+            raise error
+
+        self.path = path
+
+    def wait(self, timeout):
+        """
+        Espera eventos durante ``timeout`` segundos como máximo.
+
+        Returns:
+            list: Nombres de archivo afectados, o None si se perdieron eventos
+                  y hay que volver a listar el directorio.
+        """
+        readable, _, _ = select.select([self._fd], [], [], timeout)
+        if not readable:
+            return []
+
+        names = []
+        overflow = False
+        while True:
+            try:
+                data = os.read(self._fd, _IN_READ_SIZE)
+            except BlockingIOError:
+                break
+            overflow |= self._parse(data, names)
+
+        return None if overflow else names
+
+    def _parse(self, data, names):
+        """Extrae los nombres de los eventos; devuelve True si hubo desbordamiento."""
+        overflow = False
+        offset = 0
+        while offset < len(data):
+            _, mask, _, length = _IN_EVENT_HEADER.unpack_from(data, offset)
+            offset += _IN_EVENT_HEADER.size
+            raw_name = data[offset:offset + length].rstrip(b"\0")
+            offset += length
+
+            if mask & (_IN_DELETE_SELF | _IN_MOVE_SELF | _IN_IGNORED):
+                raise FileNotFoundError(f"El directorio vigilado ya no existe: {self.path}")
+            if mask & _IN_Q_OVERFLOW:
+                overflow = True
+            elif raw_name and not mask & _IN_ISDIR:
+                names.append(os.fsdecode(raw_name))
+        return overflow
+
+    def close(self):
+        """Libera el descriptor de inotify."""
+        os.close(self._fd)
+
+
+class _PollingSource:
+    """Fuente de eventos que compara listados sucesivos del directorio."""
+
+    def __init__(self, path, interval):
+        self.path = path
+        self.interval = interval
+        self._known = _snapshot(path)
+
+    def wait(self, timeout):
+        """
+        Espera hasta el siguiente sondeo y devuelve los archivos nuevos o modificados.
+
+        Returns:
+            list: Nombres de archivo afectados.
+        """
+        time.sleep(min(timeout, self.interval))
+        current = _snapshot(self.path)
+        changed = [name for name, state in current.items() if self._known.get(name) != state]
+        self._known = current
+        return changed
+
+    def close(self):
+        """No hay recursos que liberar."""
+
+
+def _open_event_source(path, poll_interval):
+    """Usa inotify cuando está disponible y, si no, sondea el directorio."""
+    if not os.path.isdir(path):
+        raise FileNotFoundError(f"No existe el directorio: {path}")
+
+    if sys.platform.startswith("linux"):
+        try:
+            return _InotifySource(path)
+        except (OSError, AttributeError, TypeError):
+            pass
+    return _PollingSource(path, poll_interval)
+
+
+def _snapshot(path):
+    """Obtiene tamaño y fecha de cada archivo del directorio."""
+    result = {}
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_file():
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                result[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return result
+
+
+def _list_file_names(path):
+    """Lista los nombres de los archivos del directorio."""
+    with os.scandir(path) as entries:
+        return [entry.name for entry in entries if entry.is_file()]
+
+
+def _stat_file(file_path):
+    """Obtiene el estado de un archivo, o None si ya no existe o no es un archivo."""
+    try:
+        stat = os.stat(file_path)
+    except OSError:
+        return None
+    return stat if S_ISREG(stat.st_mode) else None
+
+
+def _errno_error(path):
+    """Construye un OSError a partir del errno de la última llamada a libc."""
+    code = ctypes.get_errno()
+    return OSError(code, os.strerror(code), path)
@@ -0,0 +1,68 @@
+"""
+Pruebas del borrado de duplicados.
+
+El borrado es la única acción que elimina datos: solo se permite con un
+diario y debe poder deshacerse con ``undo_journal``.
+"""
+
+import os
+
+import pytest
+
+from sorter.core import sort_files
+from sorter.dedup import DEDUP_DELETE, Deduplicator
+from sorter.journal import MoveJournal, read_journal, undo_journal
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+@pytest.fixture
+def root(tmp_path):
+    """Directorio con dos copias idénticas y un archivo del mismo tamaño pero distinto."""
+    root = tmp_path / "raiz"
+    _write(str(root / "a.txt"), "igual")
+    _write(str(root / "b.txt"), "igual")
+    _write(str(root / "c.txt"), "otro!")
+    return root
+
+
+def test_delete_requires_journal(root):
+    with pytest.raises(ValueError):
+        sort_files(str(root), [".txt"], dedup=Deduplicator(DEDUP_DELETE))
+
+    assert sorted(os.listdir(root)) == ["a.txt", "b.txt", "c.txt"]
+
+
+def test_delete_removes_only_identical_copies(root, tmp_path):
+    with MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root)) as journal:
+        stats = sort_files(str(root), [".txt"], dedup=Deduplicator(DEDUP_DELETE),
+                           journal=journal)
+
+    assert stats.moved == 2
+    assert stats.skipped == 1
+    assert os.listdir(root) == ["Documentos"]
+    contents = sorted(_read(str(root / "Documentos" / name))
+                      for name in os.listdir(root / "Documentos"))
+    assert contents == ["igual", "otro!"]
+    assert len(read_journal(journal.path).dedups) == 1
+
+
+def test_undo_recreates_deleted_duplicates(root, tmp_path):
+    with MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root)) as journal:
+        sort_files(str(root), [".txt"], dedup=Deduplicator(DEDUP_DELETE), journal=journal)
+
+    _, errors = undo_journal(journal.path)
+
+    assert errors == []
+    assert sorted(os.listdir(root)) == ["a.txt", "b.txt", "c.txt"]
+    assert [_read(str(root / name)) for name in ("a.txt", "b.txt", "c.txt")] == \
+        ["igual", "igual", "otro!"]
@@ -0,0 +1,63 @@
+"""
+Pruebas de los movimientos sin sobrescritura.
+
+Un destino existente nunca debe perderse: ni al mover un archivo suelto
+ni cuando la organización encuentra colisiones de nombres.
+"""
+
+import os
+
+import pytest
+
+from sorter.core import sort_files
+from sorter.engine import move_without_overwrite
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def test_move_without_overwrite_moves_to_free_target(tmp_path):
+    source = str(tmp_path / "a.txt")
+    target = str(tmp_path / "b.txt")
+    _write(source, "origen")
+
+    move_without_overwrite(source, target)
+
+    assert not os.path.exists(source)
+    assert _read(target) == "origen"
+
+
+def test_move_without_overwrite_keeps_existing_target(tmp_path):
+    source = str(tmp_path / "a.txt")
+    target = str(tmp_path / "b.txt")
+    _write(source, "origen")
+    _write(target, "destino")
+
+    with pytest.raises(FileExistsError):
+        move_without_overwrite(source, target)
+
+    assert _read(source) == "origen"
+    assert _read(target) == "destino"
+
+
+def test_sort_files_renames_on_collision(tmp_path):
+    root = str(tmp_path)
+    _write(os.path.join(root, "informe.txt"), "nuevo")
+    _write(os.path.join(root, "Documentos", "informe.txt"), "anterior")
+
+    stats = sort_files(root, [".txt"])
+
+    assert stats.moved == 1
+    assert stats.renamed == 1
+    assert not os.path.exists(os.path.join(root, "informe.txt"))
+    folder = os.path.join(root, "Documentos")
+    contents = sorted(_read(os.path.join(folder, name)) for name in os.listdir(folder))
+    assert contents == ["anterior", "nuevo"]
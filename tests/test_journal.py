@@ -0,0 +1,164 @@
+"""
+Pruebas del diario de movimientos.
+
+Cubren el ciclo completo (organizar, deshacer) y la recuperación de un
+diario que quedó a medias, que decide qué archivos se borran.
+"""
+
+import os
+import shutil
+
+from sorter.core import sort_files
+from sorter.journal import (
+    ABORTED,
+    DONE,
+    MoveJournal,
+    read_journal,
+    recover_all,
+    recover_journal,
+    undo_journal,
+)
+
+
+def _write(path, content):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, "w", encoding="utf-8") as file:
+        file.write(content)
+
+
+def _read(path):
+    with open(path, encoding="utf-8") as file:
+        return file.read()
+
+
+def _move_record(source, target):
+    """Tupla de ``MoveJournal.record_moves`` con el estado actual del origen."""
+    stat = os.stat(source)
+    return source, target, stat.st_size, stat.st_mtime_ns, False
+
+
+def _crash_copy(journal, path):
+    """Copia el diario tal como quedaría si el proceso terminara ahora."""
+    journal.sync()
+    shutil.copyfile(journal.path, path)
+    return path
+
+
+def test_undo_restores_sorted_files(tmp_path):
+    root = tmp_path / "raiz"
+    _write(str(root / "foto.jpg"), "imagen")
+    _write(str(root / "notas.txt"), "texto")
+    _write(str(root / "Documentos" / "previo.txt"), "previo")
+
+    with MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root)) as journal:
+        stats = sort_files(str(root), [".jpg", ".txt"], journal=journal)
+    assert stats.moved == 2
+    assert _read(str(root / "Imágenes" / "foto.jpg")) == "imagen"
+
+    undone, errors = undo_journal(journal.path)
+
+    assert errors == []
+    assert len(undone) == 2
+    assert _read(str(root / "foto.jpg")) == "imagen"
+    assert _read(str(root / "notas.txt")) == "texto"
+    # La carpeta creada se elimina; la que ya existía se conserva
+    assert not (root / "Imágenes").exists()
+    assert sorted(os.listdir(root / "Documentos")) == ["previo.txt"]
+
+
+def test_undo_twice_moves_nothing_again(tmp_path):
+    root = tmp_path / "raiz"
+    _write(str(root / "notas.txt"), "texto")
+
+    with MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root)) as journal:
+        sort_files(str(root), [".txt"], journal=journal)
+    undo_journal(journal.path)
+    undone, errors = undo_journal(journal.path)
+
+    assert (undone, errors) == ([], [])
+    assert _read(str(root / "notas.txt")) == "texto"
+
+
+def test_undo_does_not_overwrite_new_file(tmp_path):
+    root = tmp_path / "raiz"
+    _write(str(root / "notas.txt"), "texto")
+
+    with MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root)) as journal:
+        sort_files(str(root), [".txt"], journal=journal)
+    _write(str(root / "notas.txt"), "otro")
+
+    undone, errors = undo_journal(journal.path)
+
+    assert undone == []
+    assert len(errors) == 1
+    assert _read(str(root / "notas.txt")) == "otro"
+    assert _read(str(root / "Documentos" / "notas.txt")) == "texto"
+
+
+def test_recover_journal_resolves_pending_moves(tmp_path):
+    root = tmp_path / "raiz"
+    target = root / "Documentos"
+    not_started = str(root / "a.txt")
+    finished = str(root / "b.txt")
+    linked = str(root / "c.txt")
+    partial = str(root / "d.txt")
+    for path in (not_started, finished, linked, partial):
+        _write(path, "contenido " + os.path.basename(path))
+    os.makedirs(str(target))
+
+    journal = MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root))
+    journal.record_moves([_move_record(path, str(target / os.path.basename(path)))
+                          for path in (not_started, finished, linked, partial)])
+    os.rename(finished, str(target / "b.txt"))
+    os.link(linked, str(target / "c.txt"))
+    _write(str(target / "d.txt"), "")
+    crashed = _crash_copy(journal, str(tmp_path / "diarios" / "interrumpido.jsonl"))
+    journal.close()
+
+    outcomes = {os.path.basename(move["src"]): outcome
+                for move, outcome in recover_journal(crashed)}
+
+    assert outcomes == {"a.txt": ABORTED, "b.txt": DONE, "c.txt": DONE, "d.txt": ABORTED}
+    assert sorted(os.listdir(root)) == ["Documentos", "a.txt", "d.txt"]
+    assert sorted(os.listdir(target)) == ["b.txt", "c.txt"]
+    assert _read(partial) == "contenido d.txt"
+    assert read_journal(crashed).finished
+
+
+def test_recover_journal_leaves_changed_source(tmp_path):
+    root = tmp_path / "raiz"
+    source = str(root / "a.txt")
+    target = str(root / "Documentos" / "a.txt")
+    _write(source, "original")
+
+    journal = MoveJournal(str(tmp_path / "diarios" / "orden.jsonl"), str(root))
+    journal.record_moves([_move_record(source, target)])
+    _write(target, "original")
+    _write(source, "editado después")
+    crashed = _crash_copy(journal, str(tmp_path / "diarios" / "interrumpido.jsonl"))
+    journal.close()
+
+    assert recover_journal(crashed) == []
+    assert _read(source) == "editado después"
+    assert _read(target) == "original"
+
+
+def test_recover_all_skips_journal_in_use(tmp_path):
+    directory = tmp_path / "diarios"
+    root = tmp_path / "raiz"
+    source = str(root / "a.txt")
+    _write(source, "contenido")
+
+    journal = MoveJournal(str(directory / "en-curso.jsonl"), str(root))
+    journal.record_moves([_move_record(source, str(root / "Documentos" / "a.txt"))])
+    crashed = _crash_copy(journal, str(directory / "interrumpido.jsonl"))
+
+    try:
+        recovered = recover_all(str(directory))
+        assert list(recovered) == [crashed]
+        assert [outcome for _, outcome in recovered[crashed]] == [ABORTED]
+        assert not read_journal(journal.path).finished
+    finally:
+        journal.close()
+
+    assert os.path.exists(source)